@@ -10,7 +10,14 @@ import omni.ext
 import omni.kit.app
 import omni.kit.commands
 import omni.usd
+from omni.anim.people_api.scripts.command_file_loader import CommandFileLoader
 from omni.anim.people_api.scripts.custom_command.command_manager import CustomCommandManager
+from omni.anim.people_api.scripts.frame_budget_governor import FrameBudgetGovernor
+from omni.anim.people_api.scripts.metadata_channel import MetadataChannel
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+from omni.anim.people_api.scripts.trace_recorder import TraceRecorder
+from omni.anim.people_api.scripts.warmup_manager import WarmupManager
+from omni.anim.people_api.settings import PeopleSettings
 from pxr import Sdf
 
 _extension_instance = None
@@ -30,6 +37,16 @@ def get_ext_path():
     return _ext_path
 
 
+def get_perf_stats() -> PerfStats:
+    """return the hot path timers and counters, see `PerfStats.get_report()`"""
+    return PerfStats.get_instance()
+
+
+def get_trace_recorder() -> TraceRecorder:
+    """return the timeline recorder, see `TraceRecorder.write()`"""
+    return TraceRecorder.get_instance()
+
+
 def add_dynamic_obstacle_behavior_script(prim_path):
     carb.log_info(f"[OAP] Adding dynamic obstacle behavior script to {prim_path}")
     script_path = (
@@ -64,6 +81,15 @@ class Main(omni.ext.IExt):
         # Custom command manager
         self._cmd_manager = CustomCommandManager(_ext_path)
         self._cmd_manager.startup()
+        # Runtime snapshot of the extension settings
+        self._people_settings = PeopleSettings.get_instance()
+        # Timeline spans and hot path timers and counters
+        self._trace_recorder = TraceRecorder.get_instance()
+        self._perf_stats = PerfStats.get_instance()
+        # Per-frame metadata channel
+        self._metadata_channel = MetadataChannel.get_instance()
+        # Per-frame CPU budget of the behavior updates
+        self._budget_governor = FrameBudgetGovernor.get_instance()
 
     def on_shutdown(self):
         carb.log_info("[omni.anim.people_api] shutdown")
@@ -76,6 +102,20 @@ class Main(omni.ext.IExt):
 
         self._cmd_manager.shutdown()
         self._cmd_manager = None
+        self._budget_governor.destroy()
+        self._budget_governor = None
+        self._metadata_channel.destroy()
+        self._metadata_channel = None
+        self._perf_stats.destroy()
+        self._perf_stats = None
+        self._trace_recorder.destroy()
+        self._trace_recorder = None
+        # parsed command files shared by the agents
+        CommandFileLoader.destroy_instance()
+        # preloaded layers and warmed up assets of the characters
+        WarmupManager.destroy_instance()
+        self._people_settings.destroy()
+        self._people_settings = None
 
     def get_custom_command_manager(self):
         return self._cmd_manager
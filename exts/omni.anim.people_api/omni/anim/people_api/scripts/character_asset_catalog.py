@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+
+import carb
+import carb.tokens
+import omni.client
+
+
+class CharacterAssetCatalog:
+    """
+    Character folders of an asset root and the USD file of each folder.
+
+    The folders are resolved once per asset root and process. Catalogs are persisted to a local JSON cache keyed by the
+    asset root, with the modification stamps of the root and of each folder, so later processes list the asset root
+    once and only list again the folders whose own stamp changed. `refresh()` rebuilds the catalog from the asset
+    server.
+
+    `pick()` returns random folders without repetition until all the folders were picked, in constant time.
+    """
+
+    CACHE_VERSION = 1
+
+    # asset root -> catalog entry, shared by all the catalogs of the process
+    _memory_cache: dict[str, dict] = {}
+
+    def __init__(self, assets_root_path: str, excluded_folders=(), cache_path: str = ""):
+        self.assets_root_path = assets_root_path.rstrip("/")
+        self.excluded_folders = set(excluded_folders)
+        self.cache_path = carb.tokens.get_tokens_interface().resolve(cache_path) if cache_path else ""
+        # folder name -> USD path
+        self._usd_paths: dict[str, str] = {}
+        # folders not picked yet, in any order
+        self._pick_list: list[str] = []
+        self._is_loaded = False
+
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+    def __len__(self) -> int:
+        return len(self._usd_paths)
+
+    def __contains__(self, folder_name: str) -> bool:
+        return folder_name in self._usd_paths
+
+    def get_folder_names(self) -> list[str]:
+        return list(self._usd_paths)
+
+    def get_usd_path(self, folder_name: str) -> str | None:
+        return self._usd_paths.get(folder_name)
+
+    def pick(self, folder_name: str | None = None) -> tuple[str, str] | None:
+        """
+        return (folder name, USD path) of `folder_name` if the catalog has it, else of a random folder which was not
+        picked since all the folders were last picked
+        """
+        if not self._usd_paths:
+            return None
+        if folder_name not in self._usd_paths:
+            if not self._pick_list:
+                self._pick_list = list(self._usd_paths)
+            # swap the picked folder with the last one, so that it is removed in constant time
+            index = random.randrange(len(self._pick_list))
+            self._pick_list[index], self._pick_list[-1] = self._pick_list[-1], self._pick_list[index]
+            folder_name = self._pick_list.pop()
+        return folder_name, self._usd_paths[folder_name]
+
+    # ================ Loading ================
+
+    def load(self) -> bool:
+        """load the catalog from the memory or the file cache, or from the asset server"""
+        if self._is_loaded:
+            return bool(self._usd_paths)
+        entry = self._memory_cache.get(self.assets_root_path)
+        if entry is None:
+            # the stamp of the root doesn't change when a file of a folder is renamed, the folder stamps are checked
+            entry = self._build_entry(self._read_cache_entry(), omni.client.stat(self.assets_root_path))
+        return self._set_entry(entry)
+
+    async def load_async(self, max_concurrent_requests: int = 16) -> bool:
+        """`load()` which lists the character folders with parallel asset server requests"""
+        if self._is_loaded:
+            return bool(self._usd_paths)
+        entry = self._memory_cache.get(self.assets_root_path)
+        if entry is None:
+            entry = await self._build_entry_async(
+                self._read_cache_entry(), await omni.client.stat_async(self.assets_root_path), max_concurrent_requests
+            )
+        return self._set_entry(entry)
+
+    def refresh(self) -> bool:
+        """rebuild the catalog from the asset server"""
+        self._memory_cache.pop(self.assets_root_path, None)
+        self._is_loaded = False
+        return self._set_entry(self._build_entry(None, omni.client.stat(self.assets_root_path)))
+
+    def _set_entry(self, entry: dict | None) -> bool:
+        if entry is None:
+            return False
+        self._memory_cache[self.assets_root_path] = entry
+        self._usd_paths = {
+            folder_name: "{}/{}/{}".format(self.assets_root_path, folder_name, folder["usd"])
+            for folder_name, folder in entry["folders"].items()
+            if folder["usd"] and folder_name not in self.excluded_folders
+        }
+        self._pick_list = list(self._usd_paths)
+        self._is_loaded = True
+        return bool(self._usd_paths)
+
+    def _build_entry(self, previous_entry: dict | None, stat_result) -> dict | None:
+        entry, changed_folder_names = self._list_root(previous_entry, stat_result)
+        if entry is None:
+            return None
+        for folder_name in changed_folder_names:
+            folder_path = "{}/{}".format(self.assets_root_path, folder_name)
+            entry["folders"][folder_name]["usd"] = _find_usd(folder_path, *omni.client.list(folder_path))
+        if entry != previous_entry:
+            self._write_cache_entry(entry)
+        return entry
+
+    async def _build_entry_async(
+        self, previous_entry: dict | None, stat_result, max_concurrent_requests: int
+    ) -> dict | None:
+        entry, changed_folder_names = self._list_root(
+            previous_entry, stat_result, await omni.client.list_async(self.assets_root_path + "/")
+        )
+        if entry is None:
+            return None
+        semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+
+        async def get_usd(folder_name):
+            folder_path = "{}/{}".format(self.assets_root_path, folder_name)
+            async with semaphore:
+                return _find_usd(folder_path, *await omni.client.list_async(folder_path))
+
+        usd_files = await asyncio.gather(*(get_usd(folder_name) for folder_name in changed_folder_names))
+        for folder_name, usd_file in zip(changed_folder_names, usd_files):
+            entry["folders"][folder_name]["usd"] = usd_file
+        if entry != previous_entry:
+            self._write_cache_entry(entry)
+        return entry
+
+    def _list_root(self, previous_entry: dict | None, stat_result, list_result=None):
+        """new catalog entry with the unchanged folders of `previous_entry`, and the folders to list again"""
+        if list_result is None:
+            list_result = omni.client.list(self.assets_root_path + "/")
+        result, item_list = list_result
+        if result != omni.client.Result.OK:
+            carb.log_error("Unable to get character assets from provided asset root path.")
+            return None, []
+
+        root_result, root_entry = stat_result
+        previous_folders = previous_entry["folders"] if previous_entry else {}
+        entry = {"modified": _get_stamp(root_entry) if root_result == omni.client.Result.OK else "", "folders": {}}
+        changed_folder_names = []
+        for item in item_list:
+            # Prune items from folder list that are not directories.
+            if not (item.flags & omni.client.ItemFlags.CAN_HAVE_CHILDREN) or item.relative_path.startswith("."):
+                continue
+            folder_name = item.relative_path.rstrip("/")
+            if folder_name in self.excluded_folders:
+                continue
+            stamp = _get_stamp(item)
+            previous_folder = previous_folders.get(folder_name)
+            if previous_folder is not None and previous_folder["modified"] == stamp and previous_folder["usd"]:
+                entry["folders"][folder_name] = dict(previous_folder)
+            else:
+                entry["folders"][folder_name] = {"modified": stamp, "usd": None}
+                changed_folder_names.append(folder_name)
+        return entry, changed_folder_names
+
+    # ================ File cache ================
+
+    def _read_cache(self) -> dict:
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as file:
+                cache = json.load(file)
+        except (OSError, ValueError) as e:
+            carb.log_warn(f"Unable to read the character asset catalog cache {self.cache_path}: {e}")
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != self.CACHE_VERSION:
+            return {}
+        return cache
+
+    def _read_cache_entry(self) -> dict | None:
+        return self._read_cache().get("roots", {}).get(self.assets_root_path)
+
+    def _write_cache_entry(self, entry: dict):
+        if not self.cache_path:
+            return
+        cache = self._read_cache()
+        cache["version"] = self.CACHE_VERSION
+        cache.setdefault("roots", {})[self.assets_root_path] = entry
+        temp_path = self.cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(temp_path, "w") as file:
+                json.dump(cache, file, indent=1)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            carb.log_warn(f"Unable to write the character asset catalog cache {self.cache_path}: {e}")
+
+
+def _get_stamp(item) -> str:
+    modified_time = getattr(item, "modified_time", None)
+    return str(modified_time) if modified_time is not None else ""
+
+
+def _find_usd(folder_path: str, result, item_list) -> str | None:
+    if result != omni.client.Result.OK:
+        carb.log_error("Unable to read character folder path at {}".format(folder_path))
+        return None
+
+    for item in item_list:
+        if item.relative_path.endswith(".usd"):
+            return item.relative_path
+
+    carb.log_error("Unable to file a .usd file in {} character folder".format(folder_path))
+    return None
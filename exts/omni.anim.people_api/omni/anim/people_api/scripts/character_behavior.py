@@ -21,8 +21,15 @@ from omni.anim.people_api.python_ext import get_instance
 
 from omni.anim.people_api.scripts.custom_command.command_manager import *
 from omni.anim.people_api.scripts.custom_command.command_templates import *
+from omni.anim.people_api.scripts.command_file_loader import CommandFile, CommandFileChange, CommandFileLoader
+from omni.anim.people_api.scripts.frame_budget_governor import DeferrableWork, FrameBudgetGovernor
+from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
 from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+from omni.anim.people_api.scripts.metadata_channel import MetadataChannel
 from omni.anim.people_api.scripts.navigation_manager import NavigationManager
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+from omni.anim.people_api.scripts.people_logger import get_logger
+from omni.anim.people_api.scripts.simulation_checkpoint import capture_behavior_state, restore_behavior_state
 from omni.anim.people_api.settings import AgentEvent, PeopleSettings, TaskStatus
 from omni.kit.scripting import BehaviorScript
 
@@ -36,6 +43,8 @@ from .commands.goto_section import *
 from .commands.goto_object import *
 from .utils import Utils
 
+logger = get_logger(__name__)
+
 COMMAND_CALLBCAK_CHECKPOINT = "COMMAND_CALLBCAK_CHECKPOINT"
 
 
@@ -50,6 +59,7 @@ class CharacterBehavior(BehaviorScript):
         """
         self._overwrite_command_file = None
         self._overwrite_agent_name = None
+        self._parked = False
         self.renew_character_state()
 
     def on_play(self):
@@ -70,7 +80,11 @@ class CharacterBehavior(BehaviorScript):
         """
 
         self.current_command = None
+        self.stop_listening_command_file()
 
+        if self.character_name is not None:
+            self.metadata_channel.forget_agent(str(self.character_name))
+            self.budget_governor.forget_agent(str(self.prim_path))
         self.character_name = None
         if self.navigation_manager is not None:
             self.navigation_manager.destroy()
@@ -80,22 +94,55 @@ class CharacterBehavior(BehaviorScript):
             self.queue_manager.destroy()
             self.queue_manager = None
 
+    def reset_character(self, seed: int | None = None, position=None, rotation: float = 0.0, active: bool = True):
+        """
+        Resets the state of a pooled character, or of an active one on an episode reset, see CharacterSetup. The
+        character restarts its commands on the next update and, in runtime, is teleported to `position`; `seed` is
+        unused, the commands come from the command file. An inactive character is parked: it runs no commands until it
+        is reset again.
+        """
+        self.end_current_command(set_status=False)
+        if self.character_name is not None:
+            self.metadata_channel.forget_agent(str(self.character_name))
+            self.budget_governor.forget_agent(str(self.prim_path))
+        # the navigation manager is kept and reset in place by init_character()
+        navigation_manager = self.navigation_manager
+        # other agents must not avoid a parked character
+        GlobalCharacterPositionManager.get_instance().remove_character(str(self.prim_path))
+
+        # a parked character has already dropped its animation graph character
+        character = self.character or ag.get_character(str(self.prim_path))
+        self.renew_character_state()
+        self.navigation_manager = navigation_manager
+        if character is not None and position is not None:
+            character.set_world_transform(carb.Float3(*position), Utils.convert_angle_to_quatd(rotation))
+        self._parked = not active
+
+    def get_runtime_state(self) -> dict:
+        """
+        Runtime state of the character, saved by the checkpoints of CharacterSetup, see simulation_checkpoint.
+        """
+        return capture_behavior_state(self)
+
+    def set_runtime_state(self, state: dict) -> bool:
+        """
+        Restores a state of get_runtime_state(). Returns False when the character can't be initialized.
+        """
+        return restore_behavior_state(self, state)
+
     def renew_character_state(self):
         """
         Defines character variables and loads settings.
         """
-        self.setting = carb.settings.get_settings()
+        self.stop_listening_command_file()
+        self.people_settings = PeopleSettings.get_instance()
         if self._overwrite_command_file:
             self.command_path = self._overwrite_command_file
         else:
-            self.command_path = self.setting.get(PeopleSettings.COMMAND_FILE_PATH)
-        self.number_of_loop = self.setting.get_as_string(PeopleSettings.NUMBER_OF_LOOP)
-        if self.number_of_loop == "inf":
-            self.number_of_loop = math.inf
-        else:
-            self.number_of_loop = int(self.number_of_loop)
-        self.navmeshEnabled = self.setting.get(PeopleSettings.NAVMESH_ENABLED)
-        self.avoidanceOn = self.setting.get(PeopleSettings.DYNAMIC_AVOIDANCE_ENABLED)
+            self.command_path = self.people_settings.command_file_path
+        self.number_of_loop = self.people_settings.number_of_loop
+        self.navmeshEnabled = self.people_settings.navmesh_enabled
+        self.avoidanceOn = self.people_settings.dynamic_avoidance_enabled
         self.character_name = self.get_agent_name()
         carb.log_info("Character name is {}".format(self.character_name))
         self.character = None
@@ -105,11 +152,17 @@ class CharacterBehavior(BehaviorScript):
         self.navigation_manager = None
         self.queue_manager = None
         self.global_character_manager = None
+        self.metadata_channel = MetadataChannel.get_instance()
+        self.budget_governor = FrameBudgetGovernor.get_instance()
+        self.perf_stats = PerfStats.get_instance()
         self.in_queue = False
         self.commands = []
         self.interruptable = True
         # Inject command related
         self._command_callback_checkpoint: Dict[str, Callable[[str, str], None]] = {}
+        # GoTo back to the initial transform which closes the loop, and the pending command file request
+        self._origin_command = None
+        self._command_file_request = None
 
     # force the character to end current command
     def end_current_command(self, set_status: bool = True):
@@ -156,7 +209,7 @@ class CharacterBehavior(BehaviorScript):
             return self.overwrite_agent_name
         character_path = str(self.prim_path)
         split_path = character_path.split("/")
-        root_path = self.setting.get(PeopleSettings.CHARACTER_PRIM_PATH)
+        root_path = self.people_settings.character_prim_path
         # If a character is loaded through the spawn command, the commands for the character can be given by using the encompassing parent name.
         if character_path.startswith(str(root_path)):
             parent_len = len(root_path.split("/"))
@@ -190,31 +243,35 @@ class CharacterBehavior(BehaviorScript):
             return False
 
         self.custom_command_manager = get_instance().get_custom_command_manager()
-        self.navigation_manager = NavigationManager(
-            str(self.prim_path),
-            self.navmeshEnabled,
-            self.avoidanceOn,
-            character=self.character,
-        )
+        if self.navigation_manager is None:
+            self.navigation_manager = NavigationManager(
+                str(self.prim_path),
+                self.navmeshEnabled,
+                self.avoidanceOn,
+                character=self.character,
+                people_settings=self.people_settings,
+            )
+        else:
+            # kept by reset_character()
+            self.navigation_manager.reset(self.character, self.navmeshEnabled, self.avoidanceOn)
         self.queue_manager = GlobalQueueManager.get_instance()
         if not self.navigation_manager or not self.queue_manager:
             return False
 
-        # event for agent's register
-        self.commands = self.get_simulation_commands()
-
         # Store all registered custom commands beforehand
         self.custom_command_names = self.custom_command_manager.get_all_custom_command_names()
 
-        # Prepare loop command
-        if self.number_of_loop > 0:
-            # Character go to original spot to form the loop
-            originPos, originRot = Utils.get_character_transform(self.character)
-            originAngle = Utils.convert_to_angle(originRot)
-            self.commands.append(
-                (None, ["GoTo", str(originPos[0]), str(originPos[1]), str(originPos[2]), str(originAngle)])
-            )
-            self.loop_commands = self.commands.copy()
+        # Character go to original spot to form the loop
+        originPos, originRot = Utils.get_character_transform(self.character)
+        originAngle = Utils.convert_to_angle(originRot)
+        self._origin_command = (
+            None,
+            ["GoTo", str(originPos[0]), str(originPos[1]), str(originPos[2]), str(originAngle)],
+        )
+
+        # The character starts with an empty queue while the command file loads, see CommandFileLoader
+        self.commands = []
+        self.request_command_file()
 
         self.character.set_variable("Action", "None")
         carb.log_info("Initialize the character")
@@ -227,9 +284,8 @@ class CharacterBehavior(BehaviorScript):
         command_info = {}
         if current_command is not None:
             command_info = current_command.fetch_command_info()
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
-            event_name=AgentEvent.CommandStartEvent, payload=command_info
-        )
+        self.budget_governor.dispatch_event(event_name=AgentEvent.CommandStartEvent, payload=command_info)
+        self.perf_stats.mark("command.start", agent=self.character_name, command=command_info.get("command_name"))
         carb.log_info(
             "create event: -- command start with command info: {command_info}".format(command_info=str(command_info))
         )
@@ -245,52 +301,91 @@ class CharacterBehavior(BehaviorScript):
         if status is not None:
             command_info["status"] = status
 
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
-            event_name=AgentEvent.CommandEndEvent, payload=command_info
-        )
+        self.budget_governor.dispatch_event(event_name=AgentEvent.CommandEndEvent, payload=command_info)
+        self.perf_stats.mark("command.end", agent=self.character_name, command=command_info.get("command_name"))
         carb.log_info(
             "create event: -- command end with command info: {command_info}".format(command_info=str(command_info))
         )
 
     def set_metadata_callback(self, agent_name: str, data_name: str, data_value: str):
-        """submit event to update character's metadata info"""
-        # check whether the metadata need to be cached every frame:
-        cache_metadata = carb.settings.get_settings().get(PeopleSettings.CACHE_ACTION_METADATA)
-        if not cache_metadata:
-            return
+        """submit character's metadata info, changes are dispatched once per frame by the metadata channel"""
+        self.metadata_channel.submit(agent_name, data_name, data_value)
 
-        # compose nucessary information to update the metadata info:
-        agent_metadata_info = {"agent_name": agent_name, "data_name": data_name, "data_value": data_value}
-        # dispatch the event to update character metadata.
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
-            event_name=AgentEvent.MetadataUpdateEvent, payload=agent_metadata_info
-        )
-        pass
-
-    def read_commands_from_file(self):
+    def request_command_file(self):
         """
-        Reads commands from file pointed by self.command_path. Creates a Queue using queue manager if a queue is specified.
-        :return: List of commands.
-        :rtype: python list
+        Requests the command file pointed by self.command_path. The commands are added right away when the file is
+        already loaded, else they are appended when its async load completes.
         """
         if not self.command_path:
             carb.log_warn("Command file field is empty.")
-            return []
-        result, version, context = omni.client.read_file(self.command_path)
-        if result != omni.client.Result.OK:
-            carb.log_error("Unable to read command file at {}.".format(self.command_path))
-            return []
-
-        cmd_lines = memoryview(context).tobytes().decode("utf-8").splitlines()
-        return cmd_lines
-
-    def get_combined_user_commands(self):
-        cmd_lines = []
-
-        # Get commands from cmd_file
-        cmd_lines.extend(self.read_commands_from_file())
+            self.add_file_commands(None)
+            return
+        self.stop_listening_command_file()
+        command_path = self.command_path
+        # a request made before a reset of the character is stale
+        request = self._command_file_request = object()
+
+        def on_loaded(command_file: CommandFile):
+            if self._command_file_request is request and self.character is not None:
+                self.add_file_commands(command_file)
+
+        def on_failed():
+            # like an empty command file, the reloads of the file are applied to the character
+            if self._command_file_request is request and self.character is not None:
+                self.add_file_commands(None)
+
+        command_file_loader = CommandFileLoader.get_instance()
+        command_file = command_file_loader.request(command_path, on_loaded, on_failed)
+        if command_file is not None:
+            self.add_file_commands(command_file)
+        # apply the edits of the file, see PeopleSettings.COMMAND_FILE_WATCH_ENABLED
+        command_file_loader.add_listener(command_path, self.on_command_file_changed)
+        self._listened_command_path = command_path
+
+    def stop_listening_command_file(self):
+        command_path = getattr(self, "_listened_command_path", None)
+        if command_path is not None:
+            CommandFileLoader.get_instance().remove_listener(command_path, self.on_command_file_changed)
+            self._listened_command_path = None
+
+    def on_command_file_changed(self, command_file: CommandFile, changes: dict[str, CommandFileChange]):
+        """
+        Applies the reloaded command file when the commands of this character changed. Added commands are appended
+        to the queue like inject_command(), else the queue is replaced like replace_command(). The other characters
+        are untouched.
+        """
+        change = changes.get(str(self.character_name))
+        if change is None or self.character is None or self._command_file_request is not None:
+            return
+        file_commands = self.get_simulation_commands(command_file)
+        command_lines = [" ".join([str(self.character_name)] + command) for command in change.commands]
+        loop_enabled = self.number_of_loop > 0
+        if change.kind == CommandFileChange.APPEND:
+            # the added commands run before going back to the loop origin
+            origin_pending = loop_enabled and bool(self.commands) and self.commands[-1] == self._origin_command
+            if origin_pending:
+                self.commands.pop()
+            self.inject_command(command_lines, executeImmediately=False)
+            if origin_pending:
+                self.commands.append(self._origin_command)
+        else:
+            self.replace_command(command_lines)
+            if loop_enabled:
+                self.commands.append(self._origin_command)
+        if loop_enabled:
+            self.loop_commands = file_commands + [self._origin_command]
 
-        return cmd_lines
+    def add_file_commands(self, command_file: CommandFile | None):
+        """
+        Appends the commands of the character in the command file after the injected ones, creates the queues of the
+        file and prepares the loop commands.
+        """
+        self._command_file_request = None
+        commands = self.get_simulation_commands(command_file)
+        if self.number_of_loop > 0:
+            commands.append(self._origin_command)
+            self.loop_commands = commands.copy()
+        self.commands.extend(commands)
 
     # convert command string to command list. split character name, command name, and command parameters
     def convert_str_to_command(self, cmd_line):
@@ -317,18 +412,16 @@ class CharacterBehavior(BehaviorScript):
 
         return None
 
-    # get simulation commands from both UI and command file
-    def get_simulation_commands(self):
-        """get simulation command from string files"""
-        cmd_lines = self.get_combined_user_commands()
-        commands = []
-        for cmd_line in cmd_lines:
-            command = self.convert_str_to_command(cmd_line)
-            if command is not None:
-                command_pair = (None, command)
-                commands.append(command_pair)
-
-        return commands
+    # get simulation commands from the parsed command file
+    def get_simulation_commands(self, command_file: CommandFile | None = None):
+        """get simulation command of the character from a command file, and create the queues of the file"""
+        if command_file is None:
+            return []
+        for queue_name, spots in command_file.queues.items():
+            queue = self.queue_manager.create_queue(queue_name)
+            for index, position, angle in spots:
+                queue.create_spot(index, carb.Float3(*position), Utils.convert_angle_to_quatd(angle))
+        return [(None, list(command)) for command in command_file.get_agent_commands(str(self.character_name))]
 
     # get character's position
     def get_current_position(self):
@@ -367,7 +460,7 @@ class CharacterBehavior(BehaviorScript):
             # append command list at the end of the command array
             self.commands.extend(cmd_array)
 
-        carb.log_warn(f"After command injection, commands for {self.character_name} are: {self.commands}")
+        logger.debug("After command injection, commands for %s are: %s", self.character_name, self.commands)
 
     # Replace all commands in character's command list
     def replace_command(self, command_list, on_finished: Tuple[str, Callable[[str, str], None]] = None):
@@ -400,7 +493,7 @@ class CharacterBehavior(BehaviorScript):
         self.end_current_command()
         self.current_command = None
 
-        carb.log_warn(f"After command replacement, commands for {self.character_name} are: {self.commands}")
+        logger.debug("After command replacement, commands for %s are: %s", self.character_name, self.commands)
 
     def handle_command_list(self, command_list):
         """Convert command list into id-command pair"""
@@ -441,6 +534,7 @@ class CharacterBehavior(BehaviorScript):
             "navigation_manager": self.navigation_manager,
             "command_id": command_id,
             "update_metadata_callback_fn": self.set_metadata_callback,
+            "people_settings": self.people_settings,
             # "character_prim_path":self.prim_path,
         }
         # if the command is not valid, return None
@@ -504,9 +598,23 @@ class CharacterBehavior(BehaviorScript):
         :param list[list] commands: list of commands.
         :param float delta_time: time elapsed since last execution.
         """
+        # the kinematic mode splits long frames, so that commands pass through the same states as in real time
+        max_step = self.people_settings.kinematic_max_step if self.people_settings.kinematic_enabled else 0.0
+        if max_step <= 0.0 or delta_time <= max_step:
+            self.execute_command_step(commands, delta_time)
+            return
+        step_count = math.ceil(delta_time / max_step)
+        for _ in range(step_count):
+            self.execute_command_step(commands, delta_time / step_count)
+
+    def execute_command_step(self, commands, delta_time):
+        """run the current command once, starting the next command first if there is none"""
         while not self.current_command:
             if not commands:
                 return
+            # a new command requests its path when it starts, which can be postponed when the frame is over budget
+            if not self.budget_governor.should_run(str(self.prim_path), DeferrableWork.PATH_REQUEST):
+                return
             next_cmd = self.get_command(commands[0])
             if next_cmd:
                 self.current_command = next_cmd
@@ -516,7 +624,14 @@ class CharacterBehavior(BehaviorScript):
                 commands.pop(0)  # Skip the command that cannot be executed
 
         try:
-            if self.current_command.execute(delta_time):
+            # the first execution of a command runs its setup, where paths are requested
+            with self.perf_stats.scope(
+                "command.execute" if self.current_command.is_setup else "command.setup",
+                agent=self.character_name,
+                command=self.current_command.get_command_name(),
+            ):
+                command_finished = self.current_command.execute(delta_time)
+            if command_finished:
 
                 if self.current_command.get_command_name() == "QueueCmd":
                     # check whether character has occupied a spot in the queue
@@ -547,21 +662,30 @@ class CharacterBehavior(BehaviorScript):
         :param float current_time: current time in seconds.
         :param float delta_time: time elapsed since last update.
         """
-        if self.character is None:
-            if not self.init_character():
-                return
-            else:
-                # Once character is initialized correctly, register the agent to the AgentManager
-                self.register_to_agent_manager()
-
-        if self.navigation_manager and self.avoidanceOn:
-            self.navigation_manager.publish_character_positions(delta_time, 0.5)
-
-        if self.commands:
-            self.execute_command(self.commands, delta_time)
-        elif self.number_of_loop > self.loop_commands_count and self.loop_commands:
-            self.commands = self.loop_commands.copy()
-            self.loop_commands_count += 1
+        if self._parked:
+            return
+        update_start = self.budget_governor.begin_update()
+        try:
+            if self.character is None:
+                if not self.init_character():
+                    return
+                else:
+                    # Once character is initialized correctly, register the agent to the AgentManager
+                    self.register_to_agent_manager()
+
+            if self.navigation_manager and self.avoidanceOn:
+                self.navigation_manager.publish_character_positions(delta_time, 0.5)
+
+            if self.commands:
+                with self.perf_stats.scope("behavior.execute_command", agent=self.character_name):
+                    self.execute_command(self.commands, delta_time)
+            elif self.number_of_loop > self.loop_commands_count and self.loop_commands:
+                self.commands = self.loop_commands.copy()
+                self.loop_commands_count += 1
+        finally:
+            self.perf_stats.add_time(
+                "behavior.on_update", self.budget_governor.end_update(update_start), agent=self.character_name
+            )
 
     def check_interruptable(self):
         return self.interruptable
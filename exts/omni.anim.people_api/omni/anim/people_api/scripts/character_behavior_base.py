@@ -25,9 +25,15 @@ import omni.anim.navigation.core as nav
 from omni.anim.people_api.scripts.custom_command.command_manager import CustomCommandManager
 from omni.anim.people_api.scripts.custom_command.defines import CustomCommandTemplate
 from omni.anim.people_api.scripts.custom_command.command_templates import *
+from omni.anim.people_api.scripts.frame_budget_governor import DeferrableWork, FrameBudgetGovernor
+from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
 from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+from omni.anim.people_api.scripts.metadata_channel import MetadataChannel
 from omni.anim.people_api.scripts.navigation_manager import NavigationManager
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+from omni.anim.people_api.scripts.people_logger import get_logger
 from omni.anim.people_api.scripts.seed_manager import CharacterSeedRegistry
+from omni.anim.people_api.scripts.simulation_checkpoint import capture_behavior_state, restore_behavior_state
 from omni.anim.people_api.settings import AgentEvent, PeopleSettings, TaskStatus
 from omni.kit.scripting import BehaviorScript
 from pxr import Sdf
@@ -44,6 +50,8 @@ from .utils import Utils
 
 COMMAND_CALLBCAK_CHECKPOINT = "COMMAND_CALLBCAK_CHECKPOINT"
 
+logger = get_logger(__name__)
+
 
 class CharacterBehaviorBase(BehaviorScript, ABC):
     """
@@ -77,6 +85,7 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         """
         self._overwrite_command_file = None
         self._overwrite_agent_name = None
+        self._parked = False
         self.renew_character_state()
 
     def on_play(self):
@@ -100,6 +109,9 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
 
         self.current_command = None
 
+        if self.character_name is not None:
+            self.metadata_channel.forget_agent(str(self.character_name))
+            self.budget_governor.forget_agent(str(self.prim_path))
         self.character_name = None
         if self.navigation_manager is not None:
             self.navigation_manager.destroy()
@@ -109,29 +121,62 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
             self.queue_manager.destroy()
             self.queue_manager = None
 
+    def reset_character(self, seed: int | None = None, position=None, rotation: float = 0.0, active: bool = True):
+        """
+        Resets the state of a pooled character, or of an active one on an episode reset, see CharacterSetup. The
+        character restarts its commands on the next update, with its random generator reseeded with `seed` and, in
+        runtime, teleported to `position`. An inactive character is parked: it runs no commands until it is reset
+        again.
+        """
+        self.end_current_command(set_status=False)
+        if self.character_name is not None:
+            self.metadata_channel.forget_agent(str(self.character_name))
+            self.budget_governor.forget_agent(str(self.prim_path))
+        # the navigation manager is kept and reset in place by init_character()
+        navigation_manager = self.navigation_manager
+        # other agents must not avoid a parked character
+        GlobalCharacterPositionManager.get_instance().remove_character(str(self.prim_path))
+
+        # a parked character has already dropped its animation graph character
+        character = self.character or ag.get_character(str(self.prim_path))
+        self.renew_character_state()
+        self.navigation_manager = navigation_manager
+        if seed is not None:
+            self.random = random.Random(seed)
+        if character is not None and position is not None:
+            character.set_world_transform(carb.Float3(*position), Utils.convert_angle_to_quatd(rotation))
+        self._parked = not active
+
+    def get_runtime_state(self) -> dict:
+        """
+        Runtime state of the character, saved by the checkpoints of CharacterSetup, see simulation_checkpoint.
+        """
+        return capture_behavior_state(self)
+
+    def set_runtime_state(self, state: dict) -> bool:
+        """
+        Restores a state of get_runtime_state(). Returns False when the character can't be initialized.
+        """
+        return restore_behavior_state(self, state)
+
     def renew_character_state(self):
         """
         Defines character variables and loads settings.
         """
         self._update_error_logged = False
-        self.setting = carb.settings.get_settings()
+        self.people_settings = PeopleSettings.get_instance()
 
         if self._overwrite_command_file:
             self.command_path = self._overwrite_command_file
         else:
-            self.command_path = self.setting.get(PeopleSettings.COMMAND_FILE_PATH)
+            self.command_path = self.people_settings.command_file_path
 
-        self.number_of_loop = self.setting.get_as_string(PeopleSettings.NUMBER_OF_LOOP)
+        self.number_of_loop = self.people_settings.number_of_loop
+        self.navmeshEnabled = self.people_settings.navmesh_enabled
 
-        if self.number_of_loop == "inf":
-            self.number_of_loop = math.inf
-        else:
-            self.number_of_loop = int(self.number_of_loop)
-        self.navmeshEnabled = self.setting.get(PeopleSettings.NAVMESH_ENABLED)
-
-        self.avoidanceOn = self.setting.get(PeopleSettings.DYNAMIC_AVOIDANCE_ENABLED)
-        self.idle_duration_min = float(self.setting.get(PeopleSettings.IDLE_DURATION_MIN) or 1.0)
-        self.idle_duration_max = float(self.setting.get(PeopleSettings.IDLE_DURATION_MAX) or 3.0)
+        self.avoidanceOn = self.people_settings.dynamic_avoidance_enabled
+        self.idle_duration_min = self.people_settings.idle_duration_min or 1.0
+        self.idle_duration_max = self.people_settings.idle_duration_max or 3.0
         self.character_name = self.get_agent_name()
         carb.log_info(f"Character name is {self.character_name}")
         self.character = None
@@ -143,6 +188,9 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         self.navigation_manager = None
         self.queue_manager = None
         self.global_character_manager = None
+        self.metadata_channel = MetadataChannel.get_instance()
+        self.budget_governor = FrameBudgetGovernor.get_instance()
+        self.perf_stats = PerfStats.get_instance()
 
         self.in_queue = False
         self.commands = []
@@ -203,7 +251,7 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
             return self.overwrite_agent_name
         character_path = str(self.prim_path)
         split_path = character_path.split("/")
-        root_path = self.setting.get(PeopleSettings.CHARACTER_PRIM_PATH)
+        root_path = self.people_settings.character_prim_path
 
         # If a character is loaded through the spawn command,
         # the commands for the character can be given by
@@ -240,12 +288,17 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
             return False
 
         self.custom_command_manager = CustomCommandManager.get_instance()
-        self.navigation_manager = NavigationManager(
-            str(self.prim_path),
-            self.navmeshEnabled,
-            self.avoidanceOn,
-            character=self.character,
-        )
+        if self.navigation_manager is None:
+            self.navigation_manager = NavigationManager(
+                str(self.prim_path),
+                self.navmeshEnabled,
+                self.avoidanceOn,
+                character=self.character,
+                people_settings=self.people_settings,
+            )
+        else:
+            # kept by reset_character()
+            self.navigation_manager.reset(self.character, self.navmeshEnabled, self.avoidanceOn)
         self.queue_manager = GlobalQueueManager.get_instance()
         if not self.navigation_manager or not self.queue_manager:
             return False
@@ -277,10 +330,11 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         command_info = {}
         if current_command is not None:
             command_info = current_command.fetch_command_info()
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
+        self.budget_governor.dispatch_event(
             event_name=AgentEvent.CommandStartEvent,
             payload=command_info,
         )
+        self.perf_stats.mark("command.start", agent=self.character_name, command=command_info.get("command_name"))
         carb.log_info("create event: -- " f"command start with command info: {str(command_info)}")
 
     def subscription_to_command_end(self, current_command: Command, status: str | None = None):
@@ -294,25 +348,13 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         if status is not None:
             command_info["status"] = status
 
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
-            event_name=AgentEvent.CommandEndEvent, payload=command_info
-        )
+        self.budget_governor.dispatch_event(event_name=AgentEvent.CommandEndEvent, payload=command_info)
+        self.perf_stats.mark("command.end", agent=self.character_name, command=command_info.get("command_name"))
         carb.log_info("create event: -- command end with command " f"info: {str(command_info)}")
 
     def set_metadata_callback(self, agent_name: str, data_name: str, data_value: str):
-        """submit event to update character's metadata info"""
-        # check whether the metadata need to be cached every frame:
-        cache_metadata = carb.settings.get_settings().get(PeopleSettings.CACHE_ACTION_METADATA)
-        if not cache_metadata:
-            return
-
-        # compose nucessary information to update the metadata info:
-        agent_metadata_info = {"agent_name": agent_name, "data_name": data_name, "data_value": data_value}
-        # dispatch the event to update character metadata.
-        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
-            event_name=AgentEvent.MetadataUpdateEvent, payload=agent_metadata_info
-        )
-        pass
+        """submit character's metadata info, changes are dispatched once per frame by the metadata channel"""
+        self.metadata_channel.submit(agent_name, data_name, data_value)
 
     # Removed following method in Isaac Sim 5.0.0
     #   ''read_commands_from_file', 'get_combined_user_commands'
@@ -409,7 +451,7 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
             # append command list at the end of the command array
             self.commands.extend(cmd_array)
 
-        carb.log_warn("After command injection, " f"commands for {self.character_name} are: {self.commands}")
+        logger.debug("After command injection, commands for %s are: %s", self.character_name, self.commands)
 
     # Replace all commands in a character's command list
     def replace_command(self, command_list, on_finished: Tuple[str, Callable[[str, str], None]] = None):
@@ -447,7 +489,7 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         self.end_current_command()
         self.current_command = None
 
-        carb.log_warn("After command replacement, " f"commands for {self.character_name} are: {self.commands}")
+        logger.debug("After command replacement, commands for %s are: %s", self.character_name, self.commands)
 
     def handle_command_list(self, command_list):
         """Convert command list into id-command pair"""
@@ -491,6 +533,7 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
             "navigation_manager": self.navigation_manager,
             "command_id": command_id,
             "update_metadata_callback_fn": self.set_metadata_callback,
+            "people_settings": self.people_settings,
             # "character_prim_path":self.prim_path,
         }
 
@@ -556,9 +599,23 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         :param list[list] commands: list of commands.
         :param float delta_time: time elapsed since last execution.
         """
+        # the kinematic mode splits long frames, so that commands pass through the same states as in real time
+        max_step = self.people_settings.kinematic_max_step if self.people_settings.kinematic_enabled else 0.0
+        if max_step <= 0.0 or delta_time <= max_step:
+            self.execute_command_step(commands, delta_time)
+            return
+        step_count = math.ceil(delta_time / max_step)
+        for _ in range(step_count):
+            self.execute_command_step(commands, delta_time / step_count)
+
+    def execute_command_step(self, commands, delta_time):
+        """run the current command once, starting the next command first if there is none"""
         while not self.current_command:
             if not commands:
                 return
+            # a new command requests its path when it starts, which can be postponed when the frame is over budget
+            if not self.budget_governor.should_run(str(self.prim_path), DeferrableWork.PATH_REQUEST):
+                return
             next_cmd = self.get_command(commands[0])
             if next_cmd:
                 self.current_command = next_cmd
@@ -568,7 +625,14 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
                 commands.pop(0)  # Skip the command that cannot be executed
 
         try:
-            if self.current_command.execute(delta_time):
+            # the first execution of a command runs its setup, where paths are requested
+            with self.perf_stats.scope(
+                "command.execute" if self.current_command.is_setup else "command.setup",
+                agent=self.character_name,
+                command=self.current_command.get_command_name(),
+            ):
+                command_finished = self.current_command.execute(delta_time)
+            if command_finished:
 
                 if self.current_command.get_command_name() == "QueueCmd":
                     # check whether character has occupied a spot in the queue
@@ -601,6 +665,9 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
         :param float current_time: current time in seconds.
         :param float delta_time: time elapsed since last update.
         """
+        if self._parked:
+            return
+        update_start = self.budget_governor.begin_update()
         try:
             if self.character is None:
                 if not self.init_character():
@@ -613,7 +680,8 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
                 self.navigation_manager.publish_character_positions(delta_time, 0.5)
 
             if self.commands:
-                self.execute_command(self.commands, delta_time)
+                with self.perf_stats.scope("behavior.execute_command", agent=self.character_name):
+                    self.execute_command(self.commands, delta_time)
             elif self.number_of_loop > self.loop_commands_count and self.loop_commands:
                 self.commands = self.loop_commands.copy()
                 self.loop_commands_count += 1
@@ -623,6 +691,10 @@ class CharacterBehaviorBase(BehaviorScript, ABC):
                     f"CharacterBehaviorBase update failed for {self.prim_path}:\n{traceback.format_exc()}"
                 )
                 self._update_error_logged = True
+        finally:
+            self.perf_stats.add_time(
+                "behavior.on_update", self.budget_governor.end_update(update_start), agent=self.character_name
+            )
 
     def check_interruptable(self):
         return self.interruptable
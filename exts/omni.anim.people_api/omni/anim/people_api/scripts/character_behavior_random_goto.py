@@ -17,6 +17,14 @@ _navmesh_cache_initialized = False
 _navmesh_cache_size = 200  # Pre-compute this many positions
 
 
+def reset_position_cache():
+    """Drop the cached NavMesh positions, e.g. after the NavMesh changed."""
+    global _navmesh_position_cache, _navmesh_cache_index, _navmesh_cache_initialized
+    _navmesh_position_cache = []
+    _navmesh_cache_index = 0
+    _navmesh_cache_initialized = False
+
+
 class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
     """
     Character controller class that randomly generates a navigation path for the character to follow.
@@ -33,6 +41,12 @@ class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
     # Throttle NavMesh queries - only regenerate destinations after this many seconds
     MIN_COMMAND_INTERVAL = 2.0  # seconds between destination changes
 
+    # Disk the destinations are picked in, set by the PopulationStreamer; None picks them on the whole NavMesh
+    roam_area = None
+
+    # Samples of the roam area before idling, as the sampled point may be off the NavMesh
+    ROAM_SAMPLE_ATTEMPTS = 5
+
     def on_update(self, current_time: float, delta_time: float):
         """Override update to regenerate commands instead of looping old ones.
 
@@ -41,6 +55,8 @@ class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
 
         OPTIMIZED: Throttles position publishing to reduce per-frame overhead.
         """
+        if self._parked:
+            return
         try:
             if self.character is None:
                 if not self.init_character():
@@ -48,16 +64,17 @@ class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
                 # Once character is initialized correctly,
                 # register the agent to the AgentManager
                 self.register_to_agent_manager()
-                # Initialize timing for throttling
-                self._last_position_publish_time = 0.0
+                # Initialize timing for throttling, the position is published on the first update so that
+                # collision checks of other agents find it
                 self._position_publish_interval = 0.2  # Publish every 200ms instead of every frame
+                self._last_position_publish_time = self._position_publish_interval
 
             # OPTIMIZED: Throttle position publishing (every 200ms instead of every frame)
             # This reduces NavMesh queries for dynamic avoidance
             if self.navigation_manager and self.avoidanceOn:
                 if not hasattr(self, '_last_position_publish_time'):
-                    self._last_position_publish_time = 0.0
                     self._position_publish_interval = 0.2
+                    self._last_position_publish_time = self._position_publish_interval
 
                 self._last_position_publish_time += delta_time
                 if self._last_position_publish_time >= self._position_publish_interval:
@@ -84,6 +101,51 @@ class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
                 )
                 self._update_error_logged = True
 
+    def get_runtime_state(self) -> dict:
+        state = super().get_runtime_state()
+        state["last_position_publish_time"] = getattr(self, "_last_position_publish_time", None)
+        # shared by all the characters, every state restores the same index
+        state["navmesh_cache_index"] = _navmesh_cache_index
+        return state
+
+    def set_runtime_state(self, state: dict) -> bool:
+        global _navmesh_cache_index
+        if not super().set_runtime_state(state):
+            return False
+        if state["last_position_publish_time"] is not None:
+            self._position_publish_interval = getattr(self, "_position_publish_interval", 0.2)
+            self._last_position_publish_time = state["last_position_publish_time"]
+        _navmesh_cache_index = state["navmesh_cache_index"]
+        return True
+
+    def set_roam_area(self, roam_area):
+        """Pick the destinations in `roam_area`, which has a `center` and a `radius`, or anywhere when None.
+
+        An initialized character drops its current destination and gets new commands.
+        """
+        self.roam_area = roam_area
+        if roam_area is not None and self.character is not None and not self._parked:
+            self.end_current_command(set_status=False)
+            self.current_command = None
+            self.commands = self.get_simulation_commands()
+
+    def _get_roam_destination(self):
+        """Random NavMesh point of the roam area, None when the closest NavMesh point is outside of it."""
+        center = self.roam_area.center
+        radius = self.roam_area.radius
+        angle = self.random.uniform(0, 2 * math.pi)
+        distance = radius * math.sqrt(self.random.random())
+        query_point = carb.Float3(
+            center[0] + distance * math.cos(angle), center[1] + distance * math.sin(angle), center[2]
+        )
+        result = self.navmesh.query_closest_point(query_point, agent_radius=0.5)
+        if result is None:
+            return None
+        closest_point = result[0] if isinstance(result, tuple) else result
+        if math.hypot(closest_point[0] - center[0], closest_point[1] - center[1]) > radius:
+            return None
+        return carb.Float3(closest_point[0], closest_point[1], closest_point[2])
+
     def get_simulation_commands(self):
         """OPTIMIZED: Uses cached positions and skips expensive path validation.
 
@@ -103,9 +165,20 @@ class CharacterBehaviorRandomGoto(behavior_base.CharacterBehaviorBase):
             self._initialize_position_cache()
 
         random_point = None
+        if self.roam_area is not None:
+            # Streamed character, stay around the focus of the PopulationStreamer
+            for _ in range(self.ROAM_SAMPLE_ATTEMPTS):
+                random_point = self._get_roam_destination()
+                if random_point is not None:
+                    break
 
         # Try to get a position from cache first (no NavMesh query needed)
-        if _navmesh_position_cache:
+        if random_point is not None:
+            logger.debug("Using roam area position: %s", random_point)
+        elif self.roam_area is not None:
+            # The cache spans the whole NavMesh, a streamed character idles in its area instead
+            logger.debug("No NavMesh point found in the roam area")
+        elif _navmesh_position_cache:
             # Use round-robin from cache for variety
             cache_idx = _navmesh_cache_index % len(_navmesh_position_cache)
             _navmesh_cache_index += 1
@@ -6,10 +6,12 @@
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
-from typing import Optional
+from typing import Callable, Optional
+import asyncio
 import logging
 import math
 import random
+import time
 import uuid
 from collections import UserDict
 from dataclasses import dataclass
@@ -24,13 +26,24 @@ import omni.kit.app
 import omni.usd
 import omni.client
 from omni.anim.people_api import PeopleSettings
+from omni.anim.people_api.scripts.character_asset_catalog import CharacterAssetCatalog
+from omni.anim.people_api.scripts.character_snapshot import CharacterSnapshot, decode_snapshot, encode_snapshot
+from omni.anim.people_api.scripts.crowd_state import CrowdState, CrowdStateCache
 from omni.anim.people_api.scripts.custom_command.populate_anim_graph import populate_anim_graph
 from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+from omni.anim.people_api.scripts.interactable_object_helper import InteractableObjectHelper
+from omni.anim.people_api.scripts.perf_stats import timed
+from omni.anim.people_api.scripts.robot_contact_monitor import RobotContactMonitor
+from omni.anim.people_api.scripts.simulation_checkpoint import SimulationCheckpoint
+from omni.anim.people_api.scripts.spawn_sampler import SpawnSampler
+from omni.anim.people_api.scripts.warmup_manager import WarmupManager
 from isaacsim.core.api import SimulationContext
 from isaacsim.core.utils import prims
 from isaacsim.storage.native import get_assets_root_path
 from omni.kit.scripting import ScriptManager
-from pxr import Gf, Sdf, UsdGeom
+from omni.metropolis.utils.simulation_util import SimulationUtil
+from pxr import Gf, Sdf, Usd, UsdGeom
 from pydantic import BaseModel, ValidationError
 
 from omni.anim.people_api.scripts.character_behavior_base import CharacterSeedRegistry
@@ -43,14 +56,21 @@ class ObservableDict(UserDict):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._modified = False
+        # keys set to a new value and keys deleted since clear_changes(), for the delta snapshots
+        self._changed_keys = set()
+        self._removed_keys = set()
 
     def __setitem__(self, key, value):
         if self.data.get(key) != value:
             self._modified = True
+            self._changed_keys.add(key)
+            self._removed_keys.discard(key)
         super().__setitem__(key, value)
 
     def __delitem__(self, key):
         self._modified = True
+        self._changed_keys.discard(key)
+        self._removed_keys.add(key)
         super().__delitem__(key)
 
     def clear_modified(self):
@@ -59,6 +79,14 @@ class ObservableDict(UserDict):
     def is_modified(self):
         return self._modified
 
+    def get_changes(self) -> tuple[set, set]:
+        """keys changed and keys removed since clear_changes()"""
+        return set(self._changed_keys), set(self._removed_keys)
+
+    def clear_changes(self):
+        self._changed_keys.clear()
+        self._removed_keys.clear()
+
 
 @dataclass
 class CharacterBehaviorData:
@@ -66,6 +94,14 @@ class CharacterBehaviorData:
     script_path: str
 
 
+@dataclass
+class PooledCharacter:
+    name: str
+    usd_path: str
+    behavior: str
+    skel_root_path: str
+
+
 class CharacterBehavior(Enum):
     RANDOM_GOTO = CharacterBehaviorData(
         "RandomGoto",
@@ -109,8 +145,24 @@ class CharacterSetup:
     Character setup class that handles character initialization, loading, and removal.
     Unlike the 'omni.anim.people' extension, this class exposes the character setup as an API,
     not an UI.
+    The `*_async` loaders prefetch the asset listings in parallel and spread the character creation over several
+    frames, so spawning a crowd does not stall the app.
+    When `PeopleSettings.POOL_ENABLED` is set, removed characters are hidden and parked in a pool instead of deleted,
+    and the next loads reuse them: they are teleported, reseeded and their behavior is reset, without loading their
+    payload or reloading scripts again. `clear_character_pool()` deletes the pooled characters.
+    `reset_episode()` restarts the loaded characters in place, e.g. between the episodes of a training loop.
+    `export_character_snapshot()` saves the characters as a compact binary snapshot, or as a delta holding only the
+    characters changed since the previous snapshot, and `import_character_snapshot()` applies it to the loaded
+    characters instead of rebuilding them.
+    `save_checkpoint()` also saves the runtime state of the behaviors and of the shared managers, and
+    `restore_checkpoint()` puts the crowd back in that state, e.g. to branch several rollouts from one warmed-up crowd.
+    With `is_warmup`, each character asset is run once with the animation graph before the crowd is loaded. The
+    `WarmupManager` remembers the warmed up assets, so the later setups of the process only warm up the new ones.
     """
 
+    # character asset USD path -> path of its SkelRoot relative to the character prim
+    _skel_root_relative_paths: dict[str, Sdf.Path] = {}
+
     def __init__(
         self,
         robot_prim_path: str,
@@ -125,31 +177,43 @@ class CharacterSetup:
         self.default_biped_asset_name = "biped_demo"
         # Root path of character assets
         self.assets_root_path = ""
-        # List to track characters that are available for Spawning.
-        self.available_character_list = None
+        # Character folders of the assets root, which also tracks the characters available for spawning
+        self.asset_catalog = None
+        # asyncio task of the running async load and the characters it created so far, see cancel_loading()
+        self._loading_task = None
+        self._loading_character_names: list[str] = []
+        # character asset USD path -> released characters of the asset, see release_characters()
+        self._character_pool: dict[str, list[PooledCharacter]] = {}
         self.character_data_dict = ObservableDict()
         self.is_imported = False
+        # sequence of the last exported or imported character snapshot, 0 when there is none
+        self._snapshot_sequence = 0
 
         self.trigger_state_api_dict = {}
+        # array state of the characters, see get_crowd_state()
+        self._crowd_state_cache = None
+        # pedestrians touching the robot, see get_collision_info()
+        self.contact_monitor = RobotContactMonitor(robot_prim_path)
+        self.contact_monitor.start()
         self.character_manager = GlobalCharacterPositionManager.get_instance()
+        self.people_settings = PeopleSettings.get_instance()
 
         self.stage = omni.usd.get_context().get_stage()
         self.inav = nav.acquire_interface()
         self.navmesh = self.inav.get_navmesh()
 
         self._init_assets()
+        if self.people_settings.warmup_preload_enabled:
+            self.preload_character_assets()
         if is_warmup:
-            num_warmup = len(self._get_character_asset_list())
-            self.load_random_characters(num_warmup, CharacterBehavior.RANDOM_IDLE)
-            context = SimulationContext.instance()
-            for _ in range(100):
-                context.step()
-            self.remove_characters(list(self.character_data_dict.keys()))
+            self._warm_up_assets()
         self.load_random_characters(num_characters, CharacterBehavior.RANDOM_GOTO)
 
     def shutdown(self):
+        self.cancel_loading()
+        self.contact_monitor.destroy()
         self.character_data_dict = None
-        self.available_character_list = None
+        self.asset_catalog = None
 
     def get_all_character_pos(self):
         all_character_pos = []
@@ -159,24 +223,37 @@ class CharacterSetup:
                 all_character_pos.append(Utils.get_character_transform(character))
         return all_character_pos
 
+    def get_crowd_state(self) -> CrowdState:
+        """
+        positions, orientations, velocities, radii and prim paths of the characters as arrays, from the positions the
+        characters publish for the avoidance, without looking the characters up
+        """
+        if self._crowd_state_cache is None or self._crowd_state_cache.path_prefix != self.character_root_prim_path:
+            self._crowd_state_cache = CrowdStateCache(self.character_root_prim_path)
+        return self._crowd_state_cache.get()
+
+    def get_nearest_characters(self, point, k: int, max_distance: float = math.inf) -> tuple:
+        """(crowd state, ground distances) of the `k` characters nearest to `point`, nearest first"""
+        crowd_state = self.get_crowd_state()
+        indices, distances = crowd_state.nearest_to_point(point, k, max_distance)
+        return crowd_state.select(indices), distances
+
+    def get_nearest_characters_to_path(self, path_points, k: int, max_distance: float = math.inf) -> tuple:
+        """(crowd state, ground distances) of the `k` characters nearest to the polyline, e.g. a robot path"""
+        crowd_state = self.get_crowd_state()
+        indices, distances = crowd_state.nearest_to_path(path_points, k, max_distance)
+        return crowd_state.select(indices), distances
+
     def get_collision_info(self):
+        """(SkelRoot path, position) of the characters touching the robot, see RobotContactMonitor"""
         collision_info = []
-        for character_name, (character_prim, trigger_state_api_list) in self.trigger_state_api_dict.items():
-            is_collided = False
-            for trigger_state_api in trigger_state_api_list:
-                trigger_colliders = trigger_state_api.GetTriggeredCollisionsRel().GetTargets()
-                for trigger_collider in trigger_colliders:
-                    if str(trigger_collider).startswith(self.robot_prim_path):
-                        is_collided = True
-                        break
-                if is_collided:
-                    break
-            if is_collided:
-                character = ag.get_character(character_prim)
-                position = Utils.get_character_pos(character)
-                collision_info.append((character_prim, list(position)))
+        for contact in self.contact_monitor.get_contacts():
+            character = ag.get_character(contact.character_path)
+            if character is not None:
+                collision_info.append((contact.character_path, list(Utils.get_character_pos(character))))
         return collision_info
 
+    @timed("character_setup.load_random_characters")
     def load_random_characters(self, num_characters: int, character_behavior: CharacterBehavior):
         if self.is_imported:
             self.remove_characters(list(self.character_data_dict.keys()))
@@ -187,6 +264,7 @@ class CharacterSetup:
         self._setup_characters(character_name_list, character_behavior)
         return character_name_list
 
+    @timed("character_setup.load_characters")
     def load_characters(self, position_list: list[tuple[float, float]], character_behavior: CharacterBehavior):
         if self.is_imported:
             self.remove_characters(list(self.character_data_dict.keys()))
@@ -197,6 +275,117 @@ class CharacterSetup:
         self._setup_characters(character_name_list, character_behavior)
         return character_name_list
 
+    @timed("character_setup.spawn_characters")
+    def spawn_characters(self, position_list: list[list[float]], character_behavior: CharacterBehavior) -> list[str]:
+        """
+        add characters at navmesh positions, next to the loaded ones and reusing the pooled characters first, e.g.
+        for `PopulationStreamer`
+        """
+        character_name_list = self._init_characters(position_list, character_behavior)
+        self._setup_characters(character_name_list, character_behavior)
+        return character_name_list
+
+    async def load_random_characters_async(
+        self,
+        num_characters: int,
+        character_behavior: CharacterBehavior,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """async `load_random_characters()` which creates the characters over several frames"""
+        if self.is_imported:
+            self.remove_characters(list(self.character_data_dict.keys()))
+            self.is_imported = False
+
+        random_position_list = self._get_random_position_list(num_characters)
+        return await self._load_characters_async(random_position_list, character_behavior, on_progress)
+
+    async def load_characters_async(
+        self,
+        position_list: list[tuple[float, float]],
+        character_behavior: CharacterBehavior,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """async `load_characters()` which creates the characters over several frames"""
+        if self.is_imported:
+            self.remove_characters(list(self.character_data_dict.keys()))
+            self.is_imported = False
+
+        position_list = self._convert_xy_to_xyz(position_list)
+        return await self._load_characters_async(position_list, character_behavior, on_progress)
+
+    def is_loading(self) -> bool:
+        return self._loading_task is not None and not self._loading_task.done()
+
+    def cancel_loading(self):
+        """
+        cancel the running async load; the characters it already created are removed right away, so that the caller
+        can go on with the loaded characters only
+        """
+        if not self.is_loading():
+            return
+        character_name_list = self._loading_character_names
+        self._loading_task.cancel()
+        # the cancelled task leaves the clean up to this call, see _load_characters_async()
+        self._loading_task = None
+        self._loading_character_names = []
+        self.remove_characters(character_name_list)
+
+    def preload_character_assets(self):
+        """open the layers of the character assets in the background, see `WarmupManager.preload_assets()`"""
+        usd_paths = self._get_character_usd_paths()
+        if not usd_paths:
+            return None
+        return WarmupManager.get_instance().preload_assets(
+            usd_paths, self.people_settings.loading_max_concurrent_requests
+        )
+
+    async def prefetch_character_assets_async(self) -> bool:
+        """load the character asset catalog, listing the character folders with parallel asset server requests"""
+        if self.asset_catalog is None:
+            return False
+        return await self.asset_catalog.load_async(self.people_settings.loading_max_concurrent_requests)
+
+    async def _load_characters_async(
+        self,
+        position_list: list[list[float]],
+        character_behavior: CharacterBehavior,
+        on_progress: Optional[Callable[[int, int], None]],
+    ):
+        # only one async load at a time
+        self.cancel_loading()
+        self._loading_task = asyncio.current_task()
+        app = omni.kit.app.get_app()
+        total_count = len(position_list)
+        character_name_list = []
+        self._loading_character_names = character_name_list
+        try:
+            await self.prefetch_character_assets_async()
+
+            # create the characters in slices of at most `loading_slice_budget_ms` per frame
+            slice_start_time = time.perf_counter()
+            for position in position_list:
+                character_name_list.append(self._init_random_character(position, character_behavior))
+                slice_budget = self.people_settings.loading_slice_budget_ms / 1000.0
+                if slice_budget > 0 and time.perf_counter() - slice_start_time >= slice_budget:
+                    if on_progress:
+                        on_progress(len(character_name_list), total_count)
+                    await app.next_update_async()
+                    slice_start_time = time.perf_counter()
+
+            self._setup_characters(character_name_list, character_behavior)
+            if on_progress:
+                on_progress(total_count, total_count)
+            return character_name_list
+        except asyncio.CancelledError:
+            # cancel_loading() already removed the characters, else the task itself was cancelled
+            if self._loading_task is asyncio.current_task():
+                self.remove_characters(character_name_list)
+            raise
+        finally:
+            if self._loading_task is asyncio.current_task():
+                self._loading_task = None
+                self._loading_character_names = []
+
     def export_character_state(self, check_modified=True) -> str:
         if self.character_data_dict.is_modified() or not check_modified:
             self.character_data_dict.clear_modified()
@@ -204,6 +393,7 @@ class CharacterSetup:
             return CharacterState(data=character_data_list).model_dump_json()
         return None
 
+    @timed("character_setup.import_character_state")
     def import_character_state(self, character_state_str: str):
         try:
             character_state = CharacterState.model_validate_json(character_state_str)
@@ -214,10 +404,8 @@ class CharacterSetup:
         self.remove_characters(list(self.character_data_dict.keys()))
         behavior_to_character_name_list = {}
         for character_data in character_state.data:
-            while True:
-                character_name = f"character_{str(uuid.uuid4()).replace('-', '_')}"
-                if character_name not in self.character_data_dict:
-                    break
+            pooled_character = self._take_pooled_character(character_data.usd_path)
+            character_name = pooled_character.name if pooled_character else self._new_character_name()
             character_behavior = CharacterBehavior.from_name(character_data.behavior)
             self._init_character(
                 character_name,
@@ -227,17 +415,270 @@ class CharacterSetup:
                 character_data.rotation,
                 character_data.random_seed,
                 character_data.nav_random_seed,
+                pooled_character,
             )
             behavior_to_character_name_list.setdefault(character_behavior, []).append(character_name)
         for behavior, character_name_list in behavior_to_character_name_list.items():
             self._setup_characters(character_name_list, behavior)
         self.is_imported = True
 
+    @timed("character_setup.reset_episode")
+    def reset_episode(self, seed: Optional[int] = None, character_state_str: Optional[str] = None) -> list[str]:
+        """
+        Starts a new episode with the loaded characters, without deleting or creating prims. The characters are moved
+        to spawn points sampled with `seed`, or to the positions of `character_state_str` (see
+        `export_character_state()`), and are reset in place: their commands, random generators and navigation, and
+        the queue spots and interactable objects they hold. A given seed always gives the same spawn points, rotations
+        and character seeds. A state whose assets or behaviors don't match the loaded characters is imported instead.
+        Returns the character names.
+        """
+        self.cancel_loading()
+        character_name_list = list(self.character_data_dict.keys())
+        if character_state_str is not None:
+            try:
+                character_state = CharacterState.model_validate_json(character_state_str)
+            except ValidationError as e:
+                logger.error("Failed to reset the episode. %s", e)
+                return character_name_list
+            character_data_list = self._match_character_state(character_name_list, character_state)
+            if character_data_list is None:
+                logger.info("The character state doesn't match the loaded characters, it is imported.")
+                self.import_character_state(character_state_str)
+                return list(self.character_data_dict.keys())
+        else:
+            episode_random = random.Random(seed)
+            # the loaded characters are all moved, their current positions are free
+            position_list = self._get_random_position_list(
+                len(character_name_list), f"episode_{episode_random.getrandbits(32)}", keep_apart_from_loaded=False
+            )
+            character_data_list = []
+            for character_name, position in zip(character_name_list, position_list):
+                character_data_list.append(
+                    self.character_data_dict[character_name].model_copy(
+                        update={
+                            "position": position,
+                            "rotation": episode_random.uniform(0, 360),
+                            "random_seed": episode_random.randint(0, 2**32 - 1),
+                            "nav_random_seed": episode_random.randint(0, 2**32 - 1),
+                        }
+                    )
+                )
+
+        self._restart_characters(character_name_list, character_data_list)
+        return character_name_list
+
+    def export_character_snapshot(self, delta: bool = False) -> Optional[bytes]:
+        """
+        Binary snapshot of the characters, see `character_snapshot`. A delta snapshot only holds the characters
+        changed and the names of the characters removed since the previous exported or imported snapshot, and is None
+        when nothing changed. A full snapshot is returned when there is no previous snapshot.
+        """
+        changed_names, removed_names = self.character_data_dict.get_changes()
+        is_delta = delta and self._snapshot_sequence > 0
+        if is_delta:
+            if not changed_names and not removed_names:
+                return None
+            character_names = [name for name in self.character_data_dict if name in changed_names]
+        else:
+            character_names, removed_names = list(self.character_data_dict), set()
+        base_sequence = self._snapshot_sequence
+        self._snapshot_sequence += 1
+        self.character_data_dict.clear_changes()
+        snapshot = CharacterSnapshot(
+            self._snapshot_sequence,
+            base_sequence if is_delta else self._snapshot_sequence,
+            is_delta,
+            {name: self.character_data_dict[name].model_dump() for name in character_names},
+            sorted(removed_names),
+        )
+        return encode_snapshot(snapshot)
+
+    @timed("character_setup.import_character_snapshot")
+    def import_character_snapshot(self, snapshot_bytes: bytes) -> bool:
+        """
+        Applies a snapshot of `export_character_snapshot()`. The characters which are loaded with the same asset and
+        behavior are restarted in place like in `reset_episode()`, the others are removed or created. A full snapshot
+        removes the characters it doesn't hold, a delta snapshot only applies to the snapshot it was exported after.
+        Returns whether the snapshot was applied.
+        """
+        try:
+            snapshot = decode_snapshot(snapshot_bytes)
+        except ValueError as e:
+            logger.error("Failed to import the character snapshot. %s", e)
+            return False
+        if snapshot.is_delta and snapshot.base_sequence != self._snapshot_sequence:
+            logger.error(
+                "Failed to import the character snapshot %d, it applies to snapshot %d instead of %d.",
+                snapshot.sequence,
+                snapshot.base_sequence,
+                self._snapshot_sequence,
+            )
+            return False
+        self.cancel_loading()
+        self._apply_character_snapshot(snapshot)
+        self._snapshot_sequence = snapshot.sequence
+        self.character_data_dict.clear_changes()
+        self.is_imported = True
+        return True
+
+    def save_checkpoint(self) -> SimulationCheckpoint:
+        """
+        Checkpoint of the crowd for restore_checkpoint(). Besides the spawn parameters of the characters, it holds the
+        runtime state of their behaviors (see `simulation_checkpoint`), the positions and velocities used for the
+        avoidance, the occupiers of the queue spots, the owners of the interactable objects and the state of the
+        `random` module.
+        """
+        behavior_states = {}
+        for character_name in self.character_data_dict:
+            behavior = self._get_behavior(character_name)
+            if behavior is not None and hasattr(behavior, "get_runtime_state"):
+                behavior_states[character_name] = behavior.get_runtime_state()
+        snapshot = CharacterSnapshot(
+            self._snapshot_sequence,
+            self._snapshot_sequence,
+            characters={name: data.model_dump() for name, data in self.character_data_dict.items()},
+        )
+        return SimulationCheckpoint(
+            encode_snapshot(snapshot),
+            behavior_states,
+            GlobalCharacterPositionManager.get_instance().get_state(),
+            GlobalQueueManager.get_instance().get_occupancy(),
+            InteractableObjectHelper.get_owned_object_paths(),
+            random.getstate(),
+        )
+
+    @timed("character_setup.restore_checkpoint")
+    def restore_checkpoint(self, checkpoint: SimulationCheckpoint) -> bool:
+        """
+        Restores a checkpoint of save_checkpoint(). The characters which are still loaded with the same asset and
+        behavior get their runtime state back, the others are removed or created like in import_character_snapshot().
+        Characters created with a new prim start from their spawn parameters, since their behavior scripts only exist
+        from the next update. Returns whether every character of the checkpoint got its runtime state back.
+        """
+        try:
+            snapshot = decode_snapshot(checkpoint.character_snapshot)
+        except ValueError as e:
+            logger.error("Failed to restore the checkpoint. %s", e)
+            return False
+        self.cancel_loading()
+        self._apply_character_snapshot(snapshot)
+
+        restored = True
+        for character_name, behavior_state in checkpoint.behavior_states.items():
+            behavior = self._get_behavior(character_name)
+            if behavior is None or not behavior.set_runtime_state(behavior_state):
+                restored = False
+        # restored after the behaviors, whose replaced commands free the queue spots and the objects they hold
+        GlobalCharacterPositionManager.get_instance().set_state(checkpoint.position_state)
+        GlobalQueueManager.get_instance().set_occupancy(checkpoint.queue_occupancy)
+        InteractableObjectHelper.set_owned_object_paths(checkpoint.interactable_owners, self.stage)
+        if checkpoint.random_state is not None:
+            random.setstate(checkpoint.random_state)
+        return restored
+
+    def _apply_character_snapshot(self, snapshot: CharacterSnapshot):
+        """restart, remove or create the characters so that they match `snapshot`"""
+        if snapshot.is_delta:
+            removed_name_list = [name for name in snapshot.removed_names if name in self.character_data_dict]
+        else:
+            removed_name_list = [name for name in self.character_data_dict if name not in snapshot.characters]
+        restarted_name_list, restarted_data_list = [], []
+        rebuilt_name_list = []
+        created_data = {}
+        for character_name, fields in snapshot.characters.items():
+            character_data = CharacterData.model_construct(**fields)
+            loaded_data = self.character_data_dict.get(character_name)
+            if loaded_data is None:
+                created_data[character_name] = character_data
+            elif (loaded_data.usd_path, loaded_data.behavior) == (character_data.usd_path, character_data.behavior):
+                restarted_name_list.append(character_name)
+                restarted_data_list.append(character_data)
+            else:
+                # the prim of another asset or the script of another behavior is replaced
+                rebuilt_name_list.append(character_name)
+                created_data[character_name] = character_data
+
+        self.remove_characters(removed_name_list)
+        if rebuilt_name_list:
+            self._delete_characters(rebuilt_name_list)
+        self._restart_characters(restarted_name_list, restarted_data_list)
+
+        behavior_to_character_name_list = {}
+        for character_name, character_data in created_data.items():
+            pooled_character = self._take_pooled_character_by_name(character_name)
+            if pooled_character is not None and pooled_character.usd_path != character_data.usd_path:
+                self._delete_characters([character_name])
+                pooled_character = None
+            character_behavior = CharacterBehavior.from_name(character_data.behavior)
+            self._init_character(
+                character_name,
+                character_data.usd_path,
+                character_behavior,
+                character_data.position,
+                character_data.rotation,
+                character_data.random_seed,
+                character_data.nav_random_seed,
+                pooled_character,
+            )
+            behavior_to_character_name_list.setdefault(character_behavior, []).append(character_name)
+        for behavior, character_name_list in behavior_to_character_name_list.items():
+            self._setup_characters(character_name_list, behavior)
+
+    def _restart_characters(self, character_name_list: list[str], character_data_list: list[CharacterData]):
+        """move and reset loaded characters in place, see reset_episode()"""
+        with Sdf.ChangeBlock():
+            for character_name, character_data in zip(character_name_list, character_data_list):
+                prim = self.stage.GetPrimAtPath(f"{self.character_root_prim_path}/{character_name}")
+                if prim:
+                    self._set_character_transform(prim, character_data.position, character_data.rotation)
+
+        seed_registry = CharacterSeedRegistry.get_instance()
+        for character_name, character_data in zip(character_name_list, character_data_list):
+            self.inav.set_random_seed(character_name, character_data.nav_random_seed)
+            seed_registry.set_seed(character_name, character_data.random_seed)
+            self.character_data_dict[character_name] = character_data
+            behavior = self._get_behavior(character_name)
+            if behavior is not None and hasattr(behavior, "reset_character"):
+                behavior.reset_character(
+                    seed=character_data.random_seed,
+                    position=character_data.position,
+                    rotation=character_data.rotation,
+                    active=True,
+                )
+        # the behaviors free what their current command holds, this also frees what was held by earlier commands
+        GlobalQueueManager.get_instance().remove_characters_from_queues(character_name_list)
+        InteractableObjectHelper.remove_all_owners(character_name_list, self.stage)
+
+    def _get_behavior(self, character_name: str):
+        """behavior script instance of a character, None before its scripts are loaded"""
+        skel_root_path, _ = self.trigger_state_api_dict.get(character_name, (None, None))
+        return SimulationUtil.get_agent_script_instance_by_path(skel_root_path) if skel_root_path else None
+
+    def _match_character_state(
+        self, character_name_list: list[str], character_state: CharacterState
+    ) -> Optional[list[CharacterData]]:
+        """data of `character_state` for each loaded character, by asset and behavior; None if any is missing"""
+        if len(character_state.data) != len(character_name_list):
+            return None
+        character_data_lists = {}
+        for character_data in character_state.data:
+            character_data_lists.setdefault((character_data.usd_path, character_data.behavior), []).append(
+                character_data
+            )
+        matched_data_list = []
+        for character_name in character_name_list:
+            loaded_data = self.character_data_dict[character_name]
+            character_data_list = character_data_lists.get((loaded_data.usd_path, loaded_data.behavior))
+            if not character_data_list:
+                return None
+            matched_data_list.append(character_data_list.pop(0))
+        return matched_data_list
+
+    @timed("character_setup.init_assets")
     def _init_assets(self):
-        setting_dict = carb.settings.get_settings()
         # Get root assets path from setting, if not set, get the Isaac-Sim asset path
-        people_asset_folder = setting_dict.get(PeopleSettings.CHARACTER_ASSETS_PATH)
-        character_root_prim_path = setting_dict.get(PeopleSettings.CHARACTER_PRIM_PATH)
+        people_asset_folder = self.people_settings.character_assets_path
+        character_root_prim_path = self.people_settings.character_prim_path
         if not character_root_prim_path:
             character_root_prim_path = "/World/Characters"
 
@@ -252,6 +693,11 @@ class CharacterSetup:
 
         if not self.assets_root_path:
             carb.log_error("Could not find people assets folder")
+        self.asset_catalog = CharacterAssetCatalog(
+            self.assets_root_path,
+            excluded_folders=[self.default_biped_asset_name],
+            cache_path=self.people_settings.asset_catalog_cache_path,
+        )
 
         result, properties = omni.client.stat(self.assets_root_path)
         if result != omni.client.Result.OK:
@@ -285,76 +731,198 @@ class CharacterSetup:
             return
 
     def _get_character_asset_list(self):
-        # List all files in characters directory
-        result, folder_list = omni.client.list("{}/".format(self.assets_root_path))
-
-        if result != omni.client.Result.OK:
-            carb.log_error("Unable to get character assets from provided asset root path.")
+        if self.asset_catalog is None or not self.asset_catalog.load():
             return
+        return self.asset_catalog.get_folder_names()
 
-        # Prune items from folder list that are not directories.
-        pruned_folder_list = [
-            folder.relative_path
-            for folder in folder_list
-            if (folder.flags & omni.client.ItemFlags.CAN_HAVE_CHILDREN) and not folder.relative_path.startswith(".")
-        ]
-
-        if self.default_biped_asset_name in pruned_folder_list:
-            pruned_folder_list.remove(self.default_biped_asset_name)
-        return pruned_folder_list
-
-    def _get_path_for_character_prim(self, agent_name):
-        # Get a list of available character assets
-        if not self.available_character_list:
-            self.available_character_list = self._get_character_asset_list()
-            if not self.available_character_list:
-                return
-        # Check if a folder with agent_name exists. If exists we load the character, else we load a random character
-        agent_folder = "{}/{}".format(self.assets_root_path, agent_name)
-        result, properties = omni.client.stat(agent_folder)
-        if result == omni.client.Result.OK:
-            char_name = agent_name
-        else:
-            # Pick a random character from available character list
-            char_name = random.choice(self.available_character_list)
+    def _get_character_usd_paths(self) -> list[str]:
+        folder_names = self._get_character_asset_list() or []
+        return [self.asset_catalog.get_usd_path(folder_name) for folder_name in folder_names]
 
-        # Get the usd present in the character folder
-        character_folder = "{}/{}".format(self.assets_root_path, char_name)
-        character_usd = self._get_usd_in_folder(character_folder)
-        if not character_usd:
+    @timed("character_setup.warm_up_assets")
+    def _warm_up_assets(self):
+        """run one character of each asset not warmed up yet for a few frames, then remove them"""
+        if self.anim_graph_prim is None:
             return
-
-        if len(self.available_character_list) != 0 and (char_name in self.available_character_list):
-            self.available_character_list.remove(char_name)
-
-        # Return the character name (folder name) and the usd path to the character
-        return (char_name, "{}/{}".format(character_folder, character_usd))
-
-    def _get_usd_in_folder(self, character_folder_path):
-        result, folder_list = omni.client.list(character_folder_path)
-
-        if result != omni.client.Result.OK:
-            carb.log_error("Unable to read character folder path at {}".format(character_folder_path))
+        warmup_manager = WarmupManager.get_instance()
+        anim_graph_path = str(self.anim_graph_prim.GetPrimPath())
+        usd_paths = self._get_character_usd_paths()
+        if self.people_settings.warmup_cache_enabled:
+            usd_paths = warmup_manager.get_unwarmed_usd_paths(usd_paths, anim_graph_path)
+        if not usd_paths:
+            logger.info("All the character assets are already warmed up")
             return
 
-        for item in folder_list:
-            if item.relative_path.endswith(".usd"):
-                return item.relative_path
+        character_name_list = []
+        for usd_path, position in zip(usd_paths, self._get_random_position_list(len(usd_paths), "warmup")):
+            pooled_character = self._take_pooled_character(usd_path)
+            character_name = pooled_character.name if pooled_character is not None else self._new_character_name()
+            self._init_character(
+                character_name,
+                usd_path,
+                CharacterBehavior.RANDOM_IDLE,
+                position,
+                random.uniform(0, 360),
+                random.randint(0, 2**32 - 1),
+                random.randint(0, 2**32 - 1),
+                pooled_character,
+            )
+            character_name_list.append(character_name)
+        self._setup_characters(character_name_list, CharacterBehavior.RANDOM_IDLE)
+        context = SimulationContext.instance()
+        for _ in range(100):
+            context.step()
+        self.remove_characters(character_name_list)
+        warmup_manager.mark_warmed(usd_paths, anim_graph_path)
 
-        carb.log_error("Unable to file a .usd file in {} character folder".format(character_folder_path))
+    def _get_path_for_character_prim(self, agent_name):
+        if self.asset_catalog is None or not self.asset_catalog.load():
+            return
+        # Load the character of the folder named agent_name if there is one, else a random character which was not
+        # picked since all the characters were last picked
+        return self.asset_catalog.pick(agent_name)
 
+    @timed("character_setup.remove_characters")
     def remove_characters(self, character_name_list: list[str]):
         if character_name_list is None:
             return
+        if self.people_settings.pool_enabled:
+            self.release_characters(character_name_list)
+        else:
+            self._delete_characters(character_name_list)
+
+    def release_characters(self, character_name_list: list[str]):
+        """hide and park characters in the pool, to be reused by the next loads"""
+        seed_registry = CharacterSeedRegistry.get_instance()
+        released_character_list = []
+        not_set_up_name_list = []
+        for character_name in character_name_list:
+            character_data = self.character_data_dict.pop(character_name, None)
+            if character_data is None:
+                continue
+            if character_name not in self.trigger_state_api_dict:
+                not_set_up_name_list.append(character_name)
+                continue
+            skel_root_path, _ = self.trigger_state_api_dict.pop(character_name)
+            self.contact_monitor.remove_characters([skel_root_path])
+            behavior = SimulationUtil.get_agent_script_instance_by_path(skel_root_path)
+            if behavior is not None and hasattr(behavior, "reset_character"):
+                behavior.reset_character(active=False)
+            seed_registry._seeds.pop(character_name, None)
+            pooled_character = PooledCharacter(
+                character_name,
+                character_data.usd_path,
+                character_data.behavior,
+                skel_root_path,
+            )
+            self._character_pool.setdefault(character_data.usd_path, []).append(pooled_character)
+            released_character_list.append(pooled_character)
+
+        with Sdf.ChangeBlock():
+            for pooled_character in released_character_list:
+                self._set_character_enabled(pooled_character.name, pooled_character.skel_root_path, False)
+        if not_set_up_name_list:
+            self._delete_characters(not_set_up_name_list)
+
+    def clear_character_pool(self):
+        """delete the characters parked in the pool"""
+        character_name_list = [
+            pooled_character.name
+            for pooled_character_list in self._character_pool.values()
+            for pooled_character in pooled_character_list
+        ]
+        self._character_pool = {}
+        if character_name_list:
+            self._delete_characters(character_name_list)
+
+    def get_pooled_character_count(self) -> int:
+        return sum(len(pooled_character_list) for pooled_character_list in self._character_pool.values())
+
+    def _take_pooled_character(self, usd_path: Optional[str] = None) -> Optional[PooledCharacter]:
+        """take a released character of the asset, or of any asset when `usd_path` is None"""
+        if usd_path is None:
+            usd_path = next((path for path, pooled_list in self._character_pool.items() if pooled_list), None)
+        pooled_character_list = self._character_pool.get(usd_path)
+        if not pooled_character_list:
+            return None
+        pooled_character = pooled_character_list.pop()
+        if not pooled_character_list:
+            del self._character_pool[usd_path]
+        return pooled_character
+
+    def _take_pooled_character_by_name(self, character_name: str) -> Optional[PooledCharacter]:
+        """take the released character named `character_name`, whatever its asset"""
+        for usd_path, pooled_character_list in self._character_pool.items():
+            for index, pooled_character in enumerate(pooled_character_list):
+                if pooled_character.name == character_name:
+                    del pooled_character_list[index]
+                    if not pooled_character_list:
+                        del self._character_pool[usd_path]
+                    return pooled_character
+        return None
+
+    def _set_character_enabled(self, character_name: str, skel_root_path: str, enabled: bool):
+        character_prim = self.stage.GetPrimAtPath(f"{self.character_root_prim_path}/{character_name}")
+        if not character_prim:
+            return
+        if enabled:
+            UsdGeom.Imageable(character_prim).MakeVisible()
+        else:
+            UsdGeom.Imageable(character_prim).MakeInvisible()
+        collider_prim = self.stage.GetPrimAtPath(f"{skel_root_path}/CollisionCapsule")
+        if collider_prim:
+            # the opinion must be authored where the collider is, or it is overridden
+            with Usd.EditContext(self.stage, self._get_physics_layer() or self.stage.GetEditTarget()):
+                collider_prim.GetAttribute("physics:collisionEnabled").Set(enabled)
+
+    def _reuse_character(
+        self,
+        pooled_character: PooledCharacter,
+        character_behavior: CharacterBehavior,
+        position: list[float],
+        rotation: float,
+        random_seed: int,
+    ):
+        self._set_character_enabled(pooled_character.name, pooled_character.skel_root_path, True)
+        self.trigger_state_api_dict[pooled_character.name] = pooled_character.skel_root_path, []
+        self.contact_monitor.add_characters([pooled_character.skel_root_path])
+        if pooled_character.behavior != character_behavior.value.name:
+            # a new script instance is created, which reads its seed from the registry
+            skel_root = self.stage.GetPrimAtPath(pooled_character.skel_root_path)
+            skel_root.GetAttribute("omni:scripting:scripts").Set([self._get_behavior_script_path(character_behavior)])
+            return
+        behavior = SimulationUtil.get_agent_script_instance_by_path(pooled_character.skel_root_path)
+        if behavior is not None and hasattr(behavior, "reset_character"):
+            behavior.reset_character(seed=random_seed, position=position, rotation=rotation, active=True)
+
+    def _get_behavior_script_path(self, character_behavior: CharacterBehavior) -> str:
+        ext_path = self.people_settings.behavior_script_path
+        if not ext_path:
+            ext_path = character_behavior.value.script_path
+        return r"{}".format(ext_path)
+
+    def _get_physics_layer(self) -> Optional[Sdf.Layer]:
+        """layer of the character physics opinions, None for the edit target layer"""
+        if not self.people_settings.physics_session_layer_enabled:
+            return None
+        return Utils.get_session_sublayer(self.stage)
+
+    def _delete_characters(self, character_name_list: list[str]):
         character_root_prim_path = Path(self.character_root_prim_path)
         seed_registry = CharacterSeedRegistry.get_instance()
+        physics_layer = self._get_physics_layer()
+        if physics_layer is not None:
+            Utils.remove_prim_specs(
+                physics_layer, [str(character_root_prim_path / name) for name in character_name_list]
+            )
 
         for character_name in character_name_list:
             character_path = str(character_root_prim_path / character_name)
             if prims.is_prim_path_valid(character_path):
                 prims.delete_prim(character_path)
             if character_name in self.trigger_state_api_dict:
-                del self.trigger_state_api_dict[character_name]
+                skel_root_path, _ = self.trigger_state_api_dict.pop(character_name)
+                self.contact_monitor.remove_characters([skel_root_path])
             if character_name in self.character_data_dict:
                 del self.character_data_dict[character_name]
             # Remove seed from registry
@@ -363,87 +931,97 @@ class CharacterSetup:
         script_manager = ScriptManager.get_instance()
         script_manager._unload_all_scripts()
 
-    def _get_random_position_list(self, num_characters: int):
-        position_list = []
-
-        # Get area mask to include all navmesh areas
-        area_count = self.inav.get_area_count()
-        area_mask = [1] * max(area_count, 1)  # Include all areas
-
-        for i in range(num_characters):
-            while True:
-                # query_random_point returns the point directly, not via out parameter
-                # Use unique ID for each query to get different random points
-                random_position = self.navmesh.query_random_point(f"spawn_{i}", area_mask)
-                if random_position is None:
-                    continue
-                path = self.navmesh.query_shortest_path(random_position, self.starting_point)
-                if path is not None:
-                    logger.debug(
-                        "Successfully generated the character's initial position. %s",
-                        random_position,
-                    )
-                    break
-                else:
-                    logger.debug(
-                        "Failed to generate the character's initial position. %s",
-                        random_position,
-                    )
-            position_list.append(list(random_position))
-        return position_list
+    def _get_spawn_sampler(self, keep_apart_from_loaded: bool = True, goal=None, occupied_points=None) -> SpawnSampler:
+        """
+        sampler of positions connected to `goal`, the starting point by default, and kept apart from
+        `occupied_points`, the positions of the loaded characters by default
+        """
+        if self.navmesh is None:
+            raise ValueError("Unable to sample character positions, there is no navmesh")
+        # Include all navmesh areas
+        area_mask = [1] * max(self.inav.get_area_count(), 1)
+        if occupied_points is None:
+            occupied_points = []
+            if keep_apart_from_loaded:
+                occupied_points = [character_data.position for character_data in self.character_data_dict.values()]
+        return SpawnSampler(
+            self.navmesh,
+            self.starting_point if goal is None else goal,
+            min_separation=self.people_settings.spawn_min_separation,
+            max_attempts=self.people_settings.spawn_max_attempts,
+            area_mask=area_mask,
+            occupied_points=occupied_points,
+        )
 
+    @timed("character_setup.sample_spawn_positions")
+    def _get_random_position_list(
+        self, num_characters: int, query_prefix: str = "spawn", keep_apart_from_loaded: bool = True
+    ):
+        """
+        navmesh positions connected to the starting point, see `SpawnSampler.sample_random()`; raises ValueError when
+        not all the positions can be placed
+        """
+        result = self._get_spawn_sampler(keep_apart_from_loaded).sample_random(num_characters, query_prefix)
+        if not result.is_complete():
+            raise ValueError(f"Unable to generate the initial positions of the characters: {result.describe()}")
+        logger.debug("Generated the initial positions of the characters: %s", result.describe())
+        return result.positions
+
+    @timed("character_setup.sample_spawn_positions")
     def _convert_xy_to_xyz(self, position_list: list[tuple[float, float]], radius: float = 1.5):
-        result = []
-        for position in position_list:
-            height = 0.0
-            while True:
-                random_angle = random.uniform(0, 2 * math.pi)
-                random_radius = radius * math.sqrt(random.uniform(0, 1))
-                point = (
-                    position[0] + random_radius * math.cos(random_angle),
-                    position[1] + random_radius * math.sin(random_angle),
-                    height,
-                )
-                path = self.navmesh.query_shortest_path(point, self.starting_point)
-                if path is not None:
-                    result.append(list(path.get_points()[0]))
-                    break
-                if 10.0 < height:
-                    break
-                height = -height
-                if height >= 0:
-                    height += 0.1
-        return result
-
+        """
+        navmesh positions within `radius` of the xy positions, see `SpawnSampler.sample_near()`; the positions which
+        can't be placed are skipped with a warning
+        """
+        result = self._get_spawn_sampler().sample_near(position_list, radius, height=self.starting_point[2])
+        for index in result.failed_indices:
+            logger.warning("Unable to place a character near %s, it is skipped", position_list[index])
+        if not result.is_complete():
+            logger.warning("Generated the initial positions of the characters: %s", result.describe())
+        return result.positions
+
+    @timed("character_setup.init_characters")
     def _init_characters(self, position_list: list[list[float]], character_behavior: CharacterBehavior):
         character_name_list = []
         # Reload character assets
         for position in position_list:
-            while True:
-                character_name = f"character_{str(uuid.uuid4()).replace('-', '_')}"
-                if character_name not in self.character_data_dict:
-                    break
-            char_name, char_usd_file = self._get_path_for_character_prim(character_name)
-            if char_usd_file:
-                # Store agent names for deletion
-                character_name_list.append(character_name)
-
-                random_rotation = random.uniform(0, 360)
-                random_seed = random.randint(0, 2**32 - 1)
-                nav_random_seed = random.randint(0, 2**32 - 1)
-                self._init_character(
-                    character_name,
-                    char_usd_file,
-                    character_behavior,
-                    position,
-                    random_rotation,
-                    random_seed,
-                    nav_random_seed,
-                )
-            else:
-                raise ValueError("Unable to load character assets")
+            # Store agent names for deletion
+            character_name_list.append(self._init_random_character(position, character_behavior))
         return character_name_list
 
+    def _new_character_name(self) -> str:
+        while True:
+            character_name = f"character_{str(uuid.uuid4()).replace('-', '_')}"
+            if character_name not in self.character_data_dict:
+                return character_name
+
+    def _init_random_character(self, position: list[float], character_behavior: CharacterBehavior) -> str:
+        # Reuse a released character first, so the asset mix of the previous load is kept
+        pooled_character = self._take_pooled_character()
+        if pooled_character is not None:
+            character_name, char_usd_file = pooled_character.name, pooled_character.usd_path
+        else:
+            character_name = self._new_character_name()
+            character_asset = self._get_path_for_character_prim(character_name)
+            if not character_asset:
+                raise ValueError("Unable to load character assets")
+            char_name, char_usd_file = character_asset
+
+        random_rotation = random.uniform(0, 360)
+        random_seed = random.randint(0, 2**32 - 1)
+        nav_random_seed = random.randint(0, 2**32 - 1)
+        self._init_character(
+            character_name,
+            char_usd_file,
+            character_behavior,
+            position,
+            random_rotation,
+            random_seed,
+            nav_random_seed,
+            pooled_character,
+        )
+        return character_name
+
     def _init_character(
         self,
         character_name: str,
@@ -453,19 +1031,17 @@ class CharacterSetup:
         rotation: float,
         random_seed: int,
         nav_random_seed: int,
+        pooled_character: Optional[PooledCharacter] = None,
     ):
-        prim = prims.create_prim(
-            f"{self.character_root_prim_path}/{character_name}",
-            "Xform",
-            usd_path=char_usd_file,
-        )
-        prim.GetAttribute("xformOp:translate").Set(Gf.Vec3d(*position))
-        if isinstance(prim.GetAttribute("xformOp:orient").Get(), Gf.Quatf):
-            prim.GetAttribute("xformOp:orient").Set(
-                Gf.Quatf(Gf.Rotation(Gf.Vec3d(0, 0, 1), float(rotation)).GetQuat())
+        if pooled_character is None:
+            prim = prims.create_prim(
+                f"{self.character_root_prim_path}/{character_name}",
+                "Xform",
+                usd_path=char_usd_file,
             )
         else:
-            prim.GetAttribute("xformOp:orient").Set(Gf.Rotation(Gf.Vec3d(0, 0, 1), float(rotation)).GetQuat())
+            prim = self.stage.GetPrimAtPath(f"{self.character_root_prim_path}/{character_name}")
+        self._set_character_transform(prim, position, rotation)
 
         self.inav.set_random_seed(character_name, nav_random_seed)
 
@@ -481,42 +1057,83 @@ class CharacterSetup:
             random_seed=random_seed,
             nav_random_seed=nav_random_seed,
         )
+        if pooled_character is not None:
+            self._reuse_character(pooled_character, character_behavior, position, rotation, random_seed)
 
-    def _setup_characters(self, character_name_list: list[str], character_behavior: CharacterBehavior):
-        for prim in self.stage.Traverse():
+    def _set_character_transform(self, prim, position: list[float], rotation: float):
+        prim.GetAttribute("xformOp:translate").Set(Gf.Vec3d(*position))
+        if isinstance(prim.GetAttribute("xformOp:orient").Get(), Gf.Quatf):
+            prim.GetAttribute("xformOp:orient").Set(
+                Gf.Quatf(Gf.Rotation(Gf.Vec3d(0, 0, 1), float(rotation)).GetQuat())
+            )
+        else:
+            prim.GetAttribute("xformOp:orient").Set(Gf.Rotation(Gf.Vec3d(0, 0, 1), float(rotation)).GetQuat())
+
+    def _get_skel_root(self, character_name: str):
+        character_prim = self.stage.GetPrimAtPath(f"{self.character_root_prim_path}/{character_name}")
+        if not character_prim:
+            return None
+        character_data = self.character_data_dict.get(character_name)
+        usd_path = character_data.usd_path if character_data else None
+        relative_path = self._skel_root_relative_paths.get(usd_path)
+        if relative_path is not None:
+            prim = self.stage.GetPrimAtPath(relative_path.MakeAbsolutePath(character_prim.GetPath()))
+            if prim and prim.GetTypeName() == "SkelRoot":
+                return prim
+
+        for prim in Usd.PrimRange(character_prim):
             if (
                 prim.GetTypeName() == "SkelRoot"
                 and UsdGeom.Imageable(prim).ComputeVisibility() != UsdGeom.Tokens.invisible
             ):
-                is_target = None
-                for character_name in character_name_list:
-                    if character_name in str(prim.GetPrimPath()):
-                        is_target = character_name
-                        break
-                if is_target is not None:
-                    # Remove animation graph attribute if it exists
-                    omni.kit.commands.execute("RemoveAnimationGraphAPICommand", paths=[Sdf.Path(prim.GetPrimPath())])
-
-                    # Apply animation graph api on skeleton root
-                    omni.kit.commands.execute(
-                        "ApplyAnimationGraphAPICommand",
-                        paths=[Sdf.Path(prim.GetPrimPath())],
-                        animation_graph_path=Sdf.Path(self.anim_graph_prim.GetPrimPath()),
-                    )
-                    # Apply command api
-                    omni.kit.commands.execute("ApplyScriptingAPICommand", paths=[Sdf.Path(prim.GetPrimPath())])
-                    attr = prim.GetAttribute("omni:scripting:scripts")
-
-                    setting_dict = carb.settings.get_settings()
-                    ext_path = setting_dict.get(PeopleSettings.BEHAVIOR_SCRIPT_PATH)
-                    if not ext_path:
-                        ext_path = character_behavior.value.script_path
-                    attr.Set([r"{}".format(ext_path)])
-                    # Use simplified capsule collider instead of convexDecomposition
-                    # to prevent PhysX crashes with animated characters
-                    trigger_state_api_list = Utils.add_colliders(prim, use_simple_collider=True)
-                    self.trigger_state_api_dict[is_target] = str(prim.GetPrimPath()), trigger_state_api_list
-                    Utils.add_rigid_body_dynamics(prim)
+                if usd_path:
+                    relative_path = prim.GetPath().MakeRelativePath(character_prim.GetPath())
+                    self._skel_root_relative_paths[usd_path] = relative_path
+                return prim
+        return None
+
+    @timed("character_setup.setup_characters")
+    def _setup_characters(self, character_name_list: list[str], character_behavior: CharacterBehavior):
+        skel_root_list = []
+        for character_name in character_name_list:
+            if character_name in self.trigger_state_api_dict:
+                # reused from the pool, already set up
+                continue
+            prim = self._get_skel_root(character_name)
+            if prim is None:
+                logger.warning("Unable to find the SkelRoot of character %s", character_name)
+                continue
+            skel_root_list.append((character_name, prim))
+
+        if skel_root_list:
+            skel_root_paths = [Sdf.Path(prim.GetPrimPath()) for _, prim in skel_root_list]
+            # Remove animation graph attribute if it exists
+            omni.kit.commands.execute("RemoveAnimationGraphAPICommand", paths=skel_root_paths)
+
+            # Apply animation graph api on skeleton root
+            omni.kit.commands.execute(
+                "ApplyAnimationGraphAPICommand",
+                paths=skel_root_paths,
+                animation_graph_path=Sdf.Path(self.anim_graph_prim.GetPrimPath()),
+            )
+            # Apply command api
+            omni.kit.commands.execute("ApplyScriptingAPICommand", paths=skel_root_paths)
+
+            ext_path = self._get_behavior_script_path(character_behavior)
+            skel_root_prims = [prim for _, prim in skel_root_list]
+            physics_layer = self._get_physics_layer()
+            # Author the scripts, the capsule colliders and the rigid bodies of the whole batch in a single change
+            # notification. Simplified capsule colliders are used instead of convexDecomposition to prevent PhysX
+            # crashes with animated characters.
+            with Sdf.ChangeBlock():
+                Utils.add_capsule_colliders(skel_root_prims, physics_layer)
+                Utils.add_rigid_body_dynamics_to_prims(skel_root_prims, physics_layer)
+                for prim in skel_root_prims:
+                    prim.GetAttribute("omni:scripting:scripts").Set([ext_path])
+            for character_name, prim in skel_root_list:
+                # capsule colliders have no trigger, the robot contacts come from the contact monitor
+                self.trigger_state_api_dict[character_name] = str(prim.GetPrimPath()), []
+            self.contact_monitor.add_characters(str(prim.GetPrimPath()) for prim in skel_root_prims)
 
         # Custom command
         populate_anim_graph()
@@ -0,0 +1,128 @@
+"""
+Binary snapshots of the spawn parameters of the characters, see `CharacterSetup.export_character_snapshot()`.
+
+    header       magic, version, flags, sequence, base sequence, string table size, string count, record count,
+                 removed count
+    strings      UTF-8 strings separated by NUL: character names, USD paths and behavior names
+    records      little-endian structured array of `RECORD_DTYPE`, strings are indices in the string table
+    removed      uint32 string indices of the names of the characters removed since the base snapshot
+
+A full snapshot holds all the characters. A delta snapshot only holds the characters changed since the snapshot with
+its base sequence, and the names of the removed ones.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+MAGIC = b"PPLS"
+VERSION = 1
+FLAG_DELTA = 1
+
+_HEADER = struct.Struct("<4sHHIIIIII")
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("name", "<u4"),
+        ("usd_path", "<u4"),
+        ("behavior", "<u4"),
+        ("position", "<f8", (3,)),
+        ("rotation", "<f8"),
+        ("random_seed", "<i8"),
+        ("nav_random_seed", "<i8"),
+    ]
+)
+
+
+@dataclass
+class CharacterSnapshot:
+    sequence: int
+    # sequence of the snapshot a delta applies to, equal to `sequence` for a full snapshot
+    base_sequence: int
+    is_delta: bool = False
+    # character name -> CharacterData fields
+    characters: dict[str, dict] = field(default_factory=dict)
+    removed_names: list[str] = field(default_factory=list)
+
+
+def encode_snapshot(snapshot: CharacterSnapshot) -> bytes:
+    strings: dict[str, int] = {}
+
+    def index_of(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    records = np.array(
+        [
+            (
+                index_of(name),
+                index_of(character_data["usd_path"]),
+                index_of(character_data["behavior"]),
+                tuple(character_data["position"]),
+                character_data["rotation"],
+                character_data["random_seed"],
+                character_data["nav_random_seed"],
+            )
+            for name, character_data in snapshot.characters.items()
+        ],
+        dtype=RECORD_DTYPE,
+    )
+    removed = np.array([index_of(name) for name in snapshot.removed_names], dtype="<u4")
+    string_table = "\0".join(strings).encode("utf-8")
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        FLAG_DELTA if snapshot.is_delta else 0,
+        snapshot.sequence,
+        snapshot.base_sequence,
+        len(string_table),
+        len(strings),
+        len(records),
+        len(removed),
+    )
+    return b"".join((header, string_table, records.tobytes(), removed.tobytes()))
+
+
+def decode_snapshot(data: bytes) -> CharacterSnapshot:
+    """decode a snapshot of `encode_snapshot()`; raises ValueError when the data is not a valid snapshot"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Character snapshot is truncated")
+    magic, version, flags, sequence, base_sequence, string_table_size, string_count, record_count, removed_count = (
+        _HEADER.unpack_from(data)
+    )
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported character snapshot, magic {magic!r} version {version}")
+    offset = _HEADER.size
+    records_offset = offset + string_table_size
+    removed_offset = records_offset + record_count * RECORD_DTYPE.itemsize
+    if len(data) != removed_offset + removed_count * 4:
+        raise ValueError("Character snapshot size does not match its header")
+
+    string_table = bytes(data[offset:records_offset]).decode("utf-8")
+    # the count tells a table holding only "" from an empty one
+    strings = string_table.split("\0") if string_count else []
+    if len(strings) != string_count:
+        raise ValueError("Character snapshot string table does not match its header")
+    records = np.frombuffer(data, dtype=RECORD_DTYPE, count=record_count, offset=records_offset)
+    removed = np.frombuffer(data, dtype="<u4", count=removed_count, offset=removed_offset)
+    try:
+        characters = {
+            strings[name]: {
+                "usd_path": strings[usd_path],
+                "behavior": strings[behavior],
+                "position": position.tolist(),
+                "rotation": rotation,
+                "random_seed": random_seed,
+                "nav_random_seed": nav_random_seed,
+            }
+            for name, usd_path, behavior, position, rotation, random_seed, nav_random_seed in records.tolist()
+        }
+        removed_names = [strings[index] for index in removed.tolist()]
+    except IndexError:
+        raise ValueError("Character snapshot refers to a missing string") from None
+    return CharacterSnapshot(sequence, base_sequence, bool(flags & FLAG_DELTA), characters, removed_names)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable
+
+import carb
+import omni.client
+import omni.usd
+from omni.anim.people_api.scripts.people_logger import get_logger
+from omni.anim.people_api.settings import PeopleSettings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CommandFile:
+    path: str
+    # agent name -> commands of the agent in file order, as lists of words without the agent name
+    agent_commands: dict[str, list[list[str]]] = field(default_factory=dict)
+    # queue name -> spots of the queue in file order, as (index, (x, y, z), angle)
+    queues: dict[str, list[tuple[int, tuple[float, float, float], float]]] = field(default_factory=dict)
+
+    def get_agent_commands(self, agent_name: str) -> list[list[str]]:
+        return self.agent_commands.get(agent_name, [])
+
+
+@dataclass(frozen=True)
+class CommandFileChange:
+    APPEND = "append"
+    REPLACE = "replace"
+
+    kind: str
+    # the commands added at the end of the agent commands for APPEND, all the new agent commands for REPLACE
+    commands: list[list[str]]
+
+
+def diff_command_files(old_file: CommandFile, new_file: CommandFile) -> dict[str, CommandFileChange]:
+    """agent name -> change of the commands of the agents whose commands changed, a removed agent gets no commands"""
+    changes = {}
+    for agent_name in dict.fromkeys(list(old_file.agent_commands) + list(new_file.agent_commands)):
+        old_commands = old_file.get_agent_commands(agent_name)
+        new_commands = new_file.get_agent_commands(agent_name)
+        if old_commands == new_commands:
+            continue
+        if len(old_commands) < len(new_commands) and new_commands[: len(old_commands)] == old_commands:
+            changes[agent_name] = CommandFileChange(CommandFileChange.APPEND, new_commands[len(old_commands) :])
+        else:
+            changes[agent_name] = CommandFileChange(CommandFileChange.REPLACE, new_commands)
+    return changes
+
+
+def parse_command_file(path: str, text: str) -> CommandFile:
+    """parse the lines of a command file once for all the agents; it only builds plain data, so it runs in a thread"""
+    command_file = CommandFile(path)
+    for line in text.splitlines():
+        words = line.strip().split(" ")
+        if not words[0] or words[0][0] == "#":
+            continue
+        if words[0] == "Queue" and len(words) > 1:
+            command_file.queues.setdefault(words[1], [])
+        elif words[0] == "Queue_Spot" and len(words) > 6:
+            try:
+                spot = (int(words[2]), (float(words[3]), float(words[4]), float(words[5])), float(words[6]))
+            except ValueError:
+                logger.warn("Invalid queue spot in command file %s: %s", path, line)
+                continue
+            command_file.queues.setdefault(words[1], []).append(spot)
+        else:
+            command_file.agent_commands.setdefault(words[0], []).append([word for word in words[1:] if word != ""])
+    return command_file
+
+
+class CommandFileLoader:
+    """
+    Loads the command files with async asset server requests and parses them off the frame loop, once for all the
+    agents which read the same file. `request()` returns a loaded file right away, else the agent gets the file
+    through its callback when the load completes. The loaded files are forgotten when the simulation stops or the
+    stage is closing, so that each play reads the files again.
+
+    When `PeopleSettings.COMMAND_FILE_WATCH_ENABLED` is set, the files with listeners are polled every
+    `COMMAND_FILE_WATCH_INTERVAL` seconds. An edited file is parsed again and diffed per agent, and the listeners get
+    the changed agents only, see `add_listener()`.
+    """
+
+    __instance: CommandFileLoader = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of CommandFileLoader is allowed")
+        # command file path -> parsed file
+        self._files: dict[str, CommandFile] = {}
+        # command file path -> running load and the (on_loaded, on_failed) callbacks waiting for it
+        self._tasks: dict[str, asyncio.Future] = {}
+        self._callbacks: dict[str, list[tuple[Callable[[CommandFile], None], Callable[[], None] | None]]] = {}
+        # bumped by invalidate(), the files read before are not cached
+        self._generation = 0
+        # command file path -> listeners of its changes, and the task which watches it
+        self._listeners: dict[str, list[Callable[[CommandFile, dict[str, CommandFileChange]], None]]] = {}
+        self._watch_tasks: dict[str, asyncio.Future] = {}
+        self._people_settings = PeopleSettings.get_instance()
+        CommandFileLoader.__instance = self
+        self._watch_setting_sub = carb.settings.get_settings().subscribe_to_node_change_events(
+            PeopleSettings.COMMAND_FILE_WATCH_ENABLED, self._on_watch_enabled_changed
+        )
+
+        dispatcher = carb.eventdispatcher.get_eventdispatcher()
+        self._stage_closing_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.CLOSING),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.command_file_loader._stage_closing_event_sub",
+        )
+        self._stage_animation_stop_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.ANIMATION_STOP_PLAY),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.command_file_loader._stage_animation_stop_event_sub",
+        )
+        self._stage_simulation_stop_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.SIMULATION_STOP_PLAY),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.command_file_loader._stage_simulation_stop_event_sub",
+        )
+
+    def destroy(self):
+        carb.settings.get_settings().unsubscribe_to_change_events(self._watch_setting_sub)
+        self._watch_setting_sub = None
+        self._stage_closing_event_sub = None
+        self._stage_animation_stop_event_sub = None
+        self._stage_simulation_stop_event_sub = None
+        for task in list(self._tasks.values()) + list(self._watch_tasks.values()):
+            task.cancel()
+        self._tasks = {}
+        self._watch_tasks = {}
+        self._listeners = {}
+        self._callbacks = {}
+        self._files = {}
+        CommandFileLoader.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> CommandFileLoader:
+        if cls.__instance is None:
+            CommandFileLoader()
+        return cls.__instance
+
+    @classmethod
+    def destroy_instance(cls):
+        """destroy the instance if there is one, without creating it"""
+        if cls.__instance is not None:
+            cls.__instance.destroy()
+
+    def _on_stage_event(self, event):
+        """forget the loaded files, the files edited while the simulation was stopped are read on the next play"""
+        self.invalidate()
+
+    def get(self, path: str) -> CommandFile | None:
+        return self._files.get(path)
+
+    def is_loading(self, path: str) -> bool:
+        return path in self._tasks
+
+    def is_watching(self, path: str) -> bool:
+        return path in self._watch_tasks
+
+    def request(
+        self,
+        path: str,
+        on_loaded: Callable[[CommandFile], None],
+        on_failed: Callable[[], None] | None = None,
+    ) -> CommandFile | None:
+        """
+        the loaded file, or None after starting its load if needed; `on_loaded` is then called with the file once it
+        is loaded, or `on_failed` when the file can't be read
+        """
+        command_file = self._files.get(path)
+        if command_file is not None:
+            return command_file
+        if path not in self._tasks:
+            callbacks = self._callbacks[path] = []
+            self._tasks[path] = asyncio.ensure_future(self._load(path, callbacks, self._generation))
+        self._callbacks[path].append((on_loaded, on_failed))
+        return None
+
+    def invalidate(self, path: str | None = None):
+        """
+        forget a loaded file, or all of them, so that the next requests read it again; the loads in flight still call
+        their callbacks but are not cached, and the next requests don't wait for them
+        """
+        self._generation += 1
+        if path is None:
+            self._files = {}
+            self._tasks = {}
+            self._callbacks = {}
+        else:
+            self._files.pop(path, None)
+            self._tasks.pop(path, None)
+            self._callbacks.pop(path, None)
+
+    # ================ Hot reload ================
+
+    def add_listener(self, path: str, listener: Callable[[CommandFile, dict[str, CommandFileChange]], None]):
+        """
+        call `listener` with the reloaded file and the changes of its agents each time the file is reloaded, and
+        watch the file while it has listeners and `PeopleSettings.COMMAND_FILE_WATCH_ENABLED` is set
+        """
+        self._listeners.setdefault(path, []).append(listener)
+        if self._people_settings.command_file_watch_enabled and path not in self._watch_tasks:
+            self._watch_tasks[path] = asyncio.ensure_future(self._watch(path))
+
+    def remove_listener(self, path: str, listener):
+        listeners = self._listeners.get(path, [])
+        if listener in listeners:
+            listeners.remove(listener)
+        if not listeners:
+            self._listeners.pop(path, None)
+            task = self._watch_tasks.pop(path, None)
+            if task is not None:
+                task.cancel()
+
+    async def reload_async(self, path: str) -> dict[str, CommandFileChange]:
+        """
+        read a file again and notify the listeners of the agents whose commands changed; all the agents of the file
+        are changed when it was not loaded
+        """
+        generation = self._generation
+        old_file = self._files.get(path)
+        new_file = await self.load_async(path)
+        if new_file is None or generation != self._generation:
+            return {}
+        self._files[path] = new_file
+        if old_file is None:
+            # the commands the agents got are unknown, all of them are replaced
+            changes = {
+                agent_name: CommandFileChange(CommandFileChange.REPLACE, commands)
+                for agent_name, commands in new_file.agent_commands.items()
+            }
+        else:
+            changes = diff_command_files(old_file, new_file)
+        if changes:
+            logger.info("Command file %s reloaded, commands of %d agents changed", path, len(changes))
+        for listener in list(self._listeners.get(path, [])):
+            try:
+                listener(new_file, changes)
+            except Exception as e:
+                logger.error("Command file listener failed for %s: %s", path, e)
+        return changes
+
+    def _on_watch_enabled_changed(self, item, event_type):
+        # the snapshot may be refreshed after this callback, so read the setting itself
+        if carb.settings.get_settings().get(PeopleSettings.COMMAND_FILE_WATCH_ENABLED):
+            for path in self._listeners:
+                if path not in self._watch_tasks:
+                    self._watch_tasks[path] = asyncio.ensure_future(self._watch(path))
+        else:
+            for task in self._watch_tasks.values():
+                task.cancel()
+            self._watch_tasks = {}
+
+    async def _watch(self, path: str):
+        version = None
+        try:
+            while path in self._listeners:
+                result, entry = await omni.client.stat_async(path)
+                if result == omni.client.Result.OK:
+                    new_version = (entry.modified_time, entry.size)
+                    # the first version is the one loaded by the agents
+                    if version is not None and new_version != version and path in self._files:
+                        await self.reload_async(path)
+                    version = new_version
+                await asyncio.sleep(max(0.1, self._people_settings.command_file_watch_interval))
+        finally:
+            if self._watch_tasks.get(path) is asyncio.current_task():
+                del self._watch_tasks[path]
+
+    async def load_async(self, path: str) -> CommandFile | None:
+        """read and parse a command file without caching it, None when it can't be read"""
+        result, _, content = await omni.client.read_file_async(path)
+        if result != omni.client.Result.OK:
+            logger.error("Unable to read command file at %s.", path)
+            return None
+        text = memoryview(content).tobytes().decode("utf-8")
+        return await asyncio.to_thread(parse_command_file, path, text)
+
+    async def _load(self, path: str, callbacks: list, generation: int):
+        try:
+            command_file = await self.load_async(path)
+        except Exception as e:
+            logger.error("Unable to load command file at %s: %s", path, e)
+            command_file = None
+        finally:
+            # an invalidated load is already replaced
+            if self._tasks.get(path) is asyncio.current_task():
+                del self._tasks[path]
+                del self._callbacks[path]
+        if command_file is not None and generation == self._generation:
+            self._files[path] = command_file
+        for on_loaded, on_failed in callbacks:
+            try:
+                if command_file is not None:
+                    on_loaded(command_file)
+                elif on_failed is not None:
+                    on_failed()
+            except Exception as e:
+                logger.error("Command file callback failed for %s: %s", path, e)
+        return command_file
@@ -9,10 +9,11 @@ from __future__ import annotations
 from typing import Any
 from omni.metropolis.utils.carb_util import CarbUtil
 from omni.metropolis.utils.simulation_util import SimulationUtil
-from omni.anim.people_api.settings import CommandID, MetadataTag, TaskStatus
+from omni.anim.people_api.settings import CommandID, MetadataTag, PeopleSettings, TaskStatus
 
 from ..utils import Utils
 from ..navigation_manager import NavigationManager
+from ..simulation_checkpoint import from_state_value, to_state_value
 from .command_format_helper import CommandFormatHelper
 
 
@@ -42,6 +43,7 @@ class Command(CommandFormatHelper):
         character_name: str = "",
         command_id: str | None = None,
         update_metadata_callback_fn=None,
+        people_settings: PeopleSettings | None = None,
         # character_prim_path = ""
     ):
         """
@@ -70,6 +72,8 @@ class Command(CommandFormatHelper):
             command_id = Utils.generate_unique_id(character_name=self.character_name, prefix=CommandID.auto_prefix)
         self.command_id = command_id
         self.update_metadata_callback = update_metadata_callback_fn
+        # runtime snapshot of the extension settings
+        self.people_settings = people_settings or PeopleSettings.get_instance()
         self.command_description = ""
         self.command_status = TaskStatus.default
         # self.character_prim_path = character_prim_path
@@ -86,6 +90,24 @@ class Command(CommandFormatHelper):
         """set command's status"""
         self.command_status = target_status
 
+    def get_state(self) -> dict:
+        """
+        runtime state of the command, like its phase and timers, see simulation_checkpoint. Only the attributes which
+        are values are stored, the others like the character, the managers or the prims are rebuilt from the command.
+        """
+        state = {}
+        for name, value in vars(self).items():
+            try:
+                state[name] = to_state_value(value)
+            except TypeError:
+                continue
+        return state
+
+    def set_state(self, state: dict):
+        """restore a state of get_state() on a command created from the same command"""
+        for name, value in state.items():
+            setattr(self, name, from_state_value(value))
+
     def setup(self):
         self.time_elapsed = 0
         self.desired_walk_speed = 0
@@ -159,6 +181,8 @@ class Command(CommandFormatHelper):
         self.character.set_world_transform(trans, rotation_fraction)
 
     def walk(self, dt):
+        if self.people_settings.kinematic_enabled:
+            return self.walk_kinematic(dt)
         if self.navigation_manager.destination_reached():
             self.desired_walk_speed = 0.0
             if self.actual_walk_speed < 0.001:
@@ -195,6 +219,36 @@ class Command(CommandFormatHelper):
         self.actual_walk_speed = CarbUtil.clamp(self.actual_walk_speed + delta_walk, 0.0, 1.0)
         self.character.set_variable("Walk", self.actual_walk_speed)
 
+    def walk_kinematic(self, dt):
+        """
+        walk() of the kinematic mode: the character is moved along the path points at the kinematic walk speed,
+        without walk blending or animation graph variables, so that large time steps keep the same command flow
+        """
+        if self.navigation_manager.destination_reached():
+            self.desired_walk_speed = 0.0
+            self.actual_walk_speed = 0.0
+            self.navigation_manager.set_path_points(None)
+            self.update_metadata_callback(
+                agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="Idle"
+            )
+            if self.navigation_manager.get_path_target_rot() is not None:
+                if self.rotate(dt):
+                    self.navigation_manager.set_path_target_rot(None)
+                    self.navigation_manager.clean_path_targets()
+                    return True
+                return False
+            self.navigation_manager.clean_path_targets()
+            return True
+
+        self.set_rotation = False
+        self.desired_walk_speed = 1.0
+        self.actual_walk_speed = 1.0
+        self.update_metadata_callback(
+            agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="Walking"
+        )
+        self.navigation_manager.update_path()
+        self.navigation_manager.advance_along_path(self.people_settings.kinematic_walk_speed * dt, dt)
+
     def fetch_command_info(self):
         """
         Fetch command information to trace current command status
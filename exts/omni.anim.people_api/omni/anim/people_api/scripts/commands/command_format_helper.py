@@ -1,6 +1,9 @@
 from typing import Any, get_origin
 
-import carb
+from omni.anim.people_api.scripts.people_logger import get_logger
+from omni.anim.people_api.settings import LogLevel
+
+logger = get_logger(__name__)
 
 
 def get_inner_type(typ) -> tuple:
@@ -254,10 +257,10 @@ class CommandFormatHelper:
         input_index = 0
         parameter_index = 0
 
-        for parameter_info in cls.parameters_info:
-            carb.log_info(str(parameter_info.collect_info()))
-
-        carb.log_warn("Input command List" + str(command_list))
+        if logger.is_enabled_for(LogLevel.DEBUG):
+            for parameter_info in cls.parameters_info:
+                logger.debug("parameter info: %s", parameter_info.collect_info())
+        logger.debug("Input command list: %s", command_list)
 
         if (not cls.parameters_info) or (not command_list):
             return False
@@ -277,11 +280,10 @@ class CommandFormatHelper:
                 parameter_index += 1
                 parameter_dict[parameter.name] = normal_parameter
                 continue
-            carb.log_info(
-                "target parameter name {parameter_name} fail to match with {input_value}".format(
-                    parameter_name=str(parameter.name),
-                    input_value=str(command_list[input_index: input_index + parameter_length]),
-                )
+            logger.debug(
+                "target parameter name %s fail to match with %s",
+                parameter.name,
+                command_list[input_index: input_index + parameter_length],
             )
 
             if parameter.special_value:
@@ -303,18 +305,18 @@ class CommandFormatHelper:
 
         # if parameters are missing
         if parameter_index < parameter_len:
-            carb.log_warn("parameter missing")
+            logger.debug("parameter missing in command %s", command_list)
             # check whether all missing parameter is optional
             for command_parameter in cls.parameters_info[parameter_index: parameter_len]:
                 if not command_parameter.optional:
-                    carb.log_warn("missing parameter" + str(parameter.name))
+                    logger.warn("missing parameter %s in command %s", command_parameter.name, command_list)
                     return None
 
         # check whether there are too many index in the input
         if input_index < command_len:
-            carb.log_warn("too many index : command len" + str(command_len) + " input index " + str(input_index))
+            logger.warn("too many index : command len %d input index %d", command_len, input_index)
             return None
 
-        carb.log_warn("The parameter dict" + str(parameter_dict))
+        logger.debug("The parameter dict: %s", parameter_dict)
 
         return parameter_dict
@@ -31,7 +31,8 @@ class Dequeue(Command):
         if occuiper == self.character_name:
             self.queue.get_spot(0).set_occupier(None)
             self.navigation_manager.generate_goto_path(self.path)
-            self.character.set_variable("Action", "Walk")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "Walk")
         else:
             self.force_quit_command()
 
@@ -88,7 +88,8 @@ class GoTo(Command):
 
     def setup(self):
         super().setup()
-        self.character.set_variable("Action", "Walk")
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("Action", "Walk")
         self.navigation_manager.generate_goto_path(self.command[1:])
 
     def execute(self, dt):
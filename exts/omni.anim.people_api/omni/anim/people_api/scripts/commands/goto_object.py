@@ -2,10 +2,13 @@ from ..utils import Utils
 from omni.metropolis.utils.carb_util import CarbUtil
 from typing import Any
 from .base_command import Command
+from ..people_logger import get_logger
 import carb
 import omni.usd
 import math
 
+logger = get_logger(__name__)
+
 
 class GoToObject(Command):
     """
@@ -18,7 +21,7 @@ class GoToObject(Command):
     ):
         """check whether the command is correct"""
         command_dict = cls.validate_command_format(command=command)
-        carb.log_warn("This is the command dict" + str(command_dict))
+        logger.debug("GoToObject command parameters: %s", command_dict)
         if not command_dict:
             return False
         # try:
@@ -132,7 +135,8 @@ class GoToObject(Command):
         super().setup()
         prim_path = self.command[1]
         result = self.generate_final_rotation_position(prim_path)
-        self.character.set_variable("Action", "Walk")
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("Action", "Walk")
         self.navigation_manager.generate_goto_path(result)
 
     def execute(self, dt):
@@ -146,7 +150,7 @@ class GoToObject(Command):
     def update(self, dt):
         self.time_elapsed += dt
         if self.walk(dt):
-            carb.log_warn("Reached the Destination")
+            logger.debug("%s reached the destination", self.character_name)
             return self.exit_command()
 
     def force_quit_command(self):
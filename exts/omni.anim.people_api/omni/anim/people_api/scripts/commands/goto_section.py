@@ -91,7 +91,8 @@ class GoToSection(Command):
             target_position = [position[0], position[1], position[2]]
 
             # goto section do not take specific rotation value as setting
-            self.character.set_variable("Action", "Walk")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "Walk")
             self.navigation_manager.generate_path([character_pos, target_position], None)
         else:
             # if the section does not exist in current stage's data
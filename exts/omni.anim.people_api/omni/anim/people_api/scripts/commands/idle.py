@@ -61,7 +61,8 @@ class Idle(Command):
 
     def setup(self):
         super().setup()
-        self.character.set_variable("Action", "None")
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("Action", "None")
         # set the action tag to idle
         self.update_metadata_callback(
             agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="Idle"
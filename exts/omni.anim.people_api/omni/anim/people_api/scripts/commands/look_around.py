@@ -60,19 +60,22 @@ class LookAround(Command):
 
     def setup(self):
         super().setup()
-        self.character.set_variable("Action", "None")
-        self.character.set_variable("lookaround", 1.0)
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("Action", "None")
+            self.character.set_variable("lookaround", 1.0)
         self.update_metadata_callback(
-            agent_name=self.character_name, data_value=MetadataTag.AgentActionTag, data_name="LookingAround"
+            agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="LookingAround"
         )
 
     def exit_command(self):
-        self.character.set_variable("lookaround", 0.0)
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("lookaround", 0.0)
         return super().exit_command()
 
     def update(self, dt):
         return super().update(dt)
 
     def force_quit_command(self):
-        self.character.set_variable("lookaround", 0.0)
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("lookaround", 0.0)
         return super().force_quit_command()
@@ -27,6 +27,21 @@ class QueueCmd(Command):
         self.wait_time_for_rot_correction = 0
         self.command_name = "QueueCmd"
 
+    def get_state(self) -> dict:
+        state = super().get_state()
+        # the spots belong to the queue, they are stored by index
+        state["current_spot"] = self.current_spot.get_index() if self.current_spot is not None else None
+        state["target_spot"] = self.target_spot.get_index() if self.target_spot is not None else None
+        return state
+
+    def set_state(self, state: dict):
+        state = dict(state)
+        current_spot_index = state.pop("current_spot", None)
+        target_spot_index = state.pop("target_spot", None)
+        super().set_state(state)
+        self.current_spot = self.queue.get_spot(current_spot_index) if current_spot_index is not None else None
+        self.target_spot = self.queue.get_spot(target_spot_index) if target_spot_index is not None else None
+
     def setup(self):
         super().setup()
         self.walking = True
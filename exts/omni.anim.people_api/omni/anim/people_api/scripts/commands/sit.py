@@ -10,12 +10,15 @@ import carb
 import omni.usd
 from omni.metropolis.utils.carb_util import CarbUtil
 from ..interactable_object_helper import InteractableObjectHelper
+from ..people_logger import get_logger
 from omni.anim.people_api.settings import TaskStatus
 
 from ..utils import Utils
 from .base_command import Command, MetadataTag
 from typing import Any
 
+logger = get_logger(__name__)
+
 
 class Sit(Command):
     """
@@ -28,7 +31,7 @@ class Sit(Command):
     ):
         """check whether the command is correct"""
         command_dict = cls.validate_command_format(command=command)
-        carb.log_warn("This is the command dict" + str(command_dict))
+        logger.debug("Sit command parameters: %s", command_dict)
         if not command_dict:
             return False
         try:
@@ -148,8 +151,9 @@ class Sit(Command):
             return super().force_quit_command()
 
         if self.current_action == "sit":
-            self.character.set_variable("Action", "Sit")
-            self.character.set_variable("Action", "None")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "Sit")
+                self.character.set_variable("Action", "None")
             self._char_lerp_t = 0.0
             self.current_action = "stand"
             self.update_metadata_callback(
@@ -182,10 +186,12 @@ class Sit(Command):
             self._char_lerp_t = min(self._char_lerp_t + dt, 1.0)
             lerp_pos = CarbUtil.lerp3(self._char_start_pos, self.interact_pos, self._char_lerp_t)
             self.character.set_world_transform(lerp_pos, self._char_start_rot)
-            self.character.set_variable("Action", "Sit")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "Sit")
             self.sit_time += dt
             if self.sit_time > self.duration:
-                self.character.set_variable("Action", "None")
+                if not self.people_settings.kinematic_enabled:
+                    self.character.set_variable("Action", "None")
                 self._char_lerp_t = 0.0
                 self.current_action = "stand"
                 self.update_metadata_callback(
@@ -5,6 +5,7 @@ import carb
 import numpy as np
 import omni.anim.navigation.core as nav
 
+from omni.anim.people_api.scripts.people_logger import get_logger
 from omni.anim.people_api.scripts.utils import Utils
 from omni.metropolis.utils.carb_util import CarbUtil
 from omni.metropolis.utils.type_util import TypeUtil
@@ -13,6 +14,8 @@ from typing import Any
 
 from .base_command import Command
 
+logger = get_logger(__name__)
+
 
 class Talk(Command):
     """
@@ -25,7 +28,7 @@ class Talk(Command):
     ):
         """check whether the command is correct"""
         command_dict = cls.validate_command_format(command=command)
-        carb.log_warn("This is the command dict" + str(command_dict))
+        logger.debug("Talk command parameters: %s", command_dict)
         if not command_dict:
             return False
         try:
@@ -269,7 +272,8 @@ class Talk(Command):
             if target_pos_distance < Utils.CONFIG["TalkDistance"]:
                 # finish the walking method a
                 self.desired_walk_speed = 0.0
-                self.character.set_variable("Action", "None")
+                if not self.people_settings.kinematic_enabled:
+                    self.character.set_variable("Action", "None")
                 self.navigation_manager.set_path_points([])
                 self.navigation_manager.set_path_target_rot(None)
                 self.navigation_manager.clean_path_targets()
@@ -287,9 +291,9 @@ class Talk(Command):
                     self.current_action = "waiting"
 
         elif self.current_action == "waiting":
-            carb.log_warn("start talking!!")
+            logger.debug("%s is waiting for %s to talk", self.character_name, self.target_character_name)
             if self.start_talking(self.target_character_name):
-                carb.log_warn(" host character start talking!!")
+                logger.debug("host character %s starts talking", self.character_name)
                 # set state to wait to quit
                 self.current_action = "quiting"
                 # inject command to the current character
@@ -308,7 +312,8 @@ class Talk(Command):
 
         # quit the command
         elif self.current_action == "quiting":
-            self.character.set_variable("Action", "None")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "None")
             return self.exit_command()
 
         return
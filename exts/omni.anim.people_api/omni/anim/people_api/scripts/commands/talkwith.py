@@ -71,7 +71,8 @@ class TalkWith(Command):
 
     def setup(self):
         super().setup()
-        self.character.set_variable("Action", "Walk")
+        if not self.people_settings.kinematic_enabled:
+            self.character.set_variable("Action", "Walk")
         if len(self.command) >= 3:
             self.talk_time = float(self.command[2])
 
@@ -111,11 +112,13 @@ class TalkWith(Command):
                 agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="Talking"
             )
             # self.character.set_variable("Action", "None")
-            self.character.set_variable("Action", "Talk")
+            if not self.people_settings.kinematic_enabled:
+                self.character.set_variable("Action", "Talk")
             # self.character.set_variable("lookaround", 1.0)
             self.talk_time_counter += dt
             if self.talk_time_counter > self.talk_time:
-                self.character.set_variable("Action", "None")
+                if not self.people_settings.kinematic_enabled:
+                    self.character.set_variable("Action", "None")
                 self.update_metadata_callback(
                     agent_name=self.character_name, data_name=MetadataTag.AgentActionTag, data_value="Idle"
                 )
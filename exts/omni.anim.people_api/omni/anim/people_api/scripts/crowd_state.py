@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from itertools import chain
+
+import numpy as np
+from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+
+
+@dataclass
+class CrowdState:
+    """
+    State of the crowd as arrays, one row per agent, as last published by the agents to the
+    `GlobalCharacterPositionManager`. Distances of the nearest queries are measured on the ground plane. The arrays of
+    a cached state are read-only.
+    """
+
+    # (N,) prim paths
+    ids: np.ndarray
+    # (N, 3) positions
+    positions: np.ndarray
+    # (N, 4) rotation quaternions as (x, y, z, w), identity when the agent publishes no rotation
+    orientations: np.ndarray
+    # (N, 3) velocities estimated from the last published positions, zero when the agent publishes none
+    velocities: np.ndarray
+    # (N,) avoidance radii
+    radii: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def select(self, indices) -> CrowdState:
+        """state of the agents at `indices`, in that order"""
+        return CrowdState(
+            self.ids[indices],
+            self.positions[indices],
+            self.orientations[indices],
+            self.velocities[indices],
+            self.radii[indices],
+        )
+
+    def nearest_to_point(self, point, k: int, max_distance: float = math.inf) -> tuple[np.ndarray, np.ndarray]:
+        """indices and distances of the `k` agents nearest to `point` within `max_distance`, nearest first"""
+        offsets = self.positions[:, :2] - np.array((point[0], point[1]), dtype=np.float64)
+        return self._nearest(np.hypot(offsets[:, 0], offsets[:, 1]), k, max_distance)
+
+    def nearest_to_path(self, path_points, k: int, max_distance: float = math.inf) -> tuple[np.ndarray, np.ndarray]:
+        """indices and distances of the `k` agents nearest to the polyline `path_points` within `max_distance`"""
+        points = np.array([(point[0], point[1]) for point in path_points], dtype=np.float64)
+        if len(points) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+        if len(points) == 1:
+            return self.nearest_to_point(points[0], k, max_distance)
+        # (N, S) distances of each agent to each segment
+        starts = points[:-1]
+        segments = points[1:] - starts
+        lengths_squared = np.maximum(np.einsum("ij,ij->i", segments, segments), 1e-12)
+        offsets = self.positions[:, None, :2] - starts[None, :, :]
+        t = np.clip(np.einsum("nsj,sj->ns", offsets, segments) / lengths_squared, 0.0, 1.0)
+        closest_offsets = offsets - t[:, :, None] * segments[None, :, :]
+        distances = np.sqrt(np.einsum("nsj,nsj->ns", closest_offsets, closest_offsets)).min(axis=1)
+        return self._nearest(distances, k, max_distance)
+
+    def _nearest(self, distances: np.ndarray, k: int, max_distance: float) -> tuple[np.ndarray, np.ndarray]:
+        indices = np.flatnonzero(distances <= max_distance)
+        if k < len(indices):
+            indices = indices[np.argpartition(distances[indices], k)[:k]]
+        indices = indices[np.argsort(distances[indices], kind="stable")]
+        return indices, distances[indices]
+
+
+class CrowdStateCache:
+    """
+    Builds the `CrowdState` of the agents whose prim path starts with `path_prefix` from the position store of the
+    `GlobalCharacterPositionManager`, without looking the characters up. The arrays are only rebuilt when the store
+    changed since the last call, so consumers polling faster than the agents publish get the cached state.
+    """
+
+    def __init__(self, path_prefix: str = ""):
+        self.path_prefix = path_prefix
+        self._version = None
+        self._manager = None
+        self._state = None
+
+    def get(self) -> CrowdState:
+        manager = GlobalCharacterPositionManager.get_instance()
+        if self._state is None or manager is not self._manager or manager.get_version() != self._version:
+            self._state = self._build(manager)
+            self._manager = manager
+            self._version = manager.get_version()
+        return self._state
+
+    def _build(self, manager: GlobalCharacterPositionManager) -> CrowdState:
+        ids = [
+            prim_path
+            for prim_path in manager.get_all_managed_characters()
+            if str(prim_path).startswith(self.path_prefix)
+        ]
+        count = len(ids)
+        positions = [manager.get_character_current_pos(prim_path) for prim_path in ids]
+        orientations = [manager.get_character_rotation(prim_path, (0.0, 0.0, 0.0, 1.0)) for prim_path in ids]
+        velocities = [manager.get_character_velocity(prim_path, (0.0, 0.0, 0.0)) for prim_path in ids]
+        radii = manager.get_all_character_radius()
+        arrays = (
+            np.array([str(prim_path) for prim_path in ids], dtype=object),
+            _to_array(positions, count, 3),
+            _to_array(orientations, count, 4),
+            _to_array(velocities, count, 3),
+            np.fromiter((radii.get(prim_path, 0.0) for prim_path in ids), dtype=np.float64, count=count),
+        )
+        # the state is shared by all the callers until the store changes
+        for array in arrays:
+            array.flags.writeable = False
+        return CrowdState(*arrays)
+
+
+def _to_array(vectors, count: int, size: int) -> np.ndarray:
+    values = chain.from_iterable((vector[index] for index in range(size)) for vector in vectors)
+    return np.fromiter(values, dtype=np.float64, count=count * size).reshape(count, size)
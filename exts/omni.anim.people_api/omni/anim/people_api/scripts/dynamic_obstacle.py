@@ -11,6 +11,7 @@ import carb
 from omni.metropolis.utils.carb_util import CarbUtil
 from omni.metropolis.utils.usd_util import USDUtil
 from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+from omni.anim.people_api.scripts.simulation_checkpoint import from_state_value, to_state_value
 from omni.kit.scripting import BehaviorScript
 
 from .utils import Utils
@@ -55,6 +56,21 @@ class DynamicObstacle(BehaviorScript):
         self.prim_obj = None
         self.character_manager = None
 
+    def get_runtime_state(self) -> dict:
+        """position history of the velocity estimate, see simulation_checkpoint"""
+        return {
+            "positions_over_time": to_state_value(getattr(self, "positions_over_time", [])),
+            "delta_time_list": to_state_value(getattr(self, "delta_time_list", [])),
+            "velocity_vec": to_state_value(getattr(self, "velocity_vec", None)),
+        }
+
+    def set_runtime_state(self, state: dict) -> bool:
+        self.positions_over_time = from_state_value(state["positions_over_time"])
+        self.delta_time_list = from_state_value(state["delta_time_list"])
+        if state["velocity_vec"] is not None:
+            self.velocity_vec = from_state_value(state["velocity_vec"])
+        return True
+
     def publish_object_position(self, delta_time):
         t = USDUtil.get_prim_pos(prim=self.prim_obj)
         n = 10
@@ -78,6 +94,7 @@ class DynamicObstacle(BehaviorScript):
             self.object_path, CarbUtil.add3(t, CarbUtil.scale3(self.velocity_vec, radius / 0.5))
         )
         self.character_manager.set_character_radius(self.object_path, radius * 1.5)
+        self.character_manager.set_character_velocity(self.object_path, self.velocity_vec)
 
     def on_destroy(self):
         self.clean()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+
+import carb
+import omni.kit.app
+import omni.usd
+from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+from omni.anim.people_api.scripts.trace_recorder import TraceRecorder
+from omni.anim.people_api.settings import PeopleSettings
+from omni.metropolis.utils.carb_util import CarbUtil
+
+
+class DeferrableWork:
+    AVOIDANCE = "avoidance"
+    # new commands request their navmesh path when they start
+    PATH_REQUEST = "path_request"
+    EVENT = "event"
+
+    ALL = (AVOIDANCE, PATH_REQUEST, EVENT)
+
+
+class FrameBudgetGovernor:
+    """
+    Global class which bounds the CPU time spent in character behavior updates.
+
+    Behaviors report the time spent in their update. Once the time spent in the current frame exceeds
+    `PeopleSettings.BUDGET_FRAME_MS`, low priority work (avoidance, path requests of new commands and command events)
+    of agents far from the focus point is deferred to later frames. Agents are kept in a ring and every frame a window
+    of the ring is served regardless of the budget, so no agent is deferred for more than
+    `PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES` frames in a row. A budget of 0 disables the governor.
+
+    Agents are identified by their prim path, the key of `GlobalCharacterPositionManager`.
+    """
+
+    __instance: FrameBudgetGovernor = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of FrameBudgetGovernor is allowed")
+        FrameBudgetGovernor.__instance = self
+        self._people_settings = PeopleSettings.get_instance()
+        self._character_manager = GlobalCharacterPositionManager.get_instance()
+        self._perf_stats = PerfStats.get_instance()
+        self._trace_recorder = TraceRecorder.get_instance()
+        self._focus_point = None
+
+        # agent prim path -> position in the round robin ring
+        self._ring: dict[str, int] = {}
+        self._cursor = 0
+        self._frame_time = 0.0
+        self._frame_started = False
+        # wall clock range of the behavior updates of the current frame, for the crowd tick trace span
+        self._frame_first_start_time = 0.0
+        self._frame_last_end_time = 0.0
+        self._last_frame_time = 0.0
+        # events waiting for a frame with budget left, as (frame index, event name, payload)
+        self._pending_events: deque = deque()
+        self._frame_index = 0
+        self._frame_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._last_frame_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._total_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._over_budget_frames = 0
+
+        dispatcher = carb.eventdispatcher.get_eventdispatcher()
+        self._post_update_sub = dispatcher.observe_event(
+            event_name=omni.kit.app.GLOBAL_EVENT_POST_UPDATE,
+            on_event=self._on_post_update,
+            observer_name="omni.anim.people_api.scripts.frame_budget_governor._post_update_sub",
+        )
+        self._stage_closing_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.CLOSING),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.frame_budget_governor._stage_closing_event_sub",
+        )
+        self._stage_simulation_stop_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.SIMULATION_STOP_PLAY),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.frame_budget_governor._stage_simulation_stop_event_sub",
+        )
+
+    def destroy(self):
+        self._post_update_sub = None
+        self._stage_closing_event_sub = None
+        self._stage_simulation_stop_event_sub = None
+        self._flush_events(force=True)
+        self._ring = {}
+        FrameBudgetGovernor.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> FrameBudgetGovernor:
+        if cls.__instance is None:
+            FrameBudgetGovernor()
+        return cls.__instance
+
+    def _on_post_update(self, event):
+        self.end_frame()
+
+    def _on_stage_event(self, event):
+        """
+        send the deferred events and forget all agents when the simulation stops or the stage is closing
+        """
+        self._flush_events(force=True)
+        self._ring = {}
+        self._cursor = 0
+
+    # ================ Budget ================
+
+    def is_enabled(self) -> bool:
+        return self._people_settings.budget_frame_ms > 0
+
+    def set_focus_point(self, point):
+        """set the point, usually the sensor position, around which agents are never deferred; None to clear it"""
+        self._focus_point = point
+
+    def begin_update(self) -> float:
+        """mark the start of a behavior update; returns the token to pass to `end_update`"""
+        if not self._frame_started:
+            self._frame_started = True
+            self._frame_first_start_time = time.perf_counter()
+            if self._pending_events:
+                # first update of the frame, send the events deferred by previous frames
+                self._flush_events()
+        return time.perf_counter()
+
+    def end_update(self, start_time: float) -> float:
+        """add the time spent since `begin_update` to the time of the current frame; returns that time"""
+        self._frame_last_end_time = time.perf_counter()
+        elapsed_time = self._frame_last_end_time - start_time
+        self._frame_time += elapsed_time
+        return elapsed_time
+
+    def is_over_budget(self) -> bool:
+        budget_ms = self._people_settings.budget_frame_ms
+        return budget_ms > 0 and self._frame_time * 1000.0 > budget_ms
+
+    def should_run(self, agent_name: str, work: str) -> bool:
+        """
+        check whether an agent's deferrable work can run in this frame; deferred work is counted in the stats
+        """
+        if not self.is_over_budget():
+            return True
+        if self._is_due(agent_name) or self._is_near(agent_name):
+            return True
+        self._frame_deferred[work] += 1
+        return False
+
+    def dispatch_event(self, event_name: str, payload: dict):
+        """dispatch an event now, or in a later frame once the budget of this frame is exhausted"""
+        if self._pending_events or self.is_over_budget():
+            # keep the events in order once one of them has been deferred
+            self._pending_events.append((self._frame_index, event_name, payload))
+            self._frame_deferred[DeferrableWork.EVENT] += 1
+            self._perf_stats.count("events.deferred")
+            return
+        self._perf_stats.count("events.dispatched")
+        carb.eventdispatcher.get_eventdispatcher().dispatch_event(event_name=event_name, payload=payload)
+
+    def end_frame(self):
+        """close the current frame: move the round robin window and publish the frame stats"""
+        if self._frame_started:
+            self._trace_recorder.add_span(
+                "crowd.tick", self._frame_first_start_time, self._frame_last_end_time - self._frame_first_start_time
+            )
+        if self._frame_time * 1000.0 > self._people_settings.budget_frame_ms > 0:
+            self._over_budget_frames += 1
+        if self._ring:
+            self._cursor = (self._cursor + self._window_size()) % len(self._ring)
+        for work, count in self._frame_deferred.items():
+            self._total_deferred[work] += count
+        self._last_frame_deferred = self._frame_deferred
+        self._frame_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._last_frame_time = self._frame_time
+        self._frame_time = 0.0
+        self._frame_started = False
+        self._frame_index += 1
+
+    def _window_size(self) -> int:
+        max_deferral_frames = max(1, self._people_settings.budget_max_deferral_frames)
+        return math.ceil(len(self._ring) / max_deferral_frames)
+
+    def _is_due(self, agent_name: str) -> bool:
+        """check whether the agent is in the part of the ring served this frame regardless of the budget"""
+        index = self._ring.get(agent_name)
+        if index is None:
+            index = self._ring[agent_name] = len(self._ring)
+        return (index - self._cursor) % len(self._ring) < self._window_size()
+
+    def _is_near(self, agent_name: str) -> bool:
+        if self._focus_point is None:
+            return False
+        try:
+            position = self._character_manager.get_character_current_pos(agent_name)
+        except KeyError:
+            return False
+        return CarbUtil.dist3(position, self._focus_point) < self._people_settings.budget_near_distance
+
+    def _flush_events(self, force: bool = False):
+        dispatcher = carb.eventdispatcher.get_eventdispatcher()
+        max_deferral_frames = max(1, self._people_settings.budget_max_deferral_frames)
+        start_time = time.perf_counter()
+        while self._pending_events:
+            frame_index, event_name, payload = self._pending_events[0]
+            if not force and self.is_over_budget() and self._frame_index - frame_index < max_deferral_frames:
+                break
+            self._pending_events.popleft()
+            self._perf_stats.count("events.dispatched")
+            dispatcher.dispatch_event(event_name=event_name, payload=payload)
+            # sending deferred events is part of the crowd update time
+            now = time.perf_counter()
+            self._frame_time += now - start_time
+            start_time = now
+
+    def forget_agent(self, agent_name: str):
+        """remove an agent from the round robin ring"""
+        if self._ring.pop(agent_name, None) is not None:
+            self._ring = {name: index for index, name in enumerate(self._ring)}
+
+    # ================ Stats ================
+
+    def get_stats(self) -> dict:
+        """return the frame time and deferred work counts of the last frame and since the last reset"""
+        return {
+            "budget_ms": self._people_settings.budget_frame_ms,
+            "last_frame_time_ms": self._last_frame_time * 1000.0,
+            "last_frame_deferred": dict(self._last_frame_deferred),
+            "total_deferred": dict(self._total_deferred),
+            "over_budget_frames": self._over_budget_frames,
+            "pending_events": len(self._pending_events),
+            "agent_count": len(self._ring),
+        }
+
+    def reset_stats(self):
+        self._last_frame_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._total_deferred = dict.fromkeys(DeferrableWork.ALL, 0)
+        self._over_budget_frames = 0
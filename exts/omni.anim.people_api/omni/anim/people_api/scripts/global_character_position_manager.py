@@ -11,9 +11,16 @@ from __future__ import annotations
 import omni.usd
 import carb
 
+from .simulation_checkpoint import from_state_value, to_state_value
+
 
 class GlobalCharacterPositionManager:
-    """Global class which stores current and predicted positions of all characters and moving objects."""
+    """
+    Global class which stores current and predicted positions of all characters and moving objects.
+
+    The rotations and the estimated velocities are stored too, for the consumers of the whole crowd state, see
+    `CrowdStateCache`. `get_version()` changes whenever the stored data changes.
+    """
 
     __instance: GlobalCharacterPositionManager = None
 
@@ -23,6 +30,9 @@ class GlobalCharacterPositionManager:
         self._character_positions = {}
         self._character_future_positions = {}
         self._character_radius = {}
+        self._character_rotations = {}
+        self._character_velocities = {}
+        self._version = 0
         GlobalCharacterPositionManager.__instance = self
         self._stage_closing_event_sub = carb.eventdispatcher.get_eventdispatcher().observe_event(
             event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.CLOSING),
@@ -45,7 +55,12 @@ class GlobalCharacterPositionManager:
         )
 
     def destroy(self):
-        GlobalCharacterPositionManager.__instance = None
+        self._stage_closing_event_sub = None
+        self._stage_animation_stop_event_sub = None
+        self._stage_simulation_stop_event_sub = None
+        # a destroyed manager collected late must not clear the instance which replaced it
+        if GlobalCharacterPositionManager.__instance is self:
+            GlobalCharacterPositionManager.__instance = None
 
     def __del__(self):
         self.destroy()
@@ -64,18 +79,68 @@ class GlobalCharacterPositionManager:
         self._character_positions = {}
         self._character_future_positions = {}
         self._character_radius = {}
+        self._character_rotations = {}
+        self._character_velocities = {}
+        self._version += 1
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get_state(self) -> dict:
+        """copy of the stored data, see simulation_checkpoint"""
+        return {
+            "positions": to_state_value(self._character_positions),
+            "future_positions": to_state_value(self._character_future_positions),
+            "radius": to_state_value(self._character_radius),
+            "rotations": to_state_value(self._character_rotations),
+            "velocities": to_state_value(self._character_velocities),
+        }
+
+    def set_state(self, state: dict):
+        """replace the stored data with a state of get_state()"""
+        self._character_positions = from_state_value(state["positions"])
+        self._character_future_positions = from_state_value(state["future_positions"])
+        self._character_radius = from_state_value(state["radius"])
+        self._character_rotations = from_state_value(state["rotations"])
+        self._character_velocities = from_state_value(state["velocities"])
+        self._version += 1
 
     def set_character_radius(self, char_prim_path, radius):
         self._character_radius[char_prim_path] = radius
+        self._version += 1
+
+    def remove_character(self, char_prim_path):
+        self._character_positions.pop(char_prim_path, None)
+        self._character_future_positions.pop(char_prim_path, None)
+        self._character_radius.pop(char_prim_path, None)
+        self._character_rotations.pop(char_prim_path, None)
+        self._character_velocities.pop(char_prim_path, None)
+        self._version += 1
 
     def get_character_radius(self, char_prim_path):
         return self._character_radius[char_prim_path]
 
     def set_character_current_pos(self, char_prim_path, pos):
         self._character_positions[char_prim_path] = pos
+        self._version += 1
 
     def set_character_future_pos(self, char_prim_path, pos):
         self._character_future_positions[char_prim_path] = pos
+        self._version += 1
+
+    def set_character_rotation(self, char_prim_path, rot):
+        self._character_rotations[char_prim_path] = rot
+        self._version += 1
+
+    def set_character_velocity(self, char_prim_path, velocity):
+        self._character_velocities[char_prim_path] = velocity
+        self._version += 1
+
+    def get_character_rotation(self, char_prim_path, default=None):
+        return self._character_rotations.get(char_prim_path, default)
+
+    def get_character_velocity(self, char_prim_path, default=None):
+        return self._character_velocities.get(char_prim_path, default)
 
     def get_character_current_pos(self, char_prim_path):
         return self._character_positions[char_prim_path]
@@ -89,5 +154,8 @@ class GlobalCharacterPositionManager:
     def get_all_character_future_pos(self):
         return self._character_future_positions.values()
 
+    def get_all_character_radius(self):
+        return self._character_radius
+
     def get_all_managed_characters(self):
         return self._character_positions.keys()
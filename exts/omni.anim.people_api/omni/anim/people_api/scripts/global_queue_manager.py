@@ -32,6 +32,27 @@ class GlobalQueueManager:
         for queue in self._queues.values():
             queue.free_queue_spot(character_name)
 
+    def remove_characters_from_queues(self, character_names):
+        """free the queue spots occupied by any of the characters, in one pass over the spots"""
+        character_names = {str(character_name) for character_name in character_names}
+        for queue in self._queues.values():
+            for spot in queue.spots:
+                if spot.is_occupied() and str(spot.get_occupier()) in character_names:
+                    spot.set_occupier(None)
+
+    def get_occupancy(self) -> dict[str, list]:
+        """queue name -> occupier of each spot of the queue"""
+        return {
+            queue_name: [spot.get_occupier() for spot in queue.spots] for queue_name, queue in self._queues.items()
+        }
+
+    def set_occupancy(self, occupancy: dict[str, list]):
+        """restore the occupiers of a get_occupancy() result, the spots missing in it are freed"""
+        for queue_name, queue in self._queues.items():
+            occupiers = occupancy.get(queue_name, [])
+            for spot in queue.spots:
+                spot.set_occupier(occupiers[spot.get_index()] if spot.get_index() < len(occupiers) else None)
+
     def destroy(self):
         GlobalQueueManager.__instance = None
 
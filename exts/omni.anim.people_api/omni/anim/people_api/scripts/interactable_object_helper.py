@@ -40,6 +40,9 @@ class Interactable_Type:
 
 
 class InteractableObjectHelper:
+    # agent name -> paths of the objects the agent owns
+    _owned_object_paths: dict = {}
+
     def is_object_interactable(target_prim, allow_vanila_interact=True):
         """check the states of interactable object"""
         owners_property, _ = InteractableObjectTags.owners
@@ -77,6 +80,9 @@ class InteractableObjectHelper:
         if agent_name in owners:
             owners.remove(agent_name)
             target_prim.GetAttribute(owners_property).Set(owners)
+        owned_object_paths = InteractableObjectHelper._owned_object_paths.get(agent_name)
+        if owned_object_paths is not None:
+            owned_object_paths.discard(str(target_prim.GetPath()))
 
     def add_owner(target_prim, agent_name):
         owners_property, _ = InteractableObjectTags.owners
@@ -93,6 +99,34 @@ class InteractableObjectHelper:
         if agent_name not in owners:
             owners.append(agent_name)
             target_prim.GetAttribute(owners_property).Set(owners)
+        InteractableObjectHelper._owned_object_paths.setdefault(agent_name, set()).add(str(target_prim.GetPath()))
+
+    def remove_all_owners(agent_names, stage=None):
+        """remove the agents from the owners of every object they own, e.g. when the agents are reset"""
+        stage = stage or omni.usd.get_context().get_stage()
+        for agent_name in agent_names:
+            for prim_path in InteractableObjectHelper._owned_object_paths.pop(agent_name, ()):
+                prim = stage.GetPrimAtPath(prim_path)
+                if prim:
+                    InteractableObjectHelper.remove_owner(prim, agent_name)
+
+    def get_owned_object_paths() -> dict:
+        """agent name -> paths of the objects the agent owns"""
+        return {
+            agent_name: sorted(prim_paths)
+            for agent_name, prim_paths in InteractableObjectHelper._owned_object_paths.items()
+            if prim_paths
+        }
+
+    def set_owned_object_paths(owned_object_paths: dict, stage=None):
+        """restore the owners of a get_owned_object_paths() result, the agents don't own any other object"""
+        stage = stage or omni.usd.get_context().get_stage()
+        InteractableObjectHelper.remove_all_owners(list(InteractableObjectHelper._owned_object_paths), stage)
+        for agent_name, prim_paths in owned_object_paths.items():
+            for prim_path in prim_paths:
+                prim = stage.GetPrimAtPath(prim_path)
+                if prim:
+                    InteractableObjectHelper.add_owner(prim, agent_name)
 
     def get_all_interactable_objects_in_stage(root_prim_path: str = ""):
         result = []
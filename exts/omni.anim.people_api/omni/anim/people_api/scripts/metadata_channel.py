@@ -0,0 +1,142 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+from __future__ import annotations
+
+import carb
+import omni.kit.app
+import omni.usd
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+from omni.anim.people_api.settings import AgentEvent, PeopleSettings
+
+
+class MetadataChannel:
+    """
+    Global class which coalesces agent metadata updates.
+
+    Commands report their action tag every frame, but only values that differ from the last emitted value are
+    recorded. Recorded changes are dispatched once per frame as a single `AgentEvent.MetadataBatchUpdateEvent`
+    whose payload holds the (agent, tag, value) records as three parallel lists.
+    """
+
+    __instance: MetadataChannel = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of MetadataChannel is allowed")
+        MetadataChannel.__instance = self
+        # (agent_name, data_name) -> last value sent to consumers
+        self._emitted_values: dict[tuple[str, str], str] = {}
+        # (agent_name, data_name) -> value waiting for the end of the frame, in submission order
+        self._pending_values: dict[tuple[str, str], str] = {}
+
+        self._people_settings = PeopleSettings.get_instance()
+        self._perf_stats = PerfStats.get_instance()
+
+        dispatcher = carb.eventdispatcher.get_eventdispatcher()
+        self._post_update_sub = dispatcher.observe_event(
+            event_name=omni.kit.app.GLOBAL_EVENT_POST_UPDATE,
+            on_event=self._on_post_update,
+            observer_name="omni.anim.people_api.scripts.metadata_channel._post_update_sub",
+        )
+        self._stage_closing_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.CLOSING),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.metadata_channel._stage_closing_event_sub",
+        )
+        self._stage_simulation_stop_event_sub = dispatcher.observe_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.SIMULATION_STOP_PLAY),
+            on_event=self._on_stage_event,
+            observer_name="omni.anim.people_api.scripts.metadata_channel._stage_simulation_stop_event_sub",
+        )
+
+    def destroy(self):
+        self._post_update_sub = None
+        self._stage_closing_event_sub = None
+        self._stage_simulation_stop_event_sub = None
+        self._emitted_values = {}
+        self._pending_values = {}
+        MetadataChannel.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> MetadataChannel:
+        if cls.__instance is None:
+            MetadataChannel()
+        return cls.__instance
+
+    def _on_post_update(self, event):
+        self.flush()
+
+    def _on_stage_event(self, event):
+        """
+        drop all cached values when the simulation stops or the stage is closing
+        """
+        self._emitted_values = {}
+        self._pending_values = {}
+
+    def is_enabled(self) -> bool:
+        return self._people_settings.cache_action_metadata
+
+    def submit(self, agent_name: str, data_name: str, data_value: str):
+        """record a metadata value; it is only emitted if it differs from the last emitted value"""
+        if not self._people_settings.cache_action_metadata:
+            return
+        key = (agent_name, data_name)
+        if self._emitted_values.get(key) == data_value:
+            # the value went back to what consumers already have within this frame
+            self._pending_values.pop(key, None)
+            return
+        self._pending_values[key] = data_value
+
+    def forget_agent(self, agent_name: str):
+        """remove cached values of an agent, so its next value is always emitted"""
+        for cache in (self._emitted_values, self._pending_values):
+            for key in [key for key in cache if key[0] == agent_name]:
+                del cache[key]
+
+    def get_value(self, agent_name: str, data_name: str) -> str | None:
+        """return the latest value of an agent's metadata, including the value pending for this frame"""
+        key = (agent_name, data_name)
+        if key in self._pending_values:
+            return self._pending_values[key]
+        return self._emitted_values.get(key)
+
+    def flush(self):
+        """dispatch all changes recorded during this frame as one event"""
+        if not self._pending_values:
+            return
+        if not self._people_settings.cache_action_metadata:
+            # caching was turned off during this frame
+            self._pending_values = {}
+            return
+        pending_values = self._pending_values
+        self._pending_values = {}
+
+        agent_names = []
+        data_names = []
+        data_values = []
+        for (agent_name, data_name), data_value in pending_values.items():
+            self._emitted_values[(agent_name, data_name)] = data_value
+            agent_names.append(agent_name)
+            data_names.append(data_name)
+            data_values.append(data_value)
+
+        self._perf_stats.count("events.dispatched")
+        dispatcher = carb.eventdispatcher.get_eventdispatcher()
+        dispatcher.dispatch_event(
+            event_name=AgentEvent.MetadataBatchUpdateEvent,
+            payload={"agent_names": agent_names, "data_names": data_names, "data_values": data_values},
+        )
+
+        if self._people_settings.emit_per_agent_metadata_events:
+            self._perf_stats.count("events.dispatched", len(agent_names))
+            for agent_name, data_name, data_value in zip(agent_names, data_names, data_values):
+                dispatcher.dispatch_event(
+                    event_name=AgentEvent.MetadataUpdateEvent,
+                    payload={"agent_name": agent_name, "data_name": data_name, "data_value": data_value},
+                )
@@ -13,12 +13,15 @@ import math
 import carb
 import omni.anim.graph.core as ag
 import omni.anim.navigation.core as nav
-from omni.metropolis.utils.carb_util import CarbUtil, CarbSettingUtil
+from omni.metropolis.utils.carb_util import CarbUtil
 from omni.metropolis.utils.math_util import MathUtil
 from omni.metropolis.utils.simulation_util import SimulationUtil
+from omni.anim.people_api.scripts.frame_budget_governor import DeferrableWork, FrameBudgetGovernor
 from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+from omni.anim.people_api.scripts.perf_stats import PerfStats
 from pxr import Gf
 
+from .simulation_checkpoint import from_state_value, to_state_value
 from .utils import Utils
 from omni.anim.people_api.settings import PeopleSettings
 
@@ -29,9 +32,19 @@ class NavigationManager:
     publishing current and future positions of characters.
     """
 
-    def __init__(self, character_name, navmesh_enabled, dynamic_avoidance_enabled=True, character=None):
+    def __init__(
+        self,
+        character_name,
+        navmesh_enabled,
+        dynamic_avoidance_enabled=True,
+        character=None,
+        people_settings: PeopleSettings | None = None,
+    ):
         self.navmesh = nav.acquire_interface().get_navmesh()
+        self.people_settings = people_settings or PeopleSettings.get_instance()
         self.character_manager = GlobalCharacterPositionManager.get_instance()
+        self.budget_governor = FrameBudgetGovernor.get_instance()
+        self.perf_stats = PerfStats.get_instance()
         self.character_name = character_name
         self.character = character or ag.get_character(self.character_name)
         self.navmesh_enabled = navmesh_enabled
@@ -42,10 +55,16 @@ class NavigationManager:
         self.path_points = []
         self.path_targets = []
         self.path_final_target_rot = None
+        # progress of the kinematic walk: path points being walked and index of the next point
+        self._walked_path_points = None
+        self._next_path_point_index = 0
 
     def destroy(self):
         self.navmesh = None
         self.character_manager = None
+        self.budget_governor = None
+        self.perf_stats = None
+        self.people_settings = None
         self.character_name = None
         self.character = None
         self.navmesh_enabled = None
@@ -55,6 +74,56 @@ class NavigationManager:
         self.path_points = None
         self.path_targets = None
         self.path_final_target_rot = None
+        self._walked_path_points = None
+
+    def reset(self, character=None, navmesh_enabled=None, dynamic_avoidance_enabled=None):
+        """clear the path and the position history in place, e.g. when the character is reset for a new episode"""
+        if character is not None:
+            self.character = character
+        if navmesh_enabled is not None:
+            self.navmesh_enabled = navmesh_enabled
+        if dynamic_avoidance_enabled is not None:
+            self.dynamic_avoidance_enabled = dynamic_avoidance_enabled
+        self.collision_list.clear()
+        self.positions_over_time.clear()
+        self.delta_time_list.clear()
+        self.path_points = []
+        self.path_targets.clear()
+        self.path_final_target_rot = None
+        self._walked_path_points = None
+        self._next_path_point_index = 0
+
+    def get_state(self) -> dict:
+        """path, targets and position history, see simulation_checkpoint"""
+        walking = self.path_points and self._walked_path_points is self.path_points
+        return {
+            "path_points": to_state_value(self.path_points),
+            "path_targets": to_state_value(self.path_targets),
+            "path_final_target_rot": to_state_value(self.path_final_target_rot),
+            "collision_list": to_state_value(self.collision_list),
+            "positions_over_time": to_state_value(self.positions_over_time),
+            "delta_time_list": to_state_value(self.delta_time_list),
+            "velocity_vec": to_state_value(getattr(self, "velocity_vec", None)),
+            # index of the next path point of the kinematic walk
+            "next_path_point_index": self._next_path_point_index if walking else None,
+        }
+
+    def set_state(self, state: dict):
+        """restore a state of get_state()"""
+        self.path_points = from_state_value(state["path_points"])
+        self.path_targets = from_state_value(state["path_targets"])
+        self.path_final_target_rot = from_state_value(state["path_final_target_rot"])
+        self.collision_list = from_state_value(state["collision_list"])
+        self.positions_over_time = from_state_value(state["positions_over_time"])
+        self.delta_time_list = from_state_value(state["delta_time_list"])
+        if state["velocity_vec"] is not None:
+            self.velocity_vec = from_state_value(state["velocity_vec"])
+        if state["next_path_point_index"] is not None:
+            self._walked_path_points = self.path_points
+            self._next_path_point_index = state["next_path_point_index"]
+        else:
+            self._walked_path_points = None
+            self._next_path_point_index = 0
 
     def calculate_rotation_diff(self):
         char_rot_angle = Utils.convert_to_angle(Utils.get_character_rot(self.character))
@@ -110,11 +179,57 @@ class NavigationManager:
         if not self.path_targets:
             return True
 
+    def advance_along_path(self, distance, delta_time):
+        """
+        Kinematic walk: move the character up to `distance` along the path points and turn it towards its walking
+        direction, without the animation graph. Target progress is checked at every path point passed, so a large step
+        pops the same targets as many small ones.
+        """
+        points = self.path_points
+        if not points:
+            return
+        if points is not self._walked_path_points:
+            self._walked_path_points = points
+            self._next_path_point_index = 0
+
+        position, rotation = Utils.get_character_transform(self.character)
+        x, y, z = position.x, position.y, position.z
+        direction = None
+        while distance > 0.0 and self._next_path_point_index < len(points) and not self.destination_reached():
+            target = points[self._next_path_point_index]
+            delta_x, delta_y = target[0] - x, target[1] - y
+            length = math.hypot(delta_x, delta_y)
+            if length > 1e-6:
+                direction = (delta_x, delta_y)
+            if length > distance:
+                fraction = distance / length
+                x, y, z = x + delta_x * fraction, y + delta_y * fraction, z + (target[2] - z) * fraction
+                break
+            x, y, z = float(target[0]), float(target[1]), float(target[2])
+            distance -= length
+            self._next_path_point_index += 1
+            self.character.set_world_transform(carb.Float3(x, y, z), rotation)
+            self.update_target_path_progress()
+
+        if direction is not None:
+            # characters face -y at angle 0, see GoToObject; turn at the rate used for the final rotation
+            current_angle = math.degrees(2.0 * math.atan2(rotation.z, rotation.w))
+            target_angle = math.degrees(math.atan2(direction[0], -direction[1]))
+            max_turn = 90.0 / Utils.CONFIG["SecondPerNightyDegreeTurn"] * delta_time
+            turn = Gf.Clamp((target_angle - current_angle + 180.0) % 360.0 - 180.0, -max_turn, max_turn)
+            half_angle = math.radians(current_angle + turn) * 0.5
+            rotation = carb.Float4(0.0, 0.0, math.sin(half_angle), math.cos(half_angle))
+        self.character.set_world_transform(carb.Float3(x, y, z), rotation)
+
     def publish_character_positions(self, delta_time, radius):
+        with self.perf_stats.scope("navigation.publish_character_positions", agent=self.character_name):
+            self._publish_character_positions(delta_time, radius)
+
+    def _publish_character_positions(self, delta_time, radius):
         if delta_time == 0:
             return
 
-        char_pos = Utils.get_character_pos(self.character)
+        char_pos, char_rot = Utils.get_character_transform(self.character)
         num_frames = 10
 
         # Store the positions and dts of the num_frames last frames
@@ -136,17 +251,22 @@ class NavigationManager:
             self.character_name, CarbUtil.add3(char_pos, CarbUtil.scale3(self.velocity_vec, 1))
         )
         self.character_manager.set_character_radius(self.character_name, radius)
+        self.character_manager.set_character_rotation(self.character_name, char_rot)
+        self.character_manager.set_character_velocity(self.character_name, self.velocity_vec)
 
     def update_target_path_progress(self):
         if len(self.path_targets) == 1:
-            final_distance = CarbSettingUtil.get_value_by_key(PeopleSettings.CHARACTER_FINAL_TARGET_DISTANCE, 0.25)
-            if self.check_proximity_to_point(self.path_targets[0], final_distance):
+            if self.check_proximity_to_point(self.path_targets[0], self.people_settings.final_target_distance):
                 self.path_targets.pop(0)
         if len(self.path_targets) > 1:
             if self.check_proximity_to_point(self.path_targets[0], Utils.CONFIG["MinDistanceToIntermediateTarget"]):
                 self.path_targets.pop(0)
 
     def generate_path(self, coords, path_target_rot=None):
+        with self.perf_stats.scope("navigation.generate_path", agent=self.character_name):
+            self._generate_path(coords, path_target_rot)
+
+    def _generate_path(self, coords, path_target_rot=None):
         self.path_targets = []
         prev_point = coords[0]
         path = []
@@ -155,6 +275,7 @@ class NavigationManager:
 
         for point in coords[1:]:
             if self.navmesh_enabled:
+                self.perf_stats.count("navmesh.path_query")
                 generated_path = self.navmesh.query_shortest_path(prev_point, point, agent_radius=0.5)
                 if generated_path is None:
                     carb.log_warn(
@@ -249,12 +370,25 @@ class NavigationManager:
             return True
         return False
 
+    def is_on_navmesh(self, point) -> bool:
+        self.perf_stats.count("navmesh.validation")
+        return SimulationUtil.validate_navmesh_point_2d([point.x, point.y, 0], agent_radius=0.5)
+
     def update_path(self):
+        with self.perf_stats.scope("navigation.update_path", agent=self.character_name):
+            self._update_path()
+
+    def _update_path(self):
         self.update_target_path_progress()
         if self.destination_reached() or not self.dynamic_avoidance_enabled:
             return
+        if not self.budget_governor.should_run(self.character_name, DeferrableWork.AVOIDANCE):
+            return
 
-        if self.detect_collision():
+        with self.perf_stats.scope("navigation.detect_collision", agent=self.character_name):
+            collision_detected = self.detect_collision()
+        if collision_detected:
+            self.perf_stats.count("navigation.collision", len(self.collision_list))
             current_pos = Utils.get_character_pos(self.character)
 
             # This part decides whether the obstacle should turn left or right to avoid
@@ -330,35 +464,21 @@ class NavigationManager:
                     # If navmesh and the other object will avoid you, pick the best avoidance point if it is on the
                     # navmesh, if it is not then skip as the other object will avoid you anyway.
                     if Utils.is_character(self.collision_list[0]) and self.is_still_moving(self.collision_list[0]):
-                        if direction_of_collision > 0.2 and SimulationUtil.validate_navmesh_point_2d(
-                            [left_future_point.x, left_future_point.y, 0], agent_radius=0.5
-                        ):
+                        if direction_of_collision > 0.2 and self.is_on_navmesh(left_future_point):
                             new_position = left_future_point
-                        elif direction_of_collision <= -0.2 and SimulationUtil.validate_navmesh_point_2d(
-                            [right_future_point.x, right_future_point.y, 0], agent_radius=0.5
-                        ):
+                        elif direction_of_collision <= -0.2 and self.is_on_navmesh(right_future_point):
                             new_position = right_future_point
                         else:
                             return
                     # If the other object is not going to avoid you, then pick the best avoidance point as long as it
                     # is on the navmesh
                     else:
-                        if SimulationUtil.validate_navmesh_point_2d(
-                            [left_future_point.x, left_future_point.y, 0], agent_radius=0.5
-                        ) and (
-                            direction_of_collision > 0.2
-                            or not SimulationUtil.validate_navmesh_point_2d(
-                                [right_future_point.x, right_future_point.y, 0], agent_radius=0.5
-                            )
+                        if self.is_on_navmesh(left_future_point) and (
+                            direction_of_collision > 0.2 or not self.is_on_navmesh(right_future_point)
                         ):
                             new_position = left_future_point
-                        elif SimulationUtil.validate_navmesh_point_2d(
-                            [right_future_point.x, right_future_point.y, 0], agent_radius=0.5
-                        ) and (
-                            direction_of_collision < -0.2
-                            or not SimulationUtil.validate_navmesh_point_2d(
-                                [left_future_point.x, left_future_point.y, 0], agent_radius=0.5
-                            )
+                        elif self.is_on_navmesh(right_future_point) and (
+                            direction_of_collision < -0.2 or not self.is_on_navmesh(left_future_point)
                         ):
                             new_position = right_future_point
                         else:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import sys
+import time
+
+import carb
+from omni.anim.people_api.settings import LogLevel, PeopleSettings
+
+
+class PeopleLogger:
+    """
+    Logging facade of the extension.
+
+    Messages take `%`-style arguments which are only formatted when the message passes the verbosity set by
+    `PeopleSettings.LOG_LEVEL`, so disabled diagnostics cost a level check. Each call site is rate limited to one
+    message per `PeopleSettings.LOG_RATE_LIMIT_INTERVAL` seconds; the number of dropped messages is reported with
+    the next message of that call site. Debug and info messages are written to the carb info channel.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # (file name, line number) -> [time of the last emitted message, number of suppressed messages]
+        self._call_sites: dict[tuple[str, int], list] = {}
+
+    def is_enabled_for(self, level: int) -> bool:
+        """check whether messages of the level are emitted; use it to guard costly argument computation"""
+        return level >= PeopleSettings.get_instance().log_level
+
+    def debug(self, msg: str, *args):
+        self._log(LogLevel.DEBUG, msg, args)
+
+    def info(self, msg: str, *args):
+        self._log(LogLevel.INFO, msg, args)
+
+    def warn(self, msg: str, *args):
+        self._log(LogLevel.WARN, msg, args)
+
+    def error(self, msg: str, *args):
+        self._log(LogLevel.ERROR, msg, args)
+
+    def _log(self, level: int, msg: str, args: tuple):
+        people_settings = PeopleSettings.get_instance()
+        if level < people_settings.log_level:
+            return
+
+        suppressed = 0
+        interval = people_settings.log_rate_limit_interval
+        if interval > 0:
+            caller = sys._getframe(2)
+            call_site = (caller.f_code.co_filename, caller.f_lineno)
+            now = time.monotonic()
+            record = self._call_sites.get(call_site)
+            if record is None:
+                self._call_sites[call_site] = [now, 0]
+            elif now - record[0] < interval:
+                record[1] += 1
+                return
+            else:
+                suppressed = record[1]
+                record[0] = now
+                record[1] = 0
+
+        try:
+            text = msg % args if args else msg
+        except (TypeError, ValueError) as e:
+            text = f"{msg} {args} (format error: {e})"
+        text = f"[{self.name}] {text}"
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+
+        if level >= LogLevel.ERROR:
+            carb.log_error(text)
+        elif level >= LogLevel.WARN:
+            carb.log_warn(text)
+        else:
+            carb.log_info(text)
+
+    def reset(self):
+        """forget the rate limiting state of all call sites"""
+        self._call_sites = {}
+
+
+_loggers: dict[str, PeopleLogger] = {}
+
+
+def get_logger(name: str) -> PeopleLogger:
+    """return the shared logger of a module"""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = PeopleLogger(name)
+    return logger
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import time
+
+import carb
+import omni.kit.app
+from omni.anim.people_api.scripts.trace_recorder import TraceRecorder
+from omni.anim.people_api.settings import PeopleSettings
+
+
+class Histogram:
+    """
+    Histogram of durations in seconds, with fixed logarithmic buckets from 1us to 1s.
+    """
+
+    # upper bound of each bucket in seconds, the last bucket holds everything above 1s
+    BUCKET_BOUNDS = [scale * unit for unit in (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1) for scale in (1, 2, 5)] + [1.0]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(self.BUCKET_BOUNDS) + 1)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[bisect.bisect_left(self.BUCKET_BOUNDS, value)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """approximate a percentile with the upper bound of the bucket it falls into"""
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.BUCKET_BOUNDS):
+                    return min(self.BUCKET_BOUNDS[index], self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        """summary of the histogram, durations in milliseconds"""
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000.0,
+            "mean_ms": self.total * 1000.0 / self.count if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * 1000.0,
+            "max_ms": (self.max or 0.0) * 1000.0,
+            "p50_ms": self.percentile(0.5) * 1000.0,
+            "p95_ms": self.percentile(0.95) * 1000.0,
+            "p99_ms": self.percentile(0.99) * 1000.0,
+            "buckets": {
+                f"<={bound * 1000.0:g}ms": count
+                for bound, count in zip(self.BUCKET_BOUNDS + [float("inf")], self.buckets)
+                if count
+            },
+        }
+
+
+class _NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _TimerScope:
+    def __init__(self, perf_stats: PerfStats, name: str, agent: str | None, command: str | None):
+        self._perf_stats = perf_stats
+        self._name = name
+        self._agent = agent
+        self._command = command
+        self._start_time = 0.0
+
+    def __enter__(self):
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._perf_stats.add_time(
+            self._name, time.perf_counter() - self._start_time, agent=self._agent, command=self._command
+        )
+        return False
+
+
+def timed(name: str):
+    """decorator which runs the whole function in a `PerfStats.scope()`"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with PerfStats.get_instance().scope(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class PerfStats:
+    """
+    Global class which aggregates timers and counters of the hot paths.
+
+    Timers are histograms of durations, fed by `scope()` blocks or `add_time()`. Counters are plain totals fed by
+    `count()`. Nothing is recorded unless `PeopleSettings.PERF_STATS_ENABLED` is set; disabled calls return after a
+    single attribute check. Timed blocks are also recorded as `TraceRecorder` spans when tracing is enabled. When
+    `PeopleSettings.PERF_STATS_DUMP_PATH` is set, the report is written to that JSON file every
+    `PeopleSettings.PERF_STATS_DUMP_INTERVAL` seconds.
+
+    Timers: behavior.on_update, behavior.execute_command, command.setup (first execute of a command, which includes
+    its setup), command.execute, navigation.update_path, navigation.detect_collision, navigation.generate_path,
+    navigation.publish_character_positions.
+    Counters: navmesh.path_query, navmesh.validation, navigation.collision, events.dispatched, events.deferred.
+    """
+
+    __instance: PerfStats = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of PerfStats is allowed")
+        PerfStats.__instance = self
+        self._people_settings = PeopleSettings.get_instance()
+        self._trace_recorder = TraceRecorder.get_instance()
+        self._timers: dict[str, Histogram] = {}
+        self._counters: dict[str, int] = {}
+        self._start_time = time.time()
+        self._last_dump_time = time.monotonic()
+
+        self._post_update_sub = carb.eventdispatcher.get_eventdispatcher().observe_event(
+            event_name=omni.kit.app.GLOBAL_EVENT_POST_UPDATE,
+            on_event=self._on_post_update,
+            observer_name="omni.anim.people_api.scripts.perf_stats._post_update_sub",
+        )
+
+    def destroy(self):
+        self._post_update_sub = None
+        PerfStats.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> PerfStats:
+        if cls.__instance is None:
+            PerfStats()
+        return cls.__instance
+
+    def _on_post_update(self, event):
+        if not self._people_settings.perf_stats_enabled or not self._people_settings.perf_stats_dump_path:
+            return
+        now = time.monotonic()
+        if now - self._last_dump_time < self._people_settings.perf_stats_dump_interval:
+            return
+        self._last_dump_time = now
+        self.dump(self._people_settings.perf_stats_dump_path)
+
+    # ================ Recording ================
+
+    def is_enabled(self) -> bool:
+        return self._people_settings.perf_stats_enabled
+
+    def scope(self, name: str, agent: str | None = None, command: str | None = None):
+        """return a context manager which adds the time spent in its block to the timer"""
+        if not (self._people_settings.perf_stats_enabled or self._people_settings.trace_enabled):
+            return _NULL_SCOPE
+        return _TimerScope(self, name, agent, command)
+
+    def add_time(self, name: str, seconds: float, agent: str | None = None, command: str | None = None):
+        """add a duration which ended just now to the timer"""
+        if self._people_settings.trace_enabled:
+            self._trace_recorder.add_span(name, time.perf_counter() - seconds, seconds, agent=agent, command=command)
+        if not self._people_settings.perf_stats_enabled:
+            return
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = Histogram()
+        timer.add(seconds)
+
+    def mark(self, name: str, agent: str | None = None, command: str | None = None):
+        """record an instant trace event, such as a command start"""
+        if self._people_settings.trace_enabled:
+            self._trace_recorder.add_instant(name, agent=agent, command=command)
+
+    def count(self, name: str, value: int = 1):
+        if not self._people_settings.perf_stats_enabled:
+            return
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    # ================ Report ================
+
+    def get_report(self) -> dict:
+        """return the summary of all timers and counters since the last reset"""
+        return {
+            "start_time": self._start_time,
+            "time": time.time(),
+            "timers": {name: timer.to_dict() for name, timer in sorted(self._timers.items())},
+            "counters": dict(sorted(self._counters.items())),
+        }
+
+    def get_timer(self, name: str) -> Histogram | None:
+        return self._timers.get(name)
+
+    def get_counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def reset(self):
+        self._timers = {}
+        self._counters = {}
+        self._start_time = time.time()
+
+    def dump(self, file_path: str) -> bool:
+        """write the report to a JSON file"""
+        try:
+            folder = os.path.dirname(file_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(self.get_report(), file, indent=2)
+        except OSError as e:
+            carb.log_error(f"Unable to write performance stats to {file_path}: {e}")
+            return False
+        return True
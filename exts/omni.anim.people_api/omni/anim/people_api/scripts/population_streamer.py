@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import math
+import random
+from dataclasses import dataclass
+
+import omni.usd
+from omni.anim.people_api.scripts.character_setup import CharacterBehavior, CharacterSetup
+from omni.anim.people_api.scripts.perf_stats import timed
+from omni.metropolis.utils.simulation_util import SimulationUtil
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoamArea:
+    """disk the streamed characters pick their destinations in, shared by all of them and moved with the focus"""
+
+    center: tuple[float, float, float]
+    radius: float
+
+
+class PopulationStreamer:
+    """
+    Keeps a crowd of `density` characters per square meter around a focus prim, e.g. the robot, on top of a
+    `CharacterSetup`. The characters farther than `outer_radius` from the focus are released to the pool, and
+    characters are spawned at reachable points of the ring at the edge of `inner_radius`, reusing the pooled
+    characters first. The streamed characters are RandomGoto characters which pick their destinations in the inner
+    disk, so that the crowd moves with the focus while at most `max_active_characters` characters are simulated.
+
+    `update()` is called by the owner, e.g. every few simulation steps.
+    """
+
+    def __init__(
+        self,
+        character_setup: CharacterSetup,
+        focus_prim_path: str,
+        inner_radius: float = 15.0,
+        outer_radius: float = 25.0,
+        density: float = 0.02,
+        max_active_characters: int = 50,
+        max_spawns_per_update: int = 4,
+        spawn_ring_width: float = 3.0,
+    ):
+        if outer_radius < inner_radius:
+            raise ValueError("The outer radius of the population streamer must not be smaller than its inner radius")
+        self.character_setup = character_setup
+        self.focus_prim_path = focus_prim_path
+        self.inner_radius = inner_radius
+        self.outer_radius = outer_radius
+        self.density = density
+        self.max_active_characters = max_active_characters
+        self.max_spawns_per_update = max_spawns_per_update
+        self.spawn_ring_width = min(spawn_ring_width, inner_radius)
+        self.roam_area = RoamArea((0.0, 0.0, 0.0), inner_radius)
+        # names of the streamed characters, and of the ones whose behavior roams the area already
+        self._character_names: set[str] = set()
+        self._roaming_names: set[str] = set()
+
+    def get_character_names(self) -> list[str]:
+        return sorted(self._character_names)
+
+    def get_target_count(self) -> int:
+        """number of characters the inner disk should hold"""
+        return min(self.max_active_characters, round(self.density * math.pi * self.inner_radius**2))
+
+    def get_focus_position(self):
+        prim = self.character_setup.stage.GetPrimAtPath(self.focus_prim_path)
+        if not prim:
+            return None
+        return omni.usd.get_world_transform_matrix(prim).ExtractTranslation()
+
+    @timed("population_streamer.update")
+    def update(self, focus_position=None) -> tuple[list[str], list[str]]:
+        """
+        release the characters which left the outer ring and spawn the missing ones around the focus, at most
+        `max_spawns_per_update` per call; returns the names of the (spawned, released) characters
+        """
+        if focus_position is None:
+            focus_position = self.get_focus_position()
+            if focus_position is None:
+                logger.warning("Unable to find the focus prim %s of the population streamer", self.focus_prim_path)
+                return [], []
+        focus_position = tuple(float(value) for value in focus_position)
+        self.roam_area.center = focus_position
+
+        # the characters removed by someone else are not streamed anymore
+        self._character_names.intersection_update(self.character_setup.character_data_dict.keys())
+        self._roaming_names.intersection_update(self._character_names)
+        positions = self._get_character_positions()
+        released_names = [
+            name
+            for name, position in positions.items()
+            if math.hypot(position[0] - focus_position[0], position[1] - focus_position[1]) > self.outer_radius
+        ]
+        if released_names:
+            self._release(released_names)
+            for name in released_names:
+                del positions[name]
+
+        spawn_count = min(self.get_target_count() - len(self._character_names), self.max_spawns_per_update)
+        spawned_names = self._spawn(focus_position, spawn_count, positions.values()) if spawn_count > 0 else []
+        self._assign_roam_area()
+        return spawned_names, released_names
+
+    def stop(self):
+        """release all the streamed characters"""
+        self._release(list(self._character_names))
+
+    def _get_character_positions(self) -> dict[str, tuple]:
+        """name -> position of the streamed characters, as published for the avoidance or else as spawned"""
+        crowd_state = self.character_setup.get_crowd_state()
+        published_positions = dict(zip(crowd_state.ids.tolist(), crowd_state.positions.tolist()))
+        positions = {}
+        for name in self._character_names:
+            skel_root_path, _ = self.character_setup.trigger_state_api_dict.get(name, (None, None))
+            position = published_positions.get(str(skel_root_path))
+            if position is None:
+                position = self.character_setup.character_data_dict[name].position
+            positions[name] = tuple(position)
+        return positions
+
+    def _get_behavior(self, name: str):
+        skel_root_path, _ = self.character_setup.trigger_state_api_dict.get(name, (None, None))
+        return SimulationUtil.get_agent_script_instance_by_path(skel_root_path)
+
+    def _release(self, names: list[str]):
+        behaviors = [self._get_behavior(name) for name in names]
+        self.character_setup.release_characters(names)
+        # after the release, so that the parked characters don't pick new destinations
+        for behavior in behaviors:
+            if behavior is not None and hasattr(behavior, "set_roam_area"):
+                behavior.set_roam_area(None)
+        self._character_names.difference_update(names)
+        self._roaming_names.difference_update(names)
+
+    def _spawn(self, focus_position: tuple, count: int, occupied_points) -> list[str]:
+        character_setup = self.character_setup
+        if character_setup.navmesh is None:
+            return []
+        # random points of the spawn ring, moved to a reachable navmesh point nearby
+        ring_min_radius = self.inner_radius - self.spawn_ring_width
+        xy_positions = []
+        for _ in range(count):
+            angle = random.uniform(0, 2 * math.pi)
+            distance = math.sqrt(random.uniform(ring_min_radius**2, self.inner_radius**2))
+            xy_positions.append(
+                (focus_position[0] + distance * math.cos(angle), focus_position[1] + distance * math.sin(angle))
+            )
+        sampler = character_setup._get_spawn_sampler(goal=focus_position, occupied_points=list(occupied_points))
+        result = sampler.sample_near(xy_positions, self.spawn_ring_width * 0.5, height=focus_position[2])
+        if not result.is_complete():
+            # usual at the border of the navmesh, the next updates try again
+            logger.debug("Population streamer spawn positions: %s", result.describe())
+        if not result.positions:
+            return []
+        spawned_names = character_setup.spawn_characters(result.positions, CharacterBehavior.RANDOM_GOTO)
+        self._character_names.update(spawned_names)
+        return spawned_names
+
+    def _assign_roam_area(self):
+        # the behaviors of new characters only exist once their script is loaded
+        for name in self._character_names - self._roaming_names:
+            behavior = self._get_behavior(name)
+            if behavior is None:
+                continue
+            if hasattr(behavior, "set_roam_area"):
+                behavior.set_roam_area(self.roam_area)
+            self._roaming_names.add(name)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import carb
+import omni.anim.graph.core as ag
+import omni.kit.app
+import omni.usd
+from omni.anim.people_api.scripts.people_logger import get_logger
+from omni.anim.people_api.scripts.utils import Utils
+from pxr import PhysxSchema, Usd, UsdGeom, UsdPhysics
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PedestrianContact:
+    # path of the SkelRoot of the character, which is its rigid body
+    character_path: str
+    # contact point, in world space
+    position: tuple[float, float, float]
+    # magnitude of the impulse of the last contact report
+    impulse: float
+
+
+class RobotContactMonitor:
+    """
+    Keeps the set of pedestrians touching the robot.
+
+    With PhysX, a contact report API is applied to the rigid bodies of the robot and the contact report events update
+    the set incrementally: a pedestrian is added when a contact is found, its impulse is updated while the contact
+    persists and it is removed when the contact is lost. Without PhysX, e.g. on the offline backend, the robot and the
+    pedestrians are approximated by vertical capsules, which are tested after each frame. The capsules are also used
+    while the robot prim is missing, until it is added to the stage. In both modes `get_contacts()` costs O(contacts).
+
+    Only the characters added with `add_characters()` are reported.
+    """
+
+    def __init__(
+        self,
+        robot_prim_path: str,
+        robot_radius: float = 0.5,
+        robot_height: float = 1.0,
+        character_radius: float = 0.3,
+        character_height: float = 1.7,
+        robot_position_getter=None,
+    ):
+        self.robot_prim_path = str(robot_prim_path).rstrip("/")
+        # capsules of the fallback mode, see vertical_capsule_contact()
+        self.robot_radius = robot_radius
+        self.robot_height = robot_height
+        self.character_radius = character_radius
+        self.character_height = character_height
+        # returns the base position of the robot in the fallback mode, the robot prim translation by default
+        self._robot_position_getter = robot_position_getter or self._get_robot_prim_position
+        self._character_paths: set[str] = set()
+        # character path -> contact, in the order the contacts were found
+        self._contacts: dict[str, PedestrianContact] = {}
+        # character path -> penetration depth of the last capsule test, for the impulse estimate
+        self._penetration_depths: dict[str, float] = {}
+        self._int_to_path = None
+        self._contact_report_sub = None
+        self._post_update_sub = None
+        self._uses_physx = False
+        # PhysX is available but the robot prim is not on the stage yet
+        self._waiting_for_robot_prim = False
+
+    def start(self):
+        """subscribe to the PhysX contact reports of the robot, or to the frame updates when PhysX is missing"""
+        self.stop()
+        self._uses_physx = self._start_physx()
+        if not self._uses_physx:
+            if self._waiting_for_robot_prim:
+                logger.warn(
+                    "Robot prim %s not found, capsule contacts are used until it is added", self.robot_prim_path
+                )
+            self._post_update_sub = carb.eventdispatcher.get_eventdispatcher().observe_event(
+                event_name=omni.kit.app.GLOBAL_EVENT_POST_UPDATE,
+                on_event=self._on_post_update,
+                observer_name="omni.anim.people_api.scripts.robot_contact_monitor._post_update_sub",
+            )
+
+    def stop(self):
+        self._contact_report_sub = None
+        self._post_update_sub = None
+        self._waiting_for_robot_prim = False
+        self._contacts = {}
+        self._penetration_depths = {}
+
+    def destroy(self):
+        self.stop()
+        self._character_paths = set()
+
+    def uses_physx(self) -> bool:
+        return self._uses_physx
+
+    def add_characters(self, character_paths):
+        self._character_paths.update(str(character_path) for character_path in character_paths)
+
+    def remove_characters(self, character_paths):
+        for character_path in character_paths:
+            self._character_paths.discard(str(character_path))
+            self._contacts.pop(str(character_path), None)
+            self._penetration_depths.pop(str(character_path), None)
+
+    def get_contacts(self) -> list[PedestrianContact]:
+        return list(self._contacts.values())
+
+    def is_touching(self, character_path: str) -> bool:
+        return str(character_path) in self._contacts
+
+    def _is_robot_path(self, path: str) -> bool:
+        return path == self.robot_prim_path or path.startswith(self.robot_prim_path + "/")
+
+    # ================ PhysX contact reports ================
+
+    def _start_physx(self) -> bool:
+        try:
+            from omni.physx import get_physx_simulation_interface
+            from pxr import PhysicsSchemaTools
+        except ImportError:
+            return False
+        stage = omni.usd.get_context().get_stage()
+        robot_prim = stage.GetPrimAtPath(self.robot_prim_path) if stage and self.robot_prim_path else None
+        self._waiting_for_robot_prim = not robot_prim
+        if not robot_prim:
+            return False
+
+        # contacts are only reported for the bodies with a contact report API, which is authored in a session
+        # sublayer so that the robot asset is not edited; the Usd schema API is not safe in an Sdf.ChangeBlock
+        rigid_body_prims = [prim for prim in Usd.PrimRange(robot_prim) if prim.HasAPI(UsdPhysics.RigidBodyAPI)]
+        with Usd.EditContext(stage, Utils.get_session_sublayer(stage)):
+            for prim in rigid_body_prims:
+                if not prim.HasAPI(PhysxSchema.PhysxContactReportAPI):
+                    contact_report_api = PhysxSchema.PhysxContactReportAPI.Apply(prim)
+                    contact_report_api.CreateThresholdAttr().Set(0.0)
+        self._int_to_path = PhysicsSchemaTools.intToSdfPath
+        self._contact_report_sub = get_physx_simulation_interface().subscribe_contact_report_events(
+            self._on_contact_report
+        )
+        return True
+
+    def _on_contact_report(self, contact_headers, contact_data):
+        from omni.physx.bindings._physx import ContactEventType
+
+        for contact_header in contact_headers:
+            actor0 = str(self._int_to_path(contact_header.actor0))
+            actor1 = str(self._int_to_path(contact_header.actor1))
+            if actor0 in self._character_paths and self._is_robot_path(actor1):
+                character_path = actor0
+            elif actor1 in self._character_paths and self._is_robot_path(actor0):
+                character_path = actor1
+            else:
+                continue
+
+            if contact_header.type == ContactEventType.CONTACT_LOST:
+                self._contacts.pop(character_path, None)
+                continue
+            impulse = [0.0, 0.0, 0.0]
+            position = None
+            first_index = contact_header.contact_data_offset
+            for index in range(first_index, first_index + contact_header.num_contact_data):
+                contact_point = contact_data[index]
+                impulse[0] += contact_point.impulse[0]
+                impulse[1] += contact_point.impulse[1]
+                impulse[2] += contact_point.impulse[2]
+                if position is None:
+                    position = tuple(contact_point.position)
+            if position is None:
+                previous_contact = self._contacts.get(character_path)
+                position = previous_contact.position if previous_contact else (0.0, 0.0, 0.0)
+            self._contacts[character_path] = PedestrianContact(character_path, position, math.hypot(*impulse))
+
+    # ================ Capsule fallback ================
+
+    def _get_robot_prim_position(self):
+        # offline, a robot driven as a character has no prim
+        character = ag.get_character(self.robot_prim_path)
+        if character is not None:
+            return Utils.get_character_pos(character)
+        prim = omni.usd.get_context().get_stage().GetPrimAtPath(self.robot_prim_path)
+        if not prim:
+            return None
+        return UsdGeom.Xformable(prim).ComputeLocalToWorldTransform(Usd.TimeCode.Default()).ExtractTranslation()
+
+    def _on_post_update(self, event):
+        # the contact reports take over once the robot prim is added
+        if self._waiting_for_robot_prim and self._start_physx():
+            self._uses_physx = True
+            self._post_update_sub = None
+            self._contacts = {}
+            self._penetration_depths = {}
+            return
+        self.update_capsule_contacts(event.get("dt", 0.0))
+
+    def update_capsule_contacts(self, delta_time: float = 0.0):
+        """
+        test the capsule of the robot against the capsule of each character; the impulse is estimated from the
+        penetration speed and the collision mass of the pedestrians, see `Utils.PEDESTRIAN_COLLISION_MASS`
+        """
+        robot_position = self._robot_position_getter()
+        if robot_position is None:
+            self._contacts = {}
+            self._penetration_depths = {}
+            return
+        contacts = {}
+        penetration_depths = {}
+        for character_path in self._character_paths:
+            character = ag.get_character(character_path)
+            if character is None:
+                continue
+            contact = vertical_capsule_contact(
+                Utils.get_character_pos(character),
+                self.character_radius,
+                self.character_height,
+                robot_position,
+                self.robot_radius,
+                self.robot_height,
+            )
+            if contact is None:
+                continue
+            depth, position = contact
+            impulse = 0.0
+            if delta_time > 0.0:
+                speed = max(depth - self._penetration_depths.get(character_path, 0.0), 0.0) / delta_time
+                impulse = min(Utils.PEDESTRIAN_COLLISION_MASS * speed, Utils.PEDESTRIAN_MAX_CONTACT_IMPULSE)
+            contacts[character_path] = PedestrianContact(character_path, position, impulse)
+            penetration_depths[character_path] = depth
+        self._contacts = contacts
+        self._penetration_depths = penetration_depths
+
+
+def vertical_capsule_contact(base_a, radius_a, height_a, base_b, radius_b, height_b):
+    """
+    contact of two capsules standing on their base point along Z, as (penetration depth, contact point on the
+    surface of capsule a), or None when they don't touch
+    """
+    # axis segments, between the centers of the caps
+    bottom_a, top_a = base_a[2] + radius_a, base_a[2] + max(height_a - radius_a, radius_a)
+    bottom_b, top_b = base_b[2] + radius_b, base_b[2] + max(height_b - radius_b, radius_b)
+    dx = base_b[0] - base_a[0]
+    dy = base_b[1] - base_a[1]
+    # closest points of the two segments: any height of the overlap, else the closest ends
+    if top_a < bottom_b:
+        z_a, z_b = top_a, bottom_b
+    elif top_b < bottom_a:
+        z_a, z_b = bottom_a, top_b
+    else:
+        z_a = z_b = (max(bottom_a, bottom_b) + min(top_a, top_b)) * 0.5
+    dz = z_b - z_a
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    depth = radius_a + radius_b - distance
+    if depth < 0.0:
+        return None
+    if distance > 1e-9:
+        scale = radius_a / distance
+        return depth, (base_a[0] + dx * scale, base_a[1] + dy * scale, z_a + dz * scale)
+    return depth, (base_a[0], base_a[1], z_a)
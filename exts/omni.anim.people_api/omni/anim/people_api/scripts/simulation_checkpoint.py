@@ -0,0 +1,149 @@
+"""
+Checkpoints of the runtime state of the crowd, see `CharacterSetup.save_checkpoint()`.
+
+The state is plain data: the carb and Gf vectors are stored as `StateVector`, and the references to the character,
+the managers or the prims are left out and rebuilt on restore. A checkpoint can be restored any number of times, e.g.
+to branch several rollouts from one warmed-up crowd, and pickled to restore it in another process with the same
+scene.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import carb
+from pxr import Gf
+
+from .utils import Utils
+
+# vector type name -> (type, component count)
+_VECTOR_TYPES = {
+    "Float3": (carb.Float3, 3),
+    "Float4": (carb.Float4, 4),
+    "Vec3d": (Gf.Vec3d, 3),
+}
+
+
+@dataclass(frozen=True)
+class StateVector:
+    type_name: str
+    values: tuple
+
+
+@dataclass
+class SimulationCheckpoint:
+    # full snapshot of the spawn parameters of the characters, see `encode_snapshot()`
+    character_snapshot: bytes
+    # character name -> runtime state of its behavior, see `capture_behavior_state()`
+    behavior_states: dict[str, dict] = field(default_factory=dict)
+    # data of the GlobalCharacterPositionManager, with the estimated velocities
+    position_state: dict = field(default_factory=dict)
+    # queue name -> occupier of each spot
+    queue_occupancy: dict[str, list] = field(default_factory=dict)
+    # agent name -> paths of the interactable objects the agent owns
+    interactable_owners: dict[str, list[str]] = field(default_factory=dict)
+    # state of the `random` module, which samples the spawn parameters of the characters
+    random_state: tuple | None = None
+
+
+def to_state_value(value):
+    """copy of `value` as plain data; raises TypeError when `value` is not a value, like a prim or a manager"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if type(value) is list:
+        return [to_state_value(item) for item in value]
+    if type(value) is tuple:
+        return tuple(to_state_value(item) for item in value)
+    if type(value) is dict:
+        return {key: to_state_value(item) for key, item in value.items()}
+    for type_name, (vector_type, size) in _VECTOR_TYPES.items():
+        if isinstance(value, vector_type):
+            return StateVector(type_name, tuple(float(value[index]) for index in range(size)))
+    raise TypeError(f"{type(value).__name__} is not a state value")
+
+
+def from_state_value(value):
+    """new object of a value of `to_state_value()`"""
+    if isinstance(value, StateVector):
+        return _VECTOR_TYPES[value.type_name][0](*value.values)
+    if type(value) is list:
+        return [from_state_value(item) for item in value]
+    if type(value) is tuple:
+        return tuple(from_state_value(item) for item in value)
+    if type(value) is dict:
+        return {key: from_state_value(item) for key, item in value.items()}
+    return value
+
+
+def capture_behavior_state(behavior) -> dict:
+    """
+    runtime state of a character behavior: its transform, its command queue and the phase and timers of the current
+    command, its random generator and the path, targets and position history of its navigation manager
+    """
+    character = behavior.character
+    command = behavior.current_command
+    random_generator = getattr(behavior, "random", None)
+    return {
+        "initialized": character is not None,
+        "parked": behavior._parked,
+        "transform": to_state_value(Utils.get_character_transform(character)) if character is not None else None,
+        "commands": to_state_value(behavior.commands),
+        "loop_commands": to_state_value(behavior.loop_commands),
+        "loop_commands_count": behavior.loop_commands_count,
+        "in_queue": behavior.in_queue,
+        "interruptable": behavior.interruptable,
+        "random_state": random_generator.getstate() if random_generator is not None else None,
+        "navigation": behavior.navigation_manager.get_state() if behavior.navigation_manager is not None else None,
+        "current_command": (
+            {"command_pair": (command.get_command_id(), list(command.command)), "state": command.get_state()}
+            if command is not None
+            else None
+        ),
+    }
+
+
+def restore_behavior_state(behavior, state: dict) -> bool:
+    """
+    restore a state of `capture_behavior_state()`; the current command is created again from its command and gets
+    its state back. Returns False when the character can't be initialized.
+    """
+    behavior.end_current_command(set_status=False)
+    if not state["initialized"]:
+        behavior.reset_character(active=not state["parked"])
+    else:
+        if behavior.character is None:
+            if not behavior.init_character():
+                return False
+            behavior.register_to_agent_manager()
+        position, rotation = from_state_value(state["transform"])
+        behavior.character.set_world_transform(position, rotation)
+        behavior._parked = state["parked"]
+
+    # the command file requested by init_character() must not add the file commands on top of the restored ones
+    if getattr(behavior, "_command_file_request", None) is not None:
+        behavior._command_file_request = None
+    behavior.commands = from_state_value(state["commands"])
+    behavior.loop_commands = from_state_value(state["loop_commands"])
+    behavior.loop_commands_count = state["loop_commands_count"]
+    behavior.in_queue = state["in_queue"]
+    behavior.interruptable = state["interruptable"]
+    if state["random_state"] is not None and getattr(behavior, "random", None) is not None:
+        behavior.random.setstate(state["random_state"])
+    if state["navigation"] is not None and behavior.navigation_manager is not None:
+        behavior.navigation_manager.set_state(state["navigation"])
+    # the callbacks of injected commands which are not queued anymore are dropped
+    command_ids = {command_id for command_id, _ in behavior.commands}
+    behavior._command_callback_checkpoint = {
+        command_id: callback_fn
+        for command_id, callback_fn in behavior._command_callback_checkpoint.items()
+        if command_id in command_ids
+    }
+
+    behavior.current_command = None
+    command_state = state["current_command"]
+    if command_state is not None and behavior.character is not None:
+        command = behavior.get_command(from_state_value(command_state["command_pair"]))
+        if command is not None:
+            command.set_state(command_state["state"])
+            behavior.current_command = command
+    return True
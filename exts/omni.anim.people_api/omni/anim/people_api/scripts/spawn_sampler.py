@@ -0,0 +1,252 @@
+"""
+Spawn positions of the characters, see `CharacterSetup.load_random_characters()`.
+
+The candidates are drawn in batches, kept at least `min_separation` apart from each other and from the occupied
+points with Poisson-disk rejection on a grid, and kept only when the navmesh connects them to the goal. The
+reachability is cached per cell of a `NavMeshIslandIndex`, so most candidates are accepted or rejected without a path
+query. Each position gets a bounded number of candidates, and the result tells how many could not be placed and why.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+
+import carb
+import numpy as np
+from omni.anim.people_api.scripts.perf_stats import PerfStats
+
+
+@dataclass
+class SpawnSampleResult:
+    requested_count: int
+    # positions as [x, y, z]
+    positions: list[list[float]] = field(default_factory=list)
+    # indices of the requested positions which could not be placed, for `SpawnSampler.sample_near()`
+    failed_indices: list[int] = field(default_factory=list)
+    candidate_count: int = 0
+    # candidates rejected because they are off the navmesh, too close to another position or not connected to the goal
+    off_navmesh_count: int = 0
+    too_close_count: int = 0
+    unreachable_count: int = 0
+    path_query_count: int = 0
+
+    def is_complete(self) -> bool:
+        return len(self.positions) == self.requested_count
+
+    def describe(self) -> str:
+        return (
+            f"placed {len(self.positions)} of {self.requested_count} positions from {self.candidate_count} candidates "
+            f"({self.off_navmesh_count} off the navmesh, {self.too_close_count} too close, "
+            f"{self.unreachable_count} unreachable, {self.path_query_count} path queries)"
+        )
+
+
+class NavMeshIslandIndex:
+    """
+    Reachability of the navmesh points from a goal, cached per grid cell. A cell is reachable once a path query from
+    one of its points succeeded, and every cell the path crosses is reachable too; a cell is unreachable once a path
+    query from one of its points failed. The cells must be small enough not to span two islands of the navmesh.
+    """
+
+    UNKNOWN = 0
+    REACHABLE = 1
+    UNREACHABLE = 2
+
+    def __init__(self, navmesh, goal, cell_size: float = 1.0):
+        self.navmesh = navmesh
+        self.goal = goal
+        self.cell_size = cell_size
+        self.path_query_count = 0
+        # (cell x, cell y) -> REACHABLE or UNREACHABLE
+        self._cells: dict[tuple[int, int], int] = {}
+
+    def get_cell_keys(self, points: np.ndarray) -> np.ndarray:
+        return np.floor(points[:, :2] / self.cell_size).astype(np.int64)
+
+    def are_reachable(self, points: np.ndarray) -> np.ndarray:
+        """(N,) reachability of the (N, 3) points, with at most one path query per unknown cell"""
+        if len(points) == 0:
+            return np.zeros(0, dtype=bool)
+        keys, first_indices, inverse = np.unique(
+            self.get_cell_keys(points), axis=0, return_index=True, return_inverse=True
+        )
+        states = np.empty(len(keys), dtype=np.int8)
+        for key_index, (key, point_index) in enumerate(zip(map(tuple, keys.tolist()), first_indices.tolist())):
+            state = self._cells.get(key, self.UNKNOWN)
+            if state == self.UNKNOWN:
+                state = self._query_cell(key, points[point_index])
+            states[key_index] = state
+        return states[inverse.reshape(-1)] == self.REACHABLE
+
+    def _query_cell(self, key: tuple[int, int], point: np.ndarray) -> int:
+        self.path_query_count += 1
+        PerfStats.get_instance().count("navmesh.path_query")
+        path = self.navmesh.query_shortest_path(carb.Float3(*point.tolist()), self.goal)
+        if path is None:
+            self._cells[key] = self.UNREACHABLE
+            return self.UNREACHABLE
+        self._cells[key] = self.REACHABLE
+        path_points = [(float(path_point[0]), float(path_point[1])) for path_point in path.get_points()]
+        for start, end in zip(path_points, path_points[1:]):
+            step_count = max(1, math.ceil(math.dist(start, end) * 2.0 / self.cell_size))
+            t = np.linspace(0.0, 1.0, step_count + 1)[:, None]
+            segment_points = np.array(start) + t * (np.array(end) - np.array(start))
+            for path_key in map(tuple, self.get_cell_keys(segment_points).tolist()):
+                self._cells.setdefault(path_key, self.REACHABLE)
+        return self.REACHABLE
+
+
+class PoissonDiskGrid:
+    """points at least `min_distance` apart on the ground plane, in a grid of at most one point per cell"""
+
+    def __init__(self, min_distance: float):
+        self.min_distance = min_distance
+        self.cell_size = min_distance / math.sqrt(2.0)
+        self._cells: dict[tuple[int, int], tuple[float, float]] = {}
+        # points closer than min_distance, which may share a cell, see add_occupied()
+        self._occupied: list[tuple[float, float]] = []
+
+    def _cell_key(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def is_free(self, x: float, y: float) -> bool:
+        if self.min_distance <= 0.0:
+            return True
+        cell_x, cell_y = self._cell_key(x, y)
+        min_distance_squared = self.min_distance * self.min_distance
+        for offset_x in range(-2, 3):
+            for offset_y in range(-2, 3):
+                point = self._cells.get((cell_x + offset_x, cell_y + offset_y))
+                if point is not None and (point[0] - x) ** 2 + (point[1] - y) ** 2 < min_distance_squared:
+                    return False
+        return all((point[0] - x) ** 2 + (point[1] - y) ** 2 >= min_distance_squared for point in self._occupied)
+
+    def are_free(self, points: np.ndarray) -> np.ndarray:
+        """(N,) whether each of the (N, 3) points is free, without adding them"""
+        return np.fromiter((self.is_free(x, y) for x, y in points[:, :2].tolist()), dtype=bool, count=len(points))
+
+    def add(self, x: float, y: float):
+        if self.min_distance > 0.0:
+            self._cells[self._cell_key(x, y)] = (x, y)
+
+    def add_occupied(self, x: float, y: float):
+        """add a point placed by someone else, which may be closer than min_distance to the other points"""
+        if self.min_distance <= 0.0:
+            return
+        key = self._cell_key(x, y)
+        if key in self._cells:
+            self._occupied.append((x, y))
+        else:
+            self._cells[key] = (x, y)
+
+
+class SpawnSampler:
+    """
+    Samples spawn positions on the navmesh which are connected to `goal` and at least `min_separation` apart from
+    each other and from `occupied_points`. Each position gets at most `max_attempts` candidates.
+    """
+
+    def __init__(
+        self,
+        navmesh,
+        goal,
+        min_separation: float = 1.0,
+        max_attempts: int = 30,
+        area_mask: list[int] | None = None,
+        occupied_points=(),
+        island_cell_size: float = 1.0,
+    ):
+        self.navmesh = navmesh
+        self.min_separation = max(0.0, min_separation)
+        self.max_attempts = max(1, max_attempts)
+        self.area_mask = area_mask
+        self.island_index = NavMeshIslandIndex(navmesh, goal, island_cell_size)
+        self._grid = PoissonDiskGrid(self.min_separation)
+        for point in occupied_points:
+            self._grid.add_occupied(float(point[0]), float(point[1]))
+        self._candidate_id = 0
+
+    def sample_random(self, count: int, query_prefix: str = "spawn") -> SpawnSampleResult:
+        """`count` random positions, drawn from the navmesh random points in batches"""
+        result = SpawnSampleResult(count)
+        max_candidates = count * self.max_attempts
+        while len(result.positions) < count and result.candidate_count < max_candidates:
+            # twice the missing positions, as some of the candidates get rejected
+            batch_size = min(2 * (count - len(result.positions)), max_candidates - result.candidate_count)
+            candidates = []
+            for _ in range(batch_size):
+                self._candidate_id += 1
+                point = self.navmesh.query_random_point(f"{query_prefix}_{self._candidate_id}", self.area_mask)
+                if point is not None:
+                    candidates.append((float(point[0]), float(point[1]), float(point[2])))
+            result.candidate_count += batch_size
+            result.off_navmesh_count += batch_size - len(candidates)
+            accepted = self._accept(
+                np.array(candidates, dtype=np.float64).reshape(-1, 3), result, count - len(result.positions)
+            )
+            result.positions.extend(accepted)
+        result.path_query_count = self.island_index.path_query_count
+        return result
+
+    def sample_near(self, xy_positions, radius: float = 1.5, height: float = 0.0) -> SpawnSampleResult:
+        """
+        one position per xy position, within `radius` of it on the ground plane; the candidates are snapped to the
+        navmesh around `height`. The positions which can't be placed are in `failed_indices`.
+        """
+        result = SpawnSampleResult(len(xy_positions))
+        for index, xy_position in enumerate(xy_positions):
+            # the requested point itself first, then random points of the disk
+            offsets = [(0.0, 0.0)]
+            for _ in range(self.max_attempts - 1):
+                angle = random.uniform(0, 2 * math.pi)
+                distance = radius * math.sqrt(random.uniform(0, 1))
+                offsets.append((distance * math.cos(angle), distance * math.sin(angle)))
+            # the candidates are checked one by one, as the first one is usually accepted
+            for offset_x, offset_y in offsets:
+                result.candidate_count += 1
+                point = self._snap(xy_position[0] + offset_x, xy_position[1] + offset_y, height)
+                if point is None:
+                    result.off_navmesh_count += 1
+                    continue
+                accepted = self._accept(np.array([point], dtype=np.float64), result, 1)
+                if accepted:
+                    result.positions.append(accepted[0])
+                    break
+            else:
+                result.failed_indices.append(index)
+        result.path_query_count = self.island_index.path_query_count
+        return result
+
+    def _snap(self, x: float, y: float, height: float):
+        """closest navmesh point of (x, y), None when it is not above or below (x, y)"""
+        closest_result = self.navmesh.query_closest_point(carb.Float3(x, y, height))
+        if closest_result is None:
+            return None
+        closest_point = closest_result[0] if isinstance(closest_result, tuple) else closest_result
+        if math.hypot(closest_point[0] - x, closest_point[1] - y) > 0.1:
+            return None
+        return (float(closest_point[0]), float(closest_point[1]), float(closest_point[2]))
+
+    def _accept(self, candidates: np.ndarray, result: SpawnSampleResult, max_count: int) -> list[list[float]]:
+        """
+        up to `max_count` candidates kept in order, after the separation and reachability checks, which are added to
+        the grid; the candidates after the last accepted one are left out of the grid
+        """
+        free = self._grid.are_free(candidates)
+        result.too_close_count += int(np.count_nonzero(~free))
+        candidates = candidates[free]
+        reachable = self.island_index.are_reachable(candidates)
+        result.unreachable_count += int(np.count_nonzero(~reachable))
+        accepted = []
+        # the candidates of the batch are also kept apart from each other
+        for x, y, z in candidates[reachable].tolist():
+            if not self._grid.is_free(x, y):
+                result.too_close_count += 1
+                continue
+            self._grid.add(x, y)
+            accepted.append([x, y, z])
+            if len(accepted) == max_count:
+                break
+        return accepted
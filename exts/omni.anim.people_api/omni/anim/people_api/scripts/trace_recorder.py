@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import carb
+from omni.anim.people_api.settings import PeopleSettings
+
+
+class TraceRecorder:
+    """
+    Global class which records timeline spans in the Chrome trace event format.
+
+    Spans are kept in a ring buffer of `PeopleSettings.TRACE_BUFFER_SIZE` events while
+    `PeopleSettings.TRACE_ENABLED` is set, so the oldest events are dropped on long runs. `write()` saves the buffer
+    as a JSON file that can be opened in chrome://tracing or https://ui.perfetto.dev.
+    Spans are fed by `PerfStats.scope()` and `PerfStats.add_time()`, which carry the agent and command names.
+    """
+
+    __instance: TraceRecorder = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of TraceRecorder is allowed")
+        TraceRecorder.__instance = self
+        self._people_settings = PeopleSettings.get_instance()
+        self._pid = os.getpid()
+        self._events: deque = deque(maxlen=max(1, self._people_settings.trace_buffer_size))
+        self._setting_sub = carb.settings.get_settings().subscribe_to_node_change_events(
+            PeopleSettings.TRACE_BUFFER_SIZE, self._on_buffer_size_changed
+        )
+
+    def destroy(self):
+        carb.settings.get_settings().unsubscribe_to_change_events(self._setting_sub)
+        self._setting_sub = None
+        self._events = deque(maxlen=1)
+        TraceRecorder.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> TraceRecorder:
+        if cls.__instance is None:
+            TraceRecorder()
+        return cls.__instance
+
+    def _on_buffer_size_changed(self, item, event_type):
+        # the snapshot may be refreshed after this callback, so read the setting itself
+        buffer_size = carb.settings.get_settings().get(PeopleSettings.TRACE_BUFFER_SIZE) or 1
+        self._events = deque(self._events, maxlen=max(1, int(buffer_size)))
+
+    def is_enabled(self) -> bool:
+        return self._people_settings.trace_enabled
+
+    @staticmethod
+    def _get_args(agent: str | None, command: str | None) -> dict:
+        args = {}
+        if agent is not None:
+            args["agent"] = str(agent)
+        if command is not None:
+            args["command"] = str(command)
+        return args
+
+    def add_span(
+        self, name: str, start_time: float, duration: float, agent: str | None = None, command: str | None = None
+    ):
+        """record a span; times are `time.perf_counter()` seconds"""
+        if not self._people_settings.trace_enabled:
+            return
+        self._events.append(
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": start_time * 1e6,
+                "dur": duration * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": self._get_args(agent, command),
+            }
+        )
+
+    def add_instant(self, name: str, agent: str | None = None, command: str | None = None):
+        """record an event without duration, such as a command start"""
+        if not self._people_settings.trace_enabled:
+            return
+        self._events.append(
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "i",
+                "s": "t",
+                "ts": time.perf_counter() * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": self._get_args(agent, command),
+            }
+        )
+
+    def get_events(self) -> list[dict]:
+        return list(self._events)
+
+    def clear(self):
+        self._events.clear()
+
+    def write(self, file_path: str) -> bool:
+        """write the recorded events to a Chrome trace event JSON file"""
+        trace = {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+        try:
+            folder = os.path.dirname(file_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(trace, file)
+        except OSError as e:
+            carb.log_error(f"Unable to write trace to {file_path}: {e}")
+            return False
+        return True
@@ -12,15 +12,19 @@ import time
 
 import carb
 from pxr import PhysxSchema
-from pxr import Gf, Usd, UsdGeom, UsdSkel, UsdPhysics
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdSkel, UsdPhysics
 import omni.usd
 import omni.anim.navigation.core as nav
 import AnimGraphSchema
 from omni.metropolis.utils.usd_util import USDUtil
 from omni.metropolis.utils.simulation_util import SimulationUtil
 from omni.anim.people_api.scripts.interactable_object_helper import InteractableObjectHelper
+from omni.anim.people_api.scripts.people_logger import get_logger
+from omni.anim.people_api.scripts.perf_stats import PerfStats, timed
 from omni.anim.people_api.settings import PeopleSettings
 
+logger = get_logger(__name__)
+
 
 class Utils:
     """
@@ -138,8 +142,10 @@ class Utils:
     ------------------------NavMesh------------------------
     """
 
+    @timed("navmesh.accessible_navmesh_point")
     def accessible_navmesh_point(character_position, point):
-        carb.log_warn("Called")
+        perf_stats = PerfStats.get_instance()
+        perf_stats.count("navmesh.validation")
         navmesh = nav.acquire_interface().get_navmesh()
         character_point = carb.Float3(character_position[0], character_position[1], character_position[2])
         target_point = carb.Float3(point[0], point[1], point[2])
@@ -150,8 +156,9 @@ class Utils:
         if not SimulationUtil.is_the_same_point(target_point, cloest_point, tol=0.1):
             # if the point is not accessible at all
             return False
+        perf_stats.count("navmesh.path_query")
         nav_path = navmesh.query_shortest_path(character_point, cloest_point, agent_radius=0.5)
-        carb.log_warn("finished accessible navmesh point")
+        logger.debug("navmesh path query from %s to %s finished", character_point, cloest_point)
         if (not nav_path) or (not nav_path.get_points()):
             return False
         return True
@@ -184,7 +191,8 @@ class Utils:
         randomized_point = None
         while (not accessible) and attempt < max_attempts:
             randomized_point = navmesh.query_random_point(random_id, index_list)
-            carb.log_warn("query randomized point within navmesh area" + str(randomized_point))
+            attempt += 1
+            logger.debug("query randomized point within navmesh area %s: %s", area_name, randomized_point)
             if character_position is not None:
                 accessible = Utils.accessible_navmesh_point(
                     point=randomized_point, character_position=character_position
@@ -201,9 +209,9 @@ class Utils:
         object_pos_raw = omni.usd.get_world_transform_matrix(target_prim).ExtractTranslation()
         object_pos = carb.Float3(object_pos_raw[0], object_pos_raw[1], 0)
         destination_pos = Utils.get_closest_navmesh_point(object_pos)
-        carb.log_warn("This is the closest point" + str(destination_pos))
+        logger.debug("closest navmesh point of %s: %s", target_prim.GetPrimPath(), destination_pos)
         if not SimulationUtil.is_the_same_point(object_pos, destination_pos, 1.5):
-            carb.log_warn("no point nearby")
+            logger.warn("no navmesh point near %s", target_prim.GetPrimPath())
             return None
         if not Utils.accessible_navmesh_point(point=destination_pos, character_position=character_pos):
             return None
@@ -236,7 +244,7 @@ class Utils:
     def fetch_target_character_path_by_name(character_name: str):
         """fetch the skeleton path that we can used to fetch target character instance in the stage"""
         stage = omni.usd.get_context().get_stage()
-        character_root_path = carb.settings.get_settings().get(PeopleSettings.CHARACTER_PRIM_PATH)
+        character_root_path = PeopleSettings.get_instance().character_prim_path
         folder_prim = stage.GetPrimAtPath(character_root_path)
         if not folder_prim.IsValid() or not folder_prim.IsActive():
             return None
@@ -451,3 +459,119 @@ class Utils:
         physx_rigid_body_api.CreateMaxDepenetrationVelocityAttr().Set(1.0)
         if angular_damping is not None:
             physx_rigid_body_api.CreateAngularDampingAttr().Set(angular_damping)
+
+    """
+    ------------------------Batched physics authoring------------------------
+    The batched variants author the same opinions as `_add_simple_capsule_collider()` and `add_rigid_body_dynamics()`
+    with the Sdf API, for a list of SkelRoots inside a single change block, so that the stage and PhysX process one
+    change notification per batch instead of one per edited prim and attribute.
+    """
+
+    def add_capsule_colliders(root_prims, layer=None, capsule_height=1.7, capsule_radius=0.3):
+        """
+        Batched `_add_simple_capsule_collider()`, authored in `layer` (the edit target layer by default).
+        Returns the SkelRoots which got a new capsule.
+        """
+        if not root_prims:
+            return []
+        stage = root_prims[0].GetStage()
+        layer = layer or stage.GetEditTarget().GetLayer()
+        new_root_prims = [
+            root_prim
+            for root_prim in root_prims
+            if not stage.GetPrimAtPath(root_prim.GetPrimPath().AppendChild("CollisionCapsule"))
+        ]
+        with Sdf.ChangeBlock():
+            for root_prim in new_root_prims:
+                spec = Sdf.CreatePrimInLayer(layer, root_prim.GetPrimPath().AppendChild("CollisionCapsule"))
+                spec.specifier = Sdf.SpecifierDef
+                spec.typeName = "Capsule"
+                Utils._prepend_api_schemas(spec, ["PhysicsCollisionAPI", "PhysxCollisionAPI", "PhysicsMassAPI"])
+                # Height excludes caps, the capsule is centered half height above the ground
+                Utils._set_attribute_spec(spec, "axis", Sdf.ValueTypeNames.Token, "Z", uniform=True)
+                Utils._set_attribute_spec(
+                    spec, "height", Sdf.ValueTypeNames.Double, capsule_height - 2 * capsule_radius
+                )
+                Utils._set_attribute_spec(spec, "radius", Sdf.ValueTypeNames.Double, capsule_radius)
+                Utils._set_attribute_spec(
+                    spec, "xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(0, 0, capsule_height / 2)
+                )
+                Utils._set_attribute_spec(
+                    spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, ["xformOp:translate"], uniform=True
+                )
+                # collision only, no rendering
+                Utils._set_attribute_spec(spec, "visibility", Sdf.ValueTypeNames.Token, UsdGeom.Tokens.invisible)
+                Utils._set_attribute_spec(
+                    spec, "purpose", Sdf.ValueTypeNames.Token, UsdGeom.Tokens.guide, uniform=True
+                )
+                Utils._set_attribute_spec(spec, "physics:collisionEnabled", Sdf.ValueTypeNames.Bool, True)
+                Utils._set_attribute_spec(spec, "physxCollision:contactOffset", Sdf.ValueTypeNames.Float, 0.02)
+                Utils._set_attribute_spec(spec, "physxCollision:restOffset", Sdf.ValueTypeNames.Float, 0.0)
+                Utils._set_attribute_spec(
+                    spec, "physics:mass", Sdf.ValueTypeNames.Float, Utils.PEDESTRIAN_COLLISION_MASS
+                )
+        return new_root_prims
+
+    def add_rigid_body_dynamics_to_prims(prims, layer=None, disable_gravity=False, angular_damping=None):
+        """batched `add_rigid_body_dynamics()`, authored in `layer` (the edit target layer by default)"""
+        if not prims:
+            return
+        layer = layer or prims[0].GetStage().GetEditTarget().GetLayer()
+        with Sdf.ChangeBlock():
+            for prim in prims:
+                spec = Sdf.CreatePrimInLayer(layer, prim.GetPrimPath())
+                Utils._prepend_api_schemas(spec, ["PhysicsRigidBodyAPI", "PhysxRigidBodyAPI"])
+                Utils._set_attribute_spec(spec, "physics:rigidBodyEnabled", Sdf.ValueTypeNames.Bool, True)
+                Utils._set_attribute_spec(spec, "physics:kinematicEnabled", Sdf.ValueTypeNames.Bool, True)
+                Utils._set_attribute_spec(
+                    spec, "physxRigidBody:disableGravity", Sdf.ValueTypeNames.Bool, disable_gravity
+                )
+                # Limit max contact impulse and depenetration velocity to reduce collision impulses
+                Utils._set_attribute_spec(
+                    spec,
+                    "physxRigidBody:maxContactImpulse",
+                    Sdf.ValueTypeNames.Float,
+                    Utils.PEDESTRIAN_MAX_CONTACT_IMPULSE,
+                )
+                Utils._set_attribute_spec(
+                    spec, "physxRigidBody:maxDepenetrationVelocity", Sdf.ValueTypeNames.Float, 1.0
+                )
+                if angular_damping is not None:
+                    Utils._set_attribute_spec(
+                        spec, "physxRigidBody:angularDamping", Sdf.ValueTypeNames.Float, angular_damping
+                    )
+
+    def get_session_sublayer(stage, name="PeopleApiPhysics"):
+        """anonymous sublayer of the session layer of `stage` named `name`, created on the first call"""
+        session_layer = stage.GetSessionLayer()
+        for layer_identifier in session_layer.subLayerPaths:
+            layer = Sdf.Layer.Find(layer_identifier)
+            if layer is not None and layer.anonymous and layer.GetDisplayName() == name:
+                return layer
+        layer = Sdf.Layer.CreateAnonymous(name)
+        session_layer.subLayerPaths.append(layer.identifier)
+        return layer
+
+    def remove_prim_specs(layer, prim_paths):
+        """remove the specs of the prims and of their descendants from `layer`, e.g. from a session sublayer"""
+        namespace_edit = Sdf.BatchNamespaceEdit()
+        for prim_path in prim_paths:
+            if layer.GetPrimAtPath(prim_path):
+                namespace_edit.Add(Sdf.Path(prim_path), Sdf.Path.emptyPath)
+        if namespace_edit.edits:
+            layer.Apply(namespace_edit)
+
+    def _prepend_api_schemas(spec, schema_names):
+        api_schemas = spec.GetInfo("apiSchemas")
+        applied_names = set(api_schemas.GetAddedOrExplicitItems())
+        missing_names = [name for name in schema_names if name not in applied_names]
+        if missing_names:
+            api_schemas.prependedItems = list(api_schemas.prependedItems) + missing_names
+            spec.SetInfo("apiSchemas", api_schemas)
+
+    def _set_attribute_spec(spec, name, type_name, value, uniform=False):
+        attribute_spec = spec.attributes.get(name)
+        if attribute_spec is None:
+            variability = Sdf.VariabilityUniform if uniform else Sdf.VariabilityVarying
+            attribute_spec = Sdf.AttributeSpec(spec, name, type_name, variability)
+        attribute_spec.default = value
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+
+from omni.anim.people_api.scripts.people_logger import get_logger
+from pxr import Sdf
+
+logger = get_logger(__name__)
+
+
+class WarmupManager:
+    """
+    Keeps track of the character assets warmed up in this process, see `CharacterSetup(is_warmup=True)`.
+
+    Warming up an asset loads its payload, shaders and animations by running it with an animation graph for a few
+    frames. An asset is recorded with the animation graph it was warmed up with, so the later setups of the process
+    only warm up the assets which were not warmed up with their graph yet.
+
+    `preload_assets()` opens the asset layers and the layers they depend on in the background and keeps them open, so
+    that the next characters of these assets are composed from the layer registry instead of the asset server.
+    """
+
+    __instance: WarmupManager = None
+
+    def __init__(self):
+        if self.__instance is not None:
+            raise RuntimeError("Only one instance of WarmupManager is allowed")
+        # (asset USD path, animation graph prim path) of the warmed up assets
+        self._warmed_assets: set[tuple[str, str]] = set()
+        # layer identifier -> layer, kept open for the next loads
+        self._preloaded_layers: dict[str, Sdf.Layer] = {}
+        self._preload_task = None
+        WarmupManager.__instance = self
+
+    def destroy(self):
+        self.cancel_preload()
+        self._preloaded_layers = {}
+        WarmupManager.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> WarmupManager:
+        if cls.__instance is None:
+            WarmupManager()
+        return cls.__instance
+
+    @classmethod
+    def destroy_instance(cls):
+        """destroy the instance if there is one, without creating it"""
+        if cls.__instance is not None:
+            cls.__instance.destroy()
+
+    # ================ Warmed up assets ================
+
+    def is_warmed(self, usd_path: str, anim_graph_path: str = "") -> bool:
+        return (usd_path, anim_graph_path) in self._warmed_assets
+
+    def get_unwarmed_usd_paths(self, usd_paths, anim_graph_path: str = "") -> list[str]:
+        """the USD paths of `usd_paths` not warmed up with the animation graph yet, without duplicates"""
+        return [
+            usd_path for usd_path in dict.fromkeys(usd_paths) if (usd_path, anim_graph_path) not in self._warmed_assets
+        ]
+
+    def mark_warmed(self, usd_paths, anim_graph_path: str = ""):
+        self._warmed_assets.update((usd_path, anim_graph_path) for usd_path in usd_paths)
+
+    def clear(self):
+        """forget the warmed up assets and close the preloaded layers, e.g. after the assets changed"""
+        self.cancel_preload()
+        self._warmed_assets = set()
+        self._preloaded_layers = {}
+
+    # ================ Layer preloading ================
+
+    def is_preloaded(self, usd_path: str) -> bool:
+        return usd_path in self._preloaded_layers
+
+    def is_preloading(self) -> bool:
+        return self._preload_task is not None and not self._preload_task.done()
+
+    def preload_assets(self, usd_paths, max_concurrent_requests: int = 4):
+        """start preload_assets_async() in the background, after the running preload if any"""
+        previous_task = self._preload_task if self.is_preloading() else None
+
+        async def preload():
+            if previous_task is not None:
+                await asyncio.wait([previous_task])
+            return await self.preload_assets_async(usd_paths, max_concurrent_requests)
+
+        self._preload_task = asyncio.ensure_future(preload())
+        return self._preload_task
+
+    def cancel_preload(self):
+        if self._preload_task is not None:
+            self._preload_task.cancel()
+            self._preload_task = None
+
+    async def preload_assets_async(self, usd_paths, max_concurrent_requests: int = 4) -> int:
+        """
+        open the layers of `usd_paths` and the layers they depend on in worker threads, and keep them open; returns
+        the number of layers opened
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+        pending_paths = [usd_path for usd_path in dict.fromkeys(usd_paths) if usd_path not in self._preloaded_layers]
+        opened_count = 0
+
+        async def open_layer(layer_path):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(Sdf.Layer.FindOrOpen, layer_path)
+                except Exception as e:
+                    logger.warn("Unable to preload the layer %s: %s", layer_path, e)
+                    return None
+
+        while pending_paths:
+            layers = await asyncio.gather(*(open_layer(layer_path) for layer_path in pending_paths))
+            dependency_paths = []
+            for layer_path, layer in zip(pending_paths, layers):
+                if layer is None:
+                    continue
+                self._preloaded_layers[layer_path] = layer
+                opened_count += 1
+                for asset_path in layer.GetCompositionAssetDependencies():
+                    dependency_path = layer.ComputeAbsolutePath(asset_path)
+                    if dependency_path and dependency_path not in self._preloaded_layers:
+                        dependency_paths.append(dependency_path)
+            pending_paths = list(dict.fromkeys(dependency_paths))
+        return opened_count
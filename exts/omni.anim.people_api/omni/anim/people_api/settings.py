@@ -1,7 +1,47 @@
+from __future__ import annotations
+
+import math
+
+import carb
+
 PERSISTENT_SETTINGS_PREFIX = "/persistent"
+# carb tokens are resolved by CharacterAssetCatalog
+DEFAULT_ASSET_CATALOG_CACHE_PATH = "${data}/omni.anim.people_api/character_asset_catalog.json"
+
+
+def _to_str(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _to_loop_count(value) -> float:
+    # 'inf' means endless looping, otherwise the value is the number of loops
+    if str(value) == "inf":
+        return math.inf
+    return int(value)
+
+
+class LogLevel:
+    DEBUG = 10
+    INFO = 20
+    WARN = 30
+    ERROR = 40
+
+    NAMES = {"debug": DEBUG, "info": INFO, "warn": WARN, "warning": WARN, "error": ERROR}
+
+
+def _to_log_level(value) -> int:
+    return LogLevel.NAMES[str(value).lower()]
 
 
 class PeopleSettings:
+    """
+    Setting keys of the extension.
+
+    An instance of this class is a typed runtime snapshot of the settings below. Values are loaded once and kept up
+    to date through carb setting change subscriptions, so hot paths read plain attributes instead of querying carb
+    settings on every call. Use `PeopleSettings.get_instance()` to get the shared snapshot.
+    """
+
     COMMAND_FILE_PATH = "/exts/omni.anim.people_api/command_settings/command_file_path"
     ROBOT_COMMAND_FILE_PATH = "/exts/omni.anim.people_api/command_settings/robot_command_file_path"
     NUMBER_OF_LOOP = "/exts/omni.anim.people_api/command_settings/number_of_loop"
@@ -16,8 +56,159 @@ class PeopleSettings:
         f"{PERSISTENT_SETTINGS_PREFIX}/exts/omni.anim.people_api/behavior_script_settings/behavior_script_path"
     )
     CHARACTER_PRIM_PATH = f"{PERSISTENT_SETTINGS_PREFIX}/exts/omni.anim.people_api/character_prim_path"
+    ASSET_CATALOG_CACHE_PATH = "/exts/omni.anim.people_api/asset_settings/catalog_cache_path"
     CACHE_ACTION_METADATA = "/exts/omni.anim.people_api/cache_action_metadata"
+    EMIT_PER_AGENT_METADATA_EVENTS = "/exts/omni.anim.people_api/metadata_settings/emit_per_agent_events"
     CHARACTER_FINAL_TARGET_DISTANCE = "/exts/omni.anim.people_api/final_target_distance"
+    LOG_LEVEL = "/exts/omni.anim.people_api/log_settings/level"
+    LOG_RATE_LIMIT_INTERVAL = "/exts/omni.anim.people_api/log_settings/rate_limit_interval"
+    BUDGET_FRAME_MS = "/exts/omni.anim.people_api/budget_settings/frame_budget_ms"
+    BUDGET_MAX_DEFERRAL_FRAMES = "/exts/omni.anim.people_api/budget_settings/max_deferral_frames"
+    BUDGET_NEAR_DISTANCE = "/exts/omni.anim.people_api/budget_settings/near_distance"
+    PERF_STATS_ENABLED = "/exts/omni.anim.people_api/perf_settings/enabled"
+    PERF_STATS_DUMP_PATH = "/exts/omni.anim.people_api/perf_settings/dump_path"
+    PERF_STATS_DUMP_INTERVAL = "/exts/omni.anim.people_api/perf_settings/dump_interval"
+    TRACE_ENABLED = "/exts/omni.anim.people_api/trace_settings/enabled"
+    TRACE_BUFFER_SIZE = "/exts/omni.anim.people_api/trace_settings/buffer_size"
+    KINEMATIC_ENABLED = "/exts/omni.anim.people_api/kinematic_settings/enabled"
+    KINEMATIC_WALK_SPEED = "/exts/omni.anim.people_api/kinematic_settings/walk_speed"
+    KINEMATIC_MAX_STEP = "/exts/omni.anim.people_api/kinematic_settings/max_step"
+    LOADING_SLICE_BUDGET_MS = "/exts/omni.anim.people_api/loading_settings/slice_budget_ms"
+    LOADING_MAX_CONCURRENT_REQUESTS = "/exts/omni.anim.people_api/loading_settings/max_concurrent_requests"
+    POOL_ENABLED = "/exts/omni.anim.people_api/pool_settings/enabled"
+    PHYSICS_SESSION_LAYER_ENABLED = "/exts/omni.anim.people_api/physics_settings/session_layer_enabled"
+    WARMUP_CACHE_ENABLED = "/exts/omni.anim.people_api/warmup_settings/cache_enabled"
+    WARMUP_PRELOAD_ENABLED = "/exts/omni.anim.people_api/warmup_settings/preload_enabled"
+    SPAWN_MIN_SEPARATION = "/exts/omni.anim.people_api/spawn_settings/min_separation"
+    SPAWN_MAX_ATTEMPTS = "/exts/omni.anim.people_api/spawn_settings/max_attempts"
+    COMMAND_FILE_WATCH_ENABLED = "/exts/omni.anim.people_api/command_file_settings/watch_enabled"
+    COMMAND_FILE_WATCH_INTERVAL = "/exts/omni.anim.people_api/command_file_settings/watch_interval"
+
+    __instance: PeopleSettings = None
+
+    def __init__(self):
+        if PeopleSettings.__instance is not None:
+            raise RuntimeError("Only one instance of PeopleSettings is allowed")
+        PeopleSettings.__instance = self
+        self._settings = carb.settings.get_settings()
+
+        self.command_file_path: str = ""
+        self.robot_command_file_path: str = ""
+        self.number_of_loop: float = 0
+        self.dynamic_avoidance_enabled: bool = True
+        self.navmesh_enabled: bool = True
+        self.idle_duration_min: float = 1.0
+        self.idle_duration_max: float = 3.0
+        self.character_assets_path: str = ""
+        self.behavior_script_path: str = ""
+        self.character_prim_path: str = "/World/Characters"
+        self.asset_catalog_cache_path: str = DEFAULT_ASSET_CATALOG_CACHE_PATH
+        self.cache_action_metadata: bool = False
+        self.emit_per_agent_metadata_events: bool = False
+        self.final_target_distance: float = 0.25
+        self.log_level: int = LogLevel.WARN
+        self.log_rate_limit_interval: float = 1.0
+        self.budget_frame_ms: float = 0.0
+        self.budget_max_deferral_frames: int = 4
+        self.budget_near_distance: float = 10.0
+        self.perf_stats_enabled: bool = False
+        self.perf_stats_dump_path: str = ""
+        self.perf_stats_dump_interval: float = 10.0
+        self.trace_enabled: bool = False
+        self.trace_buffer_size: int = 200000
+        self.kinematic_enabled: bool = False
+        self.kinematic_walk_speed: float = 1.3
+        self.kinematic_max_step: float = 0.2
+        self.loading_slice_budget_ms: float = 4.0
+        self.loading_max_concurrent_requests: int = 16
+        self.pool_enabled: bool = False
+        self.physics_session_layer_enabled: bool = False
+        self.warmup_cache_enabled: bool = True
+        self.warmup_preload_enabled: bool = False
+        self.spawn_min_separation: float = 1.0
+        self.spawn_max_attempts: int = 30
+        self.command_file_watch_enabled: bool = False
+        self.command_file_watch_interval: float = 1.0
+
+        self._fields = self._get_fields()
+        self._setting_subs = []
+        for key in self._fields:
+            self._load(key)
+            self._setting_subs.append(
+                self._settings.subscribe_to_node_change_events(key, lambda item, event_type, key=key: self._load(key))
+            )
+
+    def destroy(self):
+        for sub in self._setting_subs:
+            self._settings.unsubscribe_to_change_events(sub)
+        self._setting_subs = []
+        PeopleSettings.__instance = None
+
+    @classmethod
+    def get_instance(cls) -> PeopleSettings:
+        if cls.__instance is None:
+            PeopleSettings()
+        return cls.__instance
+
+    @staticmethod
+    def _get_fields() -> dict:
+        # setting key -> (snapshot attribute, value converter, default value)
+        return {
+            PeopleSettings.COMMAND_FILE_PATH: ("command_file_path", _to_str, ""),
+            PeopleSettings.ROBOT_COMMAND_FILE_PATH: ("robot_command_file_path", _to_str, ""),
+            PeopleSettings.NUMBER_OF_LOOP: ("number_of_loop", _to_loop_count, 0),
+            PeopleSettings.DYNAMIC_AVOIDANCE_ENABLED: ("dynamic_avoidance_enabled", bool, True),
+            PeopleSettings.NAVMESH_ENABLED: ("navmesh_enabled", bool, True),
+            PeopleSettings.IDLE_DURATION_MIN: ("idle_duration_min", float, 1.0),
+            PeopleSettings.IDLE_DURATION_MAX: ("idle_duration_max", float, 3.0),
+            PeopleSettings.CHARACTER_ASSETS_PATH: ("character_assets_path", _to_str, ""),
+            PeopleSettings.BEHAVIOR_SCRIPT_PATH: ("behavior_script_path", _to_str, ""),
+            PeopleSettings.CHARACTER_PRIM_PATH: ("character_prim_path", _to_str, "/World/Characters"),
+            PeopleSettings.ASSET_CATALOG_CACHE_PATH: (
+                "asset_catalog_cache_path",
+                _to_str,
+                DEFAULT_ASSET_CATALOG_CACHE_PATH,
+            ),
+            PeopleSettings.CACHE_ACTION_METADATA: ("cache_action_metadata", bool, False),
+            PeopleSettings.EMIT_PER_AGENT_METADATA_EVENTS: ("emit_per_agent_metadata_events", bool, False),
+            PeopleSettings.CHARACTER_FINAL_TARGET_DISTANCE: ("final_target_distance", float, 0.25),
+            PeopleSettings.LOG_LEVEL: ("log_level", _to_log_level, "warn"),
+            PeopleSettings.LOG_RATE_LIMIT_INTERVAL: ("log_rate_limit_interval", float, 1.0),
+            PeopleSettings.BUDGET_FRAME_MS: ("budget_frame_ms", float, 0.0),
+            PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES: ("budget_max_deferral_frames", int, 4),
+            PeopleSettings.BUDGET_NEAR_DISTANCE: ("budget_near_distance", float, 10.0),
+            PeopleSettings.PERF_STATS_ENABLED: ("perf_stats_enabled", bool, False),
+            PeopleSettings.PERF_STATS_DUMP_PATH: ("perf_stats_dump_path", _to_str, ""),
+            PeopleSettings.PERF_STATS_DUMP_INTERVAL: ("perf_stats_dump_interval", float, 10.0),
+            PeopleSettings.TRACE_ENABLED: ("trace_enabled", bool, False),
+            PeopleSettings.TRACE_BUFFER_SIZE: ("trace_buffer_size", int, 200000),
+            PeopleSettings.KINEMATIC_ENABLED: ("kinematic_enabled", bool, False),
+            PeopleSettings.KINEMATIC_WALK_SPEED: ("kinematic_walk_speed", float, 1.3),
+            PeopleSettings.KINEMATIC_MAX_STEP: ("kinematic_max_step", float, 0.2),
+            PeopleSettings.LOADING_SLICE_BUDGET_MS: ("loading_slice_budget_ms", float, 4.0),
+            PeopleSettings.LOADING_MAX_CONCURRENT_REQUESTS: ("loading_max_concurrent_requests", int, 16),
+            PeopleSettings.POOL_ENABLED: ("pool_enabled", bool, False),
+            PeopleSettings.PHYSICS_SESSION_LAYER_ENABLED: ("physics_session_layer_enabled", bool, False),
+            PeopleSettings.WARMUP_CACHE_ENABLED: ("warmup_cache_enabled", bool, True),
+            PeopleSettings.WARMUP_PRELOAD_ENABLED: ("warmup_preload_enabled", bool, False),
+            PeopleSettings.SPAWN_MIN_SEPARATION: ("spawn_min_separation", float, 1.0),
+            PeopleSettings.SPAWN_MAX_ATTEMPTS: ("spawn_max_attempts", int, 30),
+            PeopleSettings.COMMAND_FILE_WATCH_ENABLED: ("command_file_watch_enabled", bool, False),
+            PeopleSettings.COMMAND_FILE_WATCH_INTERVAL: ("command_file_watch_interval", float, 1.0),
+        }
+
+    def _load(self, key: str):
+        attr_name, converter, default_value = self._fields[key]
+        value = self._settings.get(key)
+        if value is None:
+            # create the setting node, so that the change subscription is able to observe it
+            self._settings.set_default(key, default_value)
+            value = default_value
+        try:
+            setattr(self, attr_name, converter(value))
+        except (TypeError, ValueError, KeyError):
+            carb.log_error(f"Invalid value '{value}' for setting {key}, using default value '{default_value}'.")
+            setattr(self, attr_name, converter(default_value))
 
 
 class AgentEvent:
@@ -25,6 +216,7 @@ class AgentEvent:
     CommandStartEvent = "omni.anim.people/CommandStartEvent"
     CommandEndEvent = "omni.anim.people/CommandEndEvent"
     MetadataUpdateEvent = "omni.anim.people/MetadataUpdateEvent"
+    MetadataBatchUpdateEvent = "omni.anim.people/MetadataBatchUpdateEvent"
 
 
 class MetadataTag:
@@ -1,12 +1,49 @@
+import asyncio
+import functools
+import json
+import math
 import os
+import random
 import tempfile
+from types import SimpleNamespace
 from unittest import mock
 
+import carb
+import numpy as np
 import omni.kit.test
+import omni.usd
 
 from omni.anim.people_api import python_ext
+from omni.anim.people_api.settings import AgentEvent, MetadataTag, PeopleSettings
+from omni.anim.people_api.scripts.character_asset_catalog import CharacterAssetCatalog
+from omni.anim.people_api.scripts.character_behavior_random_idle import CharacterBehaviorRandomIdle
+from omni.anim.people_api.scripts.character_setup import CharacterBehavior, CharacterSetup
+from omni.anim.people_api.scripts.command_file_loader import (
+    CommandFileChange,
+    CommandFileLoader,
+    diff_command_files,
+    parse_command_file,
+)
+from omni.anim.people_api.scripts.character_snapshot import CharacterSnapshot, decode_snapshot, encode_snapshot
+from omni.anim.people_api.scripts.crowd_state import CrowdStateCache
 from omni.anim.people_api.scripts.custom_command.defines import get_anim_prim_name
+from omni.anim.people_api.scripts.frame_budget_governor import DeferrableWork, FrameBudgetGovernor
+from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+from omni.anim.people_api.scripts.metadata_channel import MetadataChannel
+from omni.anim.people_api.scripts.navigation_manager import NavigationManager
+from omni.anim.people_api.scripts.people_logger import PeopleLogger
+from omni.anim.people_api.scripts.robot_contact_monitor import vertical_capsule_contact
+from omni.anim.people_api.scripts.spawn_sampler import SpawnSampler
+from omni.anim.people_api.scripts.perf_stats import Histogram, PerfStats
+from omni.anim.people_api.scripts.population_streamer import PopulationStreamer
+from omni.anim.people_api.scripts.trace_recorder import TraceRecorder
 from omni.anim.people_api.scripts.utils import Utils
+from omni.anim.people_api.scripts.warmup_manager import WarmupManager
+from omni.anim.people_offline import GridNavMesh, KinematicCharacter
+from omni.anim.people_offline.benchmark import compare_to_baseline, merge_results
+from omni.anim.people_offline.episode_runner import aggregate, make_episodes
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdSkel
 
 
 class TestPeopleApiBasics(omni.kit.test.AsyncTestCase):
@@ -53,3 +90,885 @@ class TestPeopleApiBasics(omni.kit.test.AsyncTestCase):
             self.manager.load_tracking_file(json_path)
             self.assertEqual(self.manager.get_tracking_file_path(), json_path)
             self.assertEqual(self.manager.get_all_custom_commands(), [])
+
+    async def test_metadata_channel_emits_changes_once_per_flush(self):
+        settings = carb.settings.get_settings()
+        original_value = settings.get(PeopleSettings.CACHE_ACTION_METADATA)
+        settings.set(PeopleSettings.CACHE_ACTION_METADATA, True)
+        channel = MetadataChannel.get_instance()
+        channel.flush()
+        batches = []
+        sub = carb.eventdispatcher.get_eventdispatcher().observe_event(
+            event_name=AgentEvent.MetadataBatchUpdateEvent,
+            on_event=lambda event: batches.append(list(event["agent_names"])),
+            observer_name="omni.anim.people_api.tests.test_metadata_channel",
+        )
+        try:
+            for _ in range(10):
+                channel.submit("Alice", MetadataTag.AgentActionTag, "Walking")
+            channel.submit("Bob", MetadataTag.AgentActionTag, "Idle")
+            channel.flush()
+            # Unchanged values are not emitted again.
+            channel.submit("Alice", MetadataTag.AgentActionTag, "Walking")
+            channel.flush()
+            self.assertEqual(batches, [["Alice", "Bob"]])
+            self.assertEqual(channel.get_value("Alice", MetadataTag.AgentActionTag), "Walking")
+        finally:
+            del sub
+            channel.forget_agent("Alice")
+            channel.forget_agent("Bob")
+            settings.set(PeopleSettings.CACHE_ACTION_METADATA, bool(original_value))
+
+    async def test_people_settings_snapshot_follows_setting_changes(self):
+        settings = carb.settings.get_settings()
+        original_value = settings.get(PeopleSettings.CHARACTER_FINAL_TARGET_DISTANCE)
+        original_loop = settings.get(PeopleSettings.NUMBER_OF_LOOP)
+        people_settings = PeopleSettings.get_instance()
+        try:
+            settings.set(PeopleSettings.CHARACTER_FINAL_TARGET_DISTANCE, 1.5)
+            self.assertAlmostEqual(people_settings.final_target_distance, 1.5)
+            settings.set(PeopleSettings.NUMBER_OF_LOOP, "inf")
+            self.assertEqual(people_settings.number_of_loop, float("inf"))
+        finally:
+            settings.set(PeopleSettings.CHARACTER_FINAL_TARGET_DISTANCE, original_value)
+            settings.set(PeopleSettings.NUMBER_OF_LOOP, original_loop)
+
+    async def test_people_logger_is_lazy_and_rate_limited(self):
+        settings = carb.settings.get_settings()
+        original_level = settings.get(PeopleSettings.LOG_LEVEL)
+        original_interval = settings.get(PeopleSettings.LOG_RATE_LIMIT_INTERVAL)
+        logger = PeopleLogger("test")
+        formatted = []
+
+        class Probe:
+            def __str__(self):
+                formatted.append(True)
+                return "probe"
+
+        try:
+            settings.set(PeopleSettings.LOG_LEVEL, "warn")
+            logger.debug("value: %s", Probe())
+            self.assertEqual(formatted, [])
+
+            settings.set(PeopleSettings.LOG_LEVEL, "debug")
+            settings.set(PeopleSettings.LOG_RATE_LIMIT_INTERVAL, 60.0)
+            with mock.patch.object(carb, "log_info") as log_info:
+                for _ in range(5):
+                    logger.debug("value: %s", Probe())
+            log_info.assert_called_once_with("[test] value: probe")
+            self.assertEqual(len(formatted), 1)
+        finally:
+            settings.set(PeopleSettings.LOG_LEVEL, original_level)
+            settings.set(PeopleSettings.LOG_RATE_LIMIT_INTERVAL, original_interval)
+
+    async def test_budget_governor_defers_round_robin(self):
+        settings = carb.settings.get_settings()
+        original_budget = settings.get(PeopleSettings.BUDGET_FRAME_MS)
+        original_frames = settings.get(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES)
+        governor = FrameBudgetGovernor.get_instance()
+        agents = ["A", "B", "C", "D"]
+
+        def run_over_budget_frame():
+            governor.begin_update()
+            governor.end_update(0.0)
+            return [agent for agent in agents if governor.should_run(agent, DeferrableWork.AVOIDANCE)]
+
+        try:
+            settings.set(PeopleSettings.BUDGET_FRAME_MS, 0.001)
+            settings.set(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES, 2)
+            governor.end_frame()
+            governor.reset_stats()
+            run_over_budget_frame()
+            governor.end_frame()
+            # every agent is served once within max_deferral_frames frames
+            served = run_over_budget_frame()
+            governor.end_frame()
+            served += run_over_budget_frame()
+            governor.end_frame()
+            self.assertEqual(sorted(served), agents)
+            self.assertGreater(governor.get_stats()["total_deferred"][DeferrableWork.AVOIDANCE], 0)
+        finally:
+            for agent in agents:
+                governor.forget_agent(agent)
+            settings.set(PeopleSettings.BUDGET_FRAME_MS, original_budget)
+            settings.set(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES, original_frames)
+
+    async def test_budget_governor_serves_near_agents(self):
+        settings = carb.settings.get_settings()
+        original_budget = settings.get(PeopleSettings.BUDGET_FRAME_MS)
+        original_frames = settings.get(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES)
+        original_distance = settings.get(PeopleSettings.BUDGET_NEAR_DISTANCE)
+        governor = FrameBudgetGovernor.get_instance()
+        character_manager = GlobalCharacterPositionManager.get_instance()
+        far_agents = ["/World/Characters/Far_01", "/World/Characters/Far_02", "/World/Characters/Far_03"]
+        near_agent = "/World/Characters/Near"
+        try:
+            settings.set(PeopleSettings.BUDGET_FRAME_MS, 0.001)
+            settings.set(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES, 100)
+            settings.set(PeopleSettings.BUDGET_NEAR_DISTANCE, 5.0)
+            for index, agent in enumerate(far_agents):
+                character_manager.set_character_current_pos(agent, carb.Float3(50.0 + index * 5.0, 0.0, 0.0))
+            character_manager.set_character_current_pos(near_agent, carb.Float3(1.0, 0.0, 0.0))
+            governor.set_focus_point(carb.Float3(0.0, 0.0, 0.0))
+            governor.end_frame()
+            governor.reset_stats()
+            # the ring serves about one agent per frame, the near agent is served in every frame
+            near_served = 0
+            for _ in range(4):
+                governor.begin_update()
+                governor.end_update(0.0)
+                near_served += governor.should_run(near_agent, DeferrableWork.PATH_REQUEST)
+                for agent in far_agents:
+                    governor.should_run(agent, DeferrableWork.PATH_REQUEST)
+                governor.end_frame()
+            self.assertEqual(near_served, 4)
+            self.assertGreater(governor.get_stats()["total_deferred"][DeferrableWork.PATH_REQUEST], 0)
+            self.assertEqual(governor.get_stats()["agent_count"], len(far_agents) + 1)
+        finally:
+            governor.set_focus_point(None)
+            for agent in far_agents + [near_agent]:
+                governor.forget_agent(agent)
+                character_manager.remove_character(agent)
+            settings.set(PeopleSettings.BUDGET_FRAME_MS, original_budget)
+            settings.set(PeopleSettings.BUDGET_MAX_DEFERRAL_FRAMES, original_frames)
+            settings.set(PeopleSettings.BUDGET_NEAR_DISTANCE, original_distance)
+
+    async def test_perf_stats_records_only_when_enabled(self):
+        settings = carb.settings.get_settings()
+        original_value = settings.get(PeopleSettings.PERF_STATS_ENABLED)
+        perf_stats = PerfStats.get_instance()
+        perf_stats.reset()
+        try:
+            settings.set(PeopleSettings.PERF_STATS_ENABLED, False)
+            with perf_stats.scope("test.timer"):
+                perf_stats.count("test.counter")
+            self.assertIsNone(perf_stats.get_timer("test.timer"))
+            self.assertEqual(perf_stats.get_counter("test.counter"), 0)
+
+            settings.set(PeopleSettings.PERF_STATS_ENABLED, True)
+            for _ in range(3):
+                with perf_stats.scope("test.timer"):
+                    perf_stats.count("test.counter")
+            self.assertEqual(perf_stats.get_timer("test.timer").count, 3)
+            self.assertEqual(perf_stats.get_counter("test.counter"), 3)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                json_path = os.path.join(tmpdir, "perf_stats.json")
+                self.assertTrue(perf_stats.dump(json_path))
+                with open(json_path, encoding="utf-8") as file:
+                    report = json.load(file)
+            self.assertEqual(report["timers"]["test.timer"]["count"], 3)
+            self.assertEqual(report["counters"]["test.counter"], 3)
+        finally:
+            perf_stats.reset()
+            settings.set(PeopleSettings.PERF_STATS_ENABLED, bool(original_value))
+
+    async def test_histogram_percentiles(self):
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.add(0.0004)
+        histogram.add(0.3)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.0005)
+        self.assertAlmostEqual(histogram.percentile(1.0), 0.3)
+        self.assertAlmostEqual(histogram.to_dict()["max_ms"], 300.0)
+
+    async def test_trace_recorder_writes_chrome_trace(self):
+        settings = carb.settings.get_settings()
+        original_enabled = settings.get(PeopleSettings.TRACE_ENABLED)
+        original_buffer_size = settings.get(PeopleSettings.TRACE_BUFFER_SIZE)
+        recorder = TraceRecorder.get_instance()
+        perf_stats = PerfStats.get_instance()
+        try:
+            settings.set(PeopleSettings.TRACE_ENABLED, True)
+            settings.set(PeopleSettings.TRACE_BUFFER_SIZE, 2)
+            recorder.clear()
+            with perf_stats.scope("behavior.on_update", agent="Alice"):
+                pass
+            perf_stats.mark("command.start", agent="Alice", command="GoTo")
+            perf_stats.mark("command.end", agent="Alice", command="GoTo")
+            # the oldest event is dropped from the ring buffer
+            self.assertEqual([event["name"] for event in recorder.get_events()], ["command.start", "command.end"])
+            with tempfile.TemporaryDirectory() as tmpdir:
+                json_path = os.path.join(tmpdir, "trace.json")
+                self.assertTrue(recorder.write(json_path))
+                with open(json_path, encoding="utf-8") as file:
+                    trace = json.load(file)
+            self.assertEqual(trace["traceEvents"][0]["args"], {"agent": "Alice", "command": "GoTo"})
+        finally:
+            recorder.clear()
+            settings.set(PeopleSettings.TRACE_ENABLED, bool(original_enabled))
+            settings.set(PeopleSettings.TRACE_BUFFER_SIZE, original_buffer_size)
+
+    async def test_offline_navmesh_and_kinematic_walk(self):
+        navmesh = GridNavMesh((-5, -5, 5, 5), cell_size=0.5, obstacles=[(-1, -5, 1, 3)])
+        path = navmesh.query_shortest_path(carb.Float3(-3, 0, 0), carb.Float3(3, 0, 0))
+        self.assertIsNotNone(path)
+        points = path.get_points()
+        # the wall is passed on its open side
+        self.assertTrue(any(point[1] > 3 for point in points))
+        self.assertFalse(navmesh.is_walkable(0, 0))
+        self.assertIn(navmesh.query_closest_point(carb.Float3(0, 0, 0))[0][0], (-1.25, 1.25))
+
+        character = KinematicCharacter("/World/Characters/Tom/Tom", position=(-3, 0, 0), walk_speed=1.0)
+        character.set_variable("Action", "Walk")
+        character.set_variable("Walk", 1.0)
+        character.set_variable("PathPoints", points)
+        for _ in range(1000):
+            character.step(0.05)
+        position = carb.Float3(0, 0, 0)
+        rotation = carb.Float4(0, 0, 0, 0)
+        character.get_world_transform(position, rotation)
+        self.assertAlmostEqual(position[0], 3.0)
+        self.assertAlmostEqual(character.distance_walked, path.length())
+
+    async def test_kinematic_walk_passes_targets_in_one_step(self):
+        character = KinematicCharacter("/World/Characters/Tom/Tom", position=(0, 0, 0))
+        navigation_manager = NavigationManager(
+            "Tom", navmesh_enabled=False, dynamic_avoidance_enabled=False, character=character
+        )
+        navigation_manager.generate_goto_path(["2", "0", "0", "2", "3", "0", "_"])
+        navigation_manager.advance_along_path(1.0, 1.0)
+        self.assertAlmostEqual(character.get_position()[0], 1.0)
+        self.assertEqual(len(navigation_manager.path_targets), 2)
+
+        # a long step passes the intermediate target and stops at the final one, facing +y
+        navigation_manager.advance_along_path(10.0, 10.0)
+        position = character.get_position()
+        self.assertAlmostEqual(position[0], 2.0)
+        self.assertAlmostEqual(position[1], 3.0)
+        self.assertTrue(navigation_manager.destination_reached())
+        self.assertAlmostEqual(Utils.convert_to_angle(Utils.get_character_rot(character)), 180.0)
+        self.assertIsNone(character.get_variable("Action"))
+        navigation_manager.destroy()
+
+    async def test_benchmark_baseline_regressions(self):
+        baseline = {
+            "cases": {
+                "random_goto/10": {"frame_mean_ms": 1.0, "frame_p99_ms": 2.0, "startup_s": 0.5},
+                "queue/10": {"frame_mean_ms": 1.0},
+            }
+        }
+        results = {
+            "cases": {
+                "random_goto/10": {"frame_mean_ms": 1.1, "frame_p99_ms": 3.0, "startup_s": 0.2},
+                "goto_burst/10": {"frame_mean_ms": 5.0},
+            }
+        }
+        regressions = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("random_goto/10 frame_p99_ms"))
+        self.assertEqual(compare_to_baseline(results, baseline, threshold=0.6), [])
+        merged_cases = merge_results(baseline, results)["cases"]
+        self.assertEqual(set(merged_cases), {"random_goto/10", "queue/10", "goto_burst/10"})
+
+    async def test_episode_runner_seeds_and_summary(self):
+        episodes = make_episodes(3, base_seed=7, agents=5)
+        self.assertEqual([episode["index"] for episode in episodes], [0, 1, 2])
+        self.assertEqual(len({episode["seed"] for episode in episodes}), 3)
+        self.assertEqual(episodes, make_episodes(3, base_seed=7, agents=5))
+        self.assertNotEqual(episodes[0]["seed"], make_episodes(1, base_seed=8)[0]["seed"])
+
+        summaries = [
+            {
+                "index": 1,
+                "sim_time": 10.0,
+                "agents": 2,
+                "commands": {"default": 3},
+                "distance": 20.0,
+                "path_queries": 4,
+            },
+            {"index": 0, "seed": 1, "error": "Traceback"},
+        ]
+        result = aggregate(summaries, wall_time=2.0)
+        self.assertEqual(result["failed_episodes"], [0])
+        self.assertEqual(result["commands"], {"default": 3})
+        self.assertAlmostEqual(result["realtime_factor"], 5.0)
+        self.assertAlmostEqual(result["mean_speed"], 1.0)
+        self.assertEqual([summary["index"] for summary in result["episode_summaries"]], [0, 1])
+
+    async def test_stale_position_manager_keeps_current_instance(self):
+        stale_manager = GlobalCharacterPositionManager.get_instance()
+        stale_manager.destroy()
+        current_manager = GlobalCharacterPositionManager.get_instance()
+        stale_manager.destroy()
+        self.assertIs(GlobalCharacterPositionManager.get_instance(), current_manager)
+
+    async def test_asset_catalog_persists_and_picks_each_folder_once(self):
+        import omni.client
+
+        def entry(name, modified_time, is_folder=True):
+            flags = omni.client.ItemFlags.CAN_HAVE_CHILDREN if is_folder else 0
+            return mock.Mock(relative_path=name, flags=flags, modified_time=modified_time)
+
+        root = "omniverse://server/People"
+        listings = {
+            root + "/": [
+                entry("female_1", 1),
+                entry("male_1", 1),
+                entry("biped_demo", 1),
+                entry("notes.txt", 1, is_folder=False),
+            ],
+            root + "/female_1": [entry("female_1.usd", 1, False)],
+            root + "/male_1": [entry("textures", 1), entry("male_1.usd", 1, False)],
+            root + "/biped_demo": [entry("biped_demo.usd", 1, False)],
+        }
+        list_calls = []
+
+        def list_folder(path):
+            list_calls.append(path)
+            return omni.client.Result.OK, listings[path]
+
+        stat_result = (omni.client.Result.OK, entry("People", 10))
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+            CharacterAssetCatalog, "_memory_cache", {}
+        ), mock.patch("omni.client.list", side_effect=list_folder), mock.patch(
+            "omni.client.stat", return_value=stat_result
+        ):
+            cache_path = os.path.join(temp_dir, "catalog.json")
+            catalog = CharacterAssetCatalog(root, excluded_folders=["biped_demo"], cache_path=cache_path)
+            self.assertTrue(catalog.load())
+            self.assertEqual(sorted(catalog.get_folder_names()), ["female_1", "male_1"])
+            self.assertEqual(catalog.get_usd_path("male_1"), root + "/male_1/male_1.usd")
+            self.assertEqual(len(list_calls), 3)
+
+            # a new process only lists the asset root
+            CharacterAssetCatalog._memory_cache.clear()
+            catalog = CharacterAssetCatalog(root, excluded_folders=["biped_demo"], cache_path=cache_path)
+            self.assertTrue(catalog.load())
+            self.assertEqual(list_calls[3:], [root + "/"])
+
+            # each folder is picked once before any is picked again, named folders are picked directly
+            random.seed(3)
+            picks = [catalog.pick()[0] for _ in range(4)]
+            self.assertEqual(sorted(picks[:2]), ["female_1", "male_1"])
+            self.assertEqual(sorted(picks[2:]), ["female_1", "male_1"])
+            self.assertEqual(catalog.pick("male_1"), ("male_1", root + "/male_1/male_1.usd"))
+
+            # a changed asset root lists only the changed folders again
+            CharacterAssetCatalog._memory_cache.clear()
+            listings[root + "/"][0] = entry("female_1", 2)
+            stat_result[1].modified_time = 11
+            catalog = CharacterAssetCatalog(root, excluded_folders=["biped_demo"], cache_path=cache_path)
+            self.assertTrue(catalog.load())
+            self.assertEqual(list_calls[4:], [root + "/", root + "/female_1"])
+
+            # a file renamed in a folder changes the folder stamp only, the folder is listed again
+            CharacterAssetCatalog._memory_cache.clear()
+            listings[root + "/"][1] = entry("male_1", 2)
+            listings[root + "/male_1"] = [entry("textures", 1), entry("male_1_v2.usd", 2, False)]
+            catalog = CharacterAssetCatalog(root, excluded_folders=["biped_demo"], cache_path=cache_path)
+            self.assertTrue(catalog.load())
+            self.assertEqual(list_calls[6:], [root + "/", root + "/male_1"])
+            self.assertEqual(catalog.get_usd_path("male_1"), root + "/male_1/male_1_v2.usd")
+
+    async def test_reset_character_parks_and_reseeds_pooled_behavior(self):
+        prim_path = "/World/Characters/Tom/Tom"
+        behavior = CharacterBehaviorRandomIdle(prim_path)
+        behavior.on_init()
+        behavior.character = KinematicCharacter(prim_path, position=(0, 0, 0))
+        behavior.commands = [(None, ["Idle", "5"])]
+        position_manager = GlobalCharacterPositionManager.get_instance()
+        position_manager.set_character_current_pos(prim_path, carb.Float3(0, 0, 0))
+
+        # a parked character runs no commands and is not avoided by the other agents
+        behavior.reset_character(active=False)
+        self.assertEqual(behavior.commands, [])
+        self.assertNotIn(prim_path, position_manager.get_all_managed_characters())
+        behavior.on_update(0.0, 0.1)
+        self.assertIsNone(behavior.character)
+
+        character = KinematicCharacter(prim_path, position=(0, 0, 0))
+        behavior.character = character
+        behavior.reset_character(seed=5, position=(1.0, 2.0, 0.0), rotation=90.0)
+        self.assertEqual(behavior.random.random(), random.Random(5).random())
+        self.assertAlmostEqual(character.get_position()[0], 1.0)
+        self.assertAlmostEqual(character.get_position()[1], 2.0)
+        self.assertAlmostEqual(Utils.convert_to_angle(Utils.get_character_rot(character)), 90.0)
+        self.assertFalse(behavior._parked)
+        behavior.on_destroy()
+
+    async def test_episode_reset_frees_queues_and_keeps_navigation_manager(self):
+        queue_manager = GlobalQueueManager.get_instance()
+        queue = queue_manager.create_queue("test_episode_reset_queue")
+        for index in range(3):
+            queue.create_spot(index, carb.Float3(index, 0, 0), 0.0)
+        queue.get_spot(0).set_occupier("Tom")
+        queue.get_spot(1).set_occupier("Jerry")
+        queue.get_spot(2).set_occupier("Spike")
+        queue_manager.remove_characters_from_queues(["Tom", "Spike"])
+        self.assertEqual([spot.get_occupier() for spot in queue.spots], [None, "Jerry", None])
+
+        prim_path = "/World/Characters/Tom/Tom"
+        behavior = CharacterBehaviorRandomIdle(prim_path)
+        behavior.on_init()
+        behavior.character = KinematicCharacter(prim_path, position=(0, 0, 0))
+        navigation_manager = NavigationManager(prim_path, False, character=behavior.character)
+        navigation_manager.set_path_points([carb.Float3(1, 0, 0)])
+        navigation_manager.positions_over_time.append(carb.Float3(0, 0, 0))
+        behavior.navigation_manager = navigation_manager
+
+        # a reset character keeps its navigation manager, which is reset in place by init_character()
+        behavior.reset_character(seed=1, position=(1.0, 0.0, 0.0))
+        self.assertIs(behavior.navigation_manager, navigation_manager)
+        navigation_manager.reset()
+        self.assertEqual(navigation_manager.get_path_points(), [])
+        self.assertEqual(navigation_manager.positions_over_time, [])
+        behavior.on_destroy()
+
+    async def test_batched_physics_authoring_matches_per_prim_values(self):
+        # values written by Utils._add_simple_capsule_collider() and Utils.add_rigid_body_dynamics()
+        expected_capsule_values = {
+            "axis": ("token", "Z"),
+            "height": ("double", 1.1),
+            "radius": ("double", 0.3),
+            "xformOp:translate": ("double3", Gf.Vec3d(0, 0, 0.85)),
+            "visibility": ("token", UsdGeom.Tokens.invisible),
+            "purpose": ("token", UsdGeom.Tokens.guide),
+            "physics:collisionEnabled": ("bool", True),
+            "physxCollision:contactOffset": ("float", 0.02),
+            "physxCollision:restOffset": ("float", 0.0),
+            "physics:mass": ("float", Utils.PEDESTRIAN_COLLISION_MASS),
+        }
+        expected_rigid_body_values = {
+            "physics:rigidBodyEnabled": ("bool", True),
+            "physics:kinematicEnabled": ("bool", True),
+            "physxRigidBody:disableGravity": ("bool", False),
+            "physxRigidBody:maxContactImpulse": ("float", Utils.PEDESTRIAN_MAX_CONTACT_IMPULSE),
+            "physxRigidBody:maxDepenetrationVelocity": ("float", 1.0),
+            "physxRigidBody:angularDamping": ("float", 0.5),
+        }
+
+        def check_values(prim, expected_values):
+            for name, (type_name, value) in expected_values.items():
+                attribute = prim.GetAttribute(name)
+                self.assertEqual(str(attribute.GetTypeName()), type_name, name)
+                if type_name == "float":
+                    self.assertAlmostEqual(attribute.Get(), value, places=6, msg=name)
+                else:
+                    self.assertEqual(attribute.Get(), value, name)
+
+        for use_session_layer in (False, True):
+            stage = Usd.Stage.CreateInMemory()
+            root_prims = [UsdSkel.Root.Define(stage, f"/World/Characters/{name}/Root").GetPrim() for name in "AB"]
+            layer = Utils.get_session_sublayer(stage) if use_session_layer else None
+            self.assertEqual(Utils.add_capsule_colliders(root_prims, layer), root_prims)
+            Utils.add_rigid_body_dynamics_to_prims(root_prims, layer, angular_damping=0.5)
+            # the capsules are only added once
+            self.assertEqual(Utils.add_capsule_colliders(root_prims, layer), [])
+
+            for root_prim in root_prims:
+                capsule_prim = stage.GetPrimAtPath(root_prim.GetPath().AppendChild("CollisionCapsule"))
+                self.assertEqual(capsule_prim.GetTypeName(), "Capsule")
+                self.assertEqual(
+                    UsdGeom.Xformable(capsule_prim).GetXformOpOrderAttr().Get(), ["xformOp:translate"]
+                )
+                self.assertTrue(
+                    {"PhysicsCollisionAPI", "PhysxCollisionAPI", "PhysicsMassAPI"}.issubset(
+                        capsule_prim.GetPrimTypeInfo().GetAppliedAPISchemas()
+                    )
+                )
+                check_values(capsule_prim, expected_capsule_values)
+                self.assertTrue(
+                    {"PhysicsRigidBodyAPI", "PhysxRigidBodyAPI"}.issubset(
+                        root_prim.GetPrimTypeInfo().GetAppliedAPISchemas()
+                    )
+                )
+                check_values(root_prim, expected_rigid_body_values)
+            # the session sublayer keeps the physics out of the edited layer
+            self.assertEqual(
+                bool(stage.GetRootLayer().GetPrimAtPath("/World/Characters/A/Root/CollisionCapsule")),
+                not use_session_layer,
+            )
+
+    async def test_skel_root_relative_path_is_cached_per_asset(self):
+        stage = Usd.Stage.CreateInMemory()
+        for name in ("Tom", "Jerry"):
+            UsdGeom.Xform.Define(stage, f"/World/Characters/{name}")
+            # a hidden SkelRoot is skipped when searching
+            hidden_root = UsdSkel.Root.Define(stage, f"/World/Characters/{name}/Hidden")
+            UsdGeom.Imageable(hidden_root.GetPrim()).MakeInvisible()
+            UsdSkel.Root.Define(stage, f"/World/Characters/{name}/Body/Root")
+        character_setup = CharacterSetup.__new__(CharacterSetup)
+        character_setup.stage = stage
+        character_setup.character_root_prim_path = "/World/Characters"
+        character_setup.character_data_dict = {
+            name: SimpleNamespace(usd_path="omniverse://server/People/male_1/male_1.usd") for name in ("Tom", "Jerry")
+        }
+        with mock.patch.object(CharacterSetup, "_skel_root_relative_paths", {}):
+            self.assertEqual(character_setup._get_skel_root("Tom").GetPath(), "/World/Characters/Tom/Body/Root")
+            self.assertEqual(
+                CharacterSetup._skel_root_relative_paths,
+                {"omniverse://server/People/male_1/male_1.usd": Sdf.Path("Body/Root")},
+            )
+            # the other characters of the asset don't search their prims
+            with mock.patch.object(Usd, "PrimRange", side_effect=AssertionError("searched the character prims")):
+                skel_root = character_setup._get_skel_root("Jerry")
+            self.assertEqual(skel_root.GetPath(), "/World/Characters/Jerry/Body/Root")
+            self.assertIsNone(character_setup._get_skel_root("Spike"))
+
+    async def test_vertical_capsule_contact(self):
+        # side by side, 0.1 deep
+        depth, position = vertical_capsule_contact((0, 0, 0), 0.3, 1.7, (0.7, 0, 0), 0.5, 1.0)
+        self.assertAlmostEqual(depth, 0.1)
+        self.assertAlmostEqual(position[0], 0.3)
+        self.assertAlmostEqual(position[2], 0.5)
+        self.assertIsNone(vertical_capsule_contact((0, 0, 0), 0.3, 1.7, (0.9, 0, 0), 0.5, 1.0))
+        # above the head, the closest points are the ends of the axis segments
+        self.assertIsNone(vertical_capsule_contact((0, 0, 0), 0.3, 1.7, (0, 0, 2.2), 0.5, 1.0))
+        depth, position = vertical_capsule_contact((0, 0, 0), 0.3, 1.7, (0, 0, 1.5), 0.5, 1.0)
+        self.assertAlmostEqual(depth, 0.2)
+        self.assertAlmostEqual(position[2], 1.7)
+
+    async def test_crowd_state_cache_and_nearest_queries(self):
+        position_manager = GlobalCharacterPositionManager.get_instance()
+        prefix = "/World/TestCrowd"
+        for index in range(5):
+            prim_path = f"{prefix}/Agent_{index}"
+            position_manager.set_character_current_pos(prim_path, carb.Float3(index, 0, 0))
+            position_manager.set_character_radius(prim_path, 0.5)
+            position_manager.set_character_velocity(prim_path, carb.Float3(1, 0, 0))
+        cache = CrowdStateCache(prefix)
+        try:
+            crowd_state = cache.get()
+            self.assertEqual(crowd_state.positions.shape, (5, 3))
+            self.assertEqual(list(crowd_state.orientations[0]), [0.0, 0.0, 0.0, 1.0])
+            self.assertEqual(list(crowd_state.velocities[4]), [1.0, 0.0, 0.0])
+            # unchanged store, cached state
+            self.assertIs(cache.get(), crowd_state)
+
+            indices, distances = crowd_state.nearest_to_point((3.2, 0.0, 0.0), 2)
+            self.assertEqual(list(crowd_state.ids[indices]), [f"{prefix}/Agent_3", f"{prefix}/Agent_4"])
+            self.assertAlmostEqual(distances[0], 0.2)
+            indices, distances = crowd_state.nearest_to_path([(0.5, 1.0, 0.0), (0.5, -1.0, 0.0)], 5, max_distance=1.0)
+            self.assertEqual(sorted(crowd_state.ids[indices]), [f"{prefix}/Agent_0", f"{prefix}/Agent_1"])
+
+            position_manager.remove_character(f"{prefix}/Agent_0")
+            self.assertEqual(len(cache.get()), 4)
+        finally:
+            for index in range(5):
+                position_manager.remove_character(f"{prefix}/Agent_{index}")
+
+    async def test_character_snapshot_round_trip(self):
+        character_data = {
+            "usd_path": "/Characters/female_adult_police_01/female_adult_police_01.usd",
+            "behavior": "RandomGoto",
+            "position": [1.5, -2.0, 0.0],
+            "rotation": 90.0,
+            "random_seed": 2**32 - 1,
+            "nav_random_seed": 7,
+        }
+        snapshot = CharacterSnapshot(3, 3, characters={"Tom": character_data, "Jerry": dict(character_data)})
+        decoded = decode_snapshot(encode_snapshot(snapshot))
+        self.assertEqual(decoded, snapshot)
+
+        delta = CharacterSnapshot(4, 3, is_delta=True, characters={"Tom": character_data}, removed_names=["Jerry"])
+        data = encode_snapshot(delta)
+        # the strings shared by the records are stored once
+        self.assertEqual(data.count(b"female_adult_police_01.usd"), 1)
+        self.assertEqual(decode_snapshot(data), delta)
+        with self.assertRaises(ValueError):
+            decode_snapshot(data[:-1])
+
+        # a table holding only an empty string is not empty
+        empty_name_delta = CharacterSnapshot(5, 4, is_delta=True, removed_names=[""])
+        self.assertEqual(decode_snapshot(encode_snapshot(empty_name_delta)), empty_name_delta)
+        self.assertEqual(decode_snapshot(encode_snapshot(CharacterSnapshot(6, 6))), CharacterSnapshot(6, 6))
+
+    async def test_behavior_runtime_state_restores_rollout(self):
+        settings = carb.settings.get_settings()
+        original_kinematic = settings.get(PeopleSettings.KINEMATIC_ENABLED)
+        settings.set(PeopleSettings.KINEMATIC_ENABLED, True)
+        queue_manager = GlobalQueueManager.get_instance()
+        queue = queue_manager.create_queue("test_checkpoint_queue")
+        for index in range(2):
+            queue.create_spot(index, carb.Float3(index, 0, 0), 0.0)
+        prim_path = "/World/Characters/Tom/Tom"
+        behavior = CharacterBehaviorRandomIdle(prim_path)
+        try:
+            behavior.on_init()
+            behavior.character = KinematicCharacter(prim_path, position=(0, 0, 0))
+            behavior.navigation_manager = NavigationManager(prim_path, False, False, character=behavior.character)
+            behavior.commands = [(None, ["GoTo", "4", "0", "0", "4", "3", "0", "90"]), (None, ["Idle", "2"])]
+            behavior.execute_command(behavior.commands, 0.5)
+            queue.get_spot(1).set_occupier("Tom")
+            state = behavior.get_runtime_state()
+            occupancy = queue_manager.get_occupancy()
+
+            def rollout():
+                positions = []
+                for _ in range(10):
+                    behavior.execute_command(behavior.commands, 0.5)
+                    positions.append(tuple(behavior.character.get_position()))
+                return positions, len(behavior.commands), behavior.random.random()
+
+            first_rollout = rollout()
+            queue.get_spot(1).set_occupier(None)
+            # the current command is created again and goes on from the same phase
+            self.assertTrue(behavior.set_runtime_state(state))
+            queue_manager.set_occupancy(occupancy)
+            self.assertEqual(rollout(), first_rollout)
+            self.assertEqual(queue_manager.get_occupancy()["test_checkpoint_queue"], [None, "Tom"])
+        finally:
+            behavior.on_destroy()
+            settings.set(PeopleSettings.KINEMATIC_ENABLED, bool(original_kinematic))
+
+    async def test_warmup_manager_skips_warmed_assets_and_preloads_dependencies(self):
+        warmup_manager = WarmupManager.get_instance()
+        warmup_manager.clear()
+        usd_paths = ["/Characters/a/a.usd", "/Characters/b/b.usd", "/Characters/a/a.usd"]
+        try:
+            self.assertEqual(warmup_manager.get_unwarmed_usd_paths(usd_paths, "/World/Graph"), usd_paths[:2])
+            warmup_manager.mark_warmed(usd_paths[:1], "/World/Graph")
+            self.assertTrue(warmup_manager.is_warmed("/Characters/a/a.usd", "/World/Graph"))
+            self.assertEqual(warmup_manager.get_unwarmed_usd_paths(usd_paths, "/World/Graph"), usd_paths[1:2])
+            # an asset warmed up with another graph is warmed up again
+            self.assertEqual(warmup_manager.get_unwarmed_usd_paths(usd_paths, "/World/OtherGraph"), usd_paths[:2])
+
+            dependencies = {usd_path: ["../Shared/skel.usd"] for usd_path in usd_paths}
+            opened_paths = []
+
+            def find_or_open(layer_path):
+                opened_paths.append(layer_path)
+                layer = mock.Mock()
+                layer.GetCompositionAssetDependencies.return_value = dependencies.get(layer_path, [])
+                layer.ComputeAbsolutePath.side_effect = lambda asset_path: "/Characters/Shared/skel.usd"
+                return layer
+
+            with mock.patch("omni.anim.people_api.scripts.warmup_manager.Sdf") as sdf_module:
+                sdf_module.Layer.FindOrOpen.side_effect = find_or_open
+                self.assertEqual(await warmup_manager.preload_assets_async(usd_paths, 2), 3)
+                # the shared dependency is opened once and the open layers are not opened again
+                self.assertEqual(await warmup_manager.preload_assets_async(usd_paths[:1]), 0)
+            self.assertEqual(sorted(opened_paths), sorted(usd_paths[:2] + ["/Characters/Shared/skel.usd"]))
+            self.assertTrue(warmup_manager.is_preloaded("/Characters/Shared/skel.usd"))
+        finally:
+            warmup_manager.clear()
+
+    async def test_spawn_sampler_keeps_positions_apart_on_the_goal_island(self):
+        # the wall splits the navmesh in two islands, the goal is on the left one
+        navmesh = GridNavMesh((-10, -5, 10, 5), cell_size=0.5, obstacles=[(-1, -5, 1, 5)])
+        sampler = SpawnSampler(navmesh, (-5, 0, 0), min_separation=1.0, occupied_points=[(-5, 0, 0)])
+        result = sampler.sample_random(20)
+        self.assertTrue(result.is_complete(), result.describe())
+        positions = [(-5, 0, 0)] + result.positions
+        self.assertTrue(all(position[0] < -1 for position in positions))
+        for index, position in enumerate(positions):
+            for other_position in positions[index + 1 :]:
+                self.assertGreaterEqual(math.dist(position[:2], other_position[:2]), 1.0)
+        # the candidates left over once the count is reached don't block the next samples
+        sampler = SpawnSampler(navmesh, (-5, 0, 0), min_separation=1.0)
+        candidates = np.array([(-8, 3, 0), (-8, -3, 0), (-3, 3, 0)], dtype=np.float64)
+        self.assertEqual(sampler._accept(candidates, result, 2), [[-8.0, 3.0, 0.0], [-8.0, -3.0, 0.0]])
+        self.assertTrue(sampler._grid.is_free(-3, 3))
+        # the reachability of most candidates comes from the island index
+        self.assertLess(result.path_query_count, result.candidate_count)
+
+        # the attempts are bounded when the positions don't fit
+        result = SpawnSampler(navmesh, (-5, 0, 0), min_separation=1.0, max_attempts=5).sample_random(500)
+        self.assertFalse(result.is_complete())
+        self.assertEqual(result.candidate_count, 500 * 5)
+        self.assertGreater(result.unreachable_count, 0)
+
+        result = SpawnSampler(navmesh, (-5, 0, 0), min_separation=1.0).sample_near([(-3, 0), (-3, 0), (5, 0)])
+        self.assertEqual(result.failed_indices, [2])
+        self.assertEqual(result.positions[0], [-3.0, 0.0, 0.0])
+        self.assertGreaterEqual(math.dist(result.positions[0][:2], result.positions[1][:2]), 1.0)
+
+    async def test_population_streamer_recycles_characters_around_the_focus(self):
+        character_data_dict = {}
+
+        def spawn_characters(position_list, character_behavior):
+            names = [f"streamed_{len(character_data_dict) + index}" for index in range(len(position_list))]
+            for name, position in zip(names, position_list):
+                character_data_dict[name] = SimpleNamespace(position=position)
+            return names
+
+        def release_characters(names):
+            for name in names:
+                del character_data_dict[name]
+
+        character_setup = mock.Mock(
+            navmesh=GridNavMesh((-30, -10, 30, 10)),
+            people_settings=PeopleSettings.get_instance(),
+            character_data_dict=character_data_dict,
+            trigger_state_api_dict={},
+            spawn_characters=mock.Mock(side_effect=spawn_characters),
+            release_characters=mock.Mock(side_effect=release_characters),
+        )
+        character_setup.inav.get_area_count.return_value = 1
+        character_setup._get_spawn_sampler.side_effect = functools.partial(
+            CharacterSetup._get_spawn_sampler, character_setup
+        )
+        # no character has published its position yet, the spawn positions are used
+        character_setup.get_crowd_state.side_effect = lambda: CrowdStateCache("/None").get()
+        streamer = PopulationStreamer(character_setup, "/World/Robot", 5.0, 8.0, density=1.0, max_active_characters=4)
+
+        spawned_names, released_names = streamer.update((0, 0, 0))
+        self.assertEqual((len(spawned_names), released_names), (4, []))
+        for name in spawned_names:
+            self.assertLessEqual(math.hypot(*character_data_dict[name].position[:2]), 5.0 + 1.5)
+        # the target count is reached
+        self.assertEqual(streamer.update((0, 0, 0)), ([], []))
+
+        # the characters left behind are released and new ones spawned around the focus
+        new_names, released_names = streamer.update((20, 0, 0))
+        self.assertEqual(sorted(released_names), sorted(spawned_names))
+        self.assertEqual(len(new_names), 4)
+        self.assertEqual(streamer.get_character_names(), sorted(new_names))
+        self.assertEqual(streamer.roam_area.center, (20.0, 0.0, 0.0))
+        streamer.stop()
+        self.assertEqual(character_data_dict, {})
+
+    async def test_cancel_loading_removes_created_characters_right_away(self):
+        settings = carb.settings.get_settings()
+        original_budget = settings.get(PeopleSettings.LOADING_SLICE_BUDGET_MS)
+        character_data_dict = {}
+
+        def init_random_character(position, character_behavior):
+            name = f"Character_{len(character_data_dict)}"
+            character_data_dict[name] = position
+            return name
+
+        def remove_characters(names):
+            for name in names:
+                del character_data_dict[name]
+
+        # the setup state the async load uses, without creating prims
+        character_setup = CharacterSetup.__new__(CharacterSetup)
+        character_setup._loading_task = None
+        character_setup._loading_character_names = []
+        character_setup.is_imported = False
+        character_setup.people_settings = PeopleSettings.get_instance()
+        character_setup.character_data_dict = character_data_dict
+        character_setup.prefetch_character_assets_async = mock.AsyncMock(return_value=True)
+        character_setup._convert_xy_to_xyz = lambda position_list: [[x, y, 0.0] for x, y in position_list]
+        character_setup._init_random_character = mock.Mock(side_effect=init_random_character)
+        character_setup._setup_characters = mock.Mock()
+        character_setup.remove_characters = mock.Mock(side_effect=remove_characters)
+        try:
+            # one character per frame
+            settings.set(PeopleSettings.LOADING_SLICE_BUDGET_MS, 1e-6)
+            position_list = [(index, 0) for index in range(10)]
+            task = asyncio.ensure_future(
+                character_setup.load_characters_async(position_list, CharacterBehavior.RANDOM_GOTO)
+            )
+            while len(character_data_dict) < 3:
+                await asyncio.sleep(0)
+            self.assertTrue(character_setup.is_loading())
+
+            # the created characters are gone before cancel_loading() returns, and the task doesn't remove them again
+            character_setup.cancel_loading()
+            self.assertEqual(character_data_dict, {})
+            self.assertFalse(character_setup.is_loading())
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            character_setup.remove_characters.assert_called_once()
+            character_setup._setup_characters.assert_not_called()
+        finally:
+            settings.set(PeopleSettings.LOADING_SLICE_BUDGET_MS, original_budget)
+
+    async def test_command_file_loader_reads_each_file_once(self):
+        text = "# comment\nQueue Q\nQueue_Spot Q 0 1 0 0 90\nTom GoTo 1 2 0 _\n\nJerry Idle 3\nTom Idle  2\n"
+        command_file = parse_command_file("/cmd.txt", text)
+        self.assertEqual(command_file.get_agent_commands("Tom"), [["GoTo", "1", "2", "0", "_"], ["Idle", "2"]])
+        self.assertEqual(command_file.get_agent_commands("Jerry"), [["Idle", "3"]])
+        self.assertEqual(command_file.queues, {"Q": [(0, (1.0, 0.0, 0.0), 90.0)]})
+
+        loader = CommandFileLoader.get_instance()
+        client = mock.Mock()
+        client.read_file_async = mock.AsyncMock(return_value=(client.Result.OK, None, text.encode("utf-8")))
+        loaded_files = []
+        with mock.patch("omni.client", client):
+            # the agents which start before the file is loaded share its load and get it when it completes
+            self.assertIsNone(loader.request("/test_cmd.txt", loaded_files.append))
+            self.assertIsNone(loader.request("/test_cmd.txt", loaded_files.append))
+            self.assertTrue(loader.is_loading("/test_cmd.txt"))
+            while loader.is_loading("/test_cmd.txt"):
+                await asyncio.sleep(0)
+            self.assertIs(loader.request("/test_cmd.txt", loaded_files.append), loader.get("/test_cmd.txt"))
+        client.read_file_async.assert_awaited_once_with("/test_cmd.txt")
+        self.assertEqual(loaded_files, [loader.get("/test_cmd.txt")] * 2)
+        self.assertEqual(loaded_files[0].agent_commands, command_file.agent_commands)
+
+        # the file is read again on the next play, as it may have been edited while stopped
+        carb.eventdispatcher.get_eventdispatcher().dispatch_event(
+            event_name=omni.usd.get_context().stage_event_name(omni.usd.StageEventType.SIMULATION_STOP_PLAY),
+            payload={},
+        )
+        self.assertIsNone(loader.get("/test_cmd.txt"))
+
+        # a load in flight when the files are invalidated is not cached, the next requests read the file again
+        failed_paths = []
+        with mock.patch("omni.client", client):
+            self.assertIsNone(loader.request("/test_cmd.txt", loaded_files.append))
+            stale_load = loader._tasks["/test_cmd.txt"]
+            loader.invalidate()
+            self.assertFalse(loader.is_loading("/test_cmd.txt"))
+            await stale_load
+            self.assertIsNone(loader.get("/test_cmd.txt"))
+            self.assertEqual(len(loaded_files), 3)
+
+            client.read_file_async.return_value = (client.Result.ERROR_NOT_FOUND, None, None)
+            self.assertIsNone(loader.request("/test_cmd.txt", loaded_files.append, lambda: failed_paths.append(1)))
+            while loader.is_loading("/test_cmd.txt"):
+                await asyncio.sleep(0)
+        self.assertEqual(failed_paths, [1])
+        self.assertEqual(len(loaded_files), 3)
+
+    async def test_command_file_reload_diffs_agent_commands(self):
+        old_text = "Tom GoTo 1 2 0 _\nJerry Idle 3\nSpike Idle 1\n"
+        new_text = "Tom GoTo 1 2 0 _\nJerry Idle 4\nSpike Idle 1\nTom Idle 2\nTyke Idle 5\n"
+        old_file = parse_command_file("/cmd.txt", old_text)
+        changes = diff_command_files(old_file, parse_command_file("/cmd.txt", new_text))
+        self.assertEqual(
+            changes,
+            {
+                "Tom": CommandFileChange(CommandFileChange.APPEND, [["Idle", "2"]]),
+                "Jerry": CommandFileChange(CommandFileChange.REPLACE, [["Idle", "4"]]),
+                "Tyke": CommandFileChange(CommandFileChange.APPEND, [["Idle", "5"]]),
+            },
+        )
+
+        loader = CommandFileLoader.get_instance()
+        client = mock.Mock()
+        client.read_file_async = mock.AsyncMock(
+            side_effect=[(client.Result.OK, None, text.encode("utf-8")) for text in (old_text, new_text)]
+        )
+        notifications = []
+
+        def listener(command_file, changes):
+            notifications.append(changes)
+
+        with mock.patch("omni.client", client):
+            # the agents of a file which was not loaded get all their commands
+            self.assertEqual(
+                await loader.reload_async("/test_reload_cmd.txt"),
+                {
+                    agent_name: CommandFileChange(CommandFileChange.REPLACE, commands)
+                    for agent_name, commands in old_file.agent_commands.items()
+                },
+            )
+            loader.add_listener("/test_reload_cmd.txt", listener)
+            try:
+                self.assertEqual(await loader.reload_async("/test_reload_cmd.txt"), changes)
+            finally:
+                loader.remove_listener("/test_reload_cmd.txt", listener)
+
+        # the files are only polled while the watch is enabled
+        settings = carb.settings.get_settings()
+        original_watch_enabled = settings.get(PeopleSettings.COMMAND_FILE_WATCH_ENABLED)
+        settings.set(PeopleSettings.COMMAND_FILE_WATCH_ENABLED, False)
+        loader.add_listener("/test_reload_cmd.txt", listener)
+        try:
+            self.assertFalse(loader.is_watching("/test_reload_cmd.txt"))
+            settings.set(PeopleSettings.COMMAND_FILE_WATCH_ENABLED, True)
+            self.assertTrue(loader.is_watching("/test_reload_cmd.txt"))
+            settings.set(PeopleSettings.COMMAND_FILE_WATCH_ENABLED, False)
+            self.assertFalse(loader.is_watching("/test_reload_cmd.txt"))
+        finally:
+            loader.remove_listener("/test_reload_cmd.txt", listener)
+            settings.set(PeopleSettings.COMMAND_FILE_WATCH_ENABLED, original_watch_enabled)
+        # only the agents whose commands changed are notified
+        self.assertEqual(notifications, [changes])
+        self.assertEqual(loader.get("/test_reload_cmd.txt").get_agent_commands("Jerry"), [["Idle", "4"]])
+        loader.invalidate("/test_reload_cmd.txt")
@@ -0,0 +1,25 @@
+"""
+Offline backend of omni.anim.people_api.
+
+Pure Python stand-ins for `carb`, the Kit modules, `omni.anim.graph.core`, `omni.anim.navigation.core`,
+`omni.metropolis.utils` and the parts of `pxr` the extension imports, so that behaviors, commands, the navigation
+manager and the global managers run headless, e.g. for benchmarks and tests on machines without Isaac Sim.
+Characters are kinematic and the navmesh is a grid, see `KinematicCharacter` and `GridNavMesh`.
+
+This package is not loaded by Kit. Call `install()` before importing `omni.anim.people_api`:
+
+    from omni.anim.people_offline import GridNavMesh, OfflineSimulation, install
+    install()
+    from omni.anim.people_api.scripts.character_behavior_random_goto import CharacterBehaviorRandomGoto
+
+Commands which query the USD stage (Sit, GoToObject, Talk and the custom command templates) are not supported.
+
+The crowd benchmark suite runs with `python -m omni.anim.people_offline.benchmark`, see `benchmark.py`, and seeded
+episodes for datasets run in a process pool with `python -m omni.anim.people_offline.episode_runner`.
+"""
+
+from .anim_graph import KinematicCharacter, yaw_to_quat  # noqa: F401
+from .backend import install, is_installed, uninstall  # noqa: F401
+from .navmesh import GridNavMesh, NavigationInterface, NavMeshPath  # noqa: F401
+from .simulation import OfflineSimulation  # noqa: F401
+from .world import get_world  # noqa: F401
@@ -0,0 +1,112 @@
+"""
+Kinematic characters with the interface of `omni.anim.graph.core` characters.
+"""
+
+from __future__ import annotations
+
+import math
+
+from .carb_standin import Float3, Float4
+
+
+def yaw_to_quat(angle: float) -> Float4:
+    """rotation of `angle` degrees around the z axis, as (x, y, z, w)"""
+    half_angle = math.radians(angle) * 0.5
+    return Float4(0.0, 0.0, math.sin(half_angle), math.cos(half_angle))
+
+
+class KinematicCharacter:
+    """
+    Character which replaces the animation graph by a kinematic walk.
+
+    While the "Action" variable is "Walk", the character moves along the "PathPoints" variable at `walk_speed` scaled
+    by the "Walk" blend variable, and turns towards its walking direction. Other variables are only stored.
+    """
+
+    DEFAULT_WALK_SPEED = 1.3
+
+    def __init__(
+        self, prim_path: str, position=(0.0, 0.0, 0.0), rotation=None, walk_speed: float = DEFAULT_WALK_SPEED
+    ):
+        self.prim_path = str(prim_path)
+        self.walk_speed = walk_speed
+        self._position = [float(value) for value in position]
+        self._rotation = list(rotation if rotation is not None else yaw_to_quat(0.0))
+        self._variables: dict = {}
+        self._path = None
+        self._path_index = 0
+        self.distance_walked = 0.0
+
+    def get_world_transform(self, position: Float3, rotation: Float4):
+        position.x, position.y, position.z = self._position
+        rotation.x, rotation.y, rotation.z, rotation.w = self._rotation
+
+    def set_world_transform(self, position, rotation):
+        self._position = [float(position[0]), float(position[1]), float(position[2])]
+        self._rotation = [float(rotation[0]), float(rotation[1]), float(rotation[2]), float(rotation[3])]
+
+    def set_variable(self, name: str, value):
+        self._variables[name] = value
+
+    def get_variable(self, name: str):
+        return self._variables.get(name)
+
+    def get_position(self) -> Float3:
+        return Float3(*self._position)
+
+    def step(self, dt: float):
+        """advance the walk by `dt` seconds"""
+        if self._variables.get("Action") != "Walk":
+            return
+        points = self._variables.get("PathPoints")
+        distance = self.walk_speed * float(self._variables.get("Walk") or 0.0) * dt
+        if not points or distance <= 0.0:
+            return
+        if points is not self._path:
+            self._path = points
+            self._path_index = 0
+
+        position = self._position
+        direction_x = direction_y = 0.0
+        while distance > 0.0 and self._path_index < len(points):
+            target = points[self._path_index]
+            delta_x, delta_y = target[0] - position[0], target[1] - position[1]
+            length = math.hypot(delta_x, delta_y)
+            if length <= distance:
+                position[0], position[1], position[2] = float(target[0]), float(target[1]), float(target[2])
+                distance -= length
+                self._path_index += 1
+                self.distance_walked += length
+            else:
+                fraction = distance / length
+                position[0] += delta_x * fraction
+                position[1] += delta_y * fraction
+                position[2] += (target[2] - position[2]) * fraction
+                self.distance_walked += distance
+                distance = 0.0
+            if length > 1e-6:
+                direction_x, direction_y = delta_x, delta_y
+        if direction_x or direction_y:
+            self._rotation = list(yaw_to_quat(math.degrees(math.atan2(direction_x, -direction_y))))
+
+
+class AnimGraphInterface:
+    """registry of the characters returned by `omni.anim.graph.core.get_character()`"""
+
+    def __init__(self):
+        self._characters: dict[str, KinematicCharacter] = {}
+
+    def add_character(self, character: KinematicCharacter):
+        self._characters[character.prim_path] = character
+
+    def remove_character(self, prim_path: str):
+        self._characters.pop(str(prim_path), None)
+
+    def get_character(self, prim_path: str) -> KinematicCharacter | None:
+        return self._characters.get(str(prim_path))
+
+    def get_characters(self) -> list[KinematicCharacter]:
+        return list(self._characters.values())
+
+    def clear(self):
+        self._characters = {}
@@ -0,0 +1,58 @@
+"""
+Registration of the stand-in modules.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import sys
+
+from . import carb_standin, kit_standin, metropolis_standin, pxr_standin
+
+_installed_modules: dict = {}
+
+
+def is_installed() -> bool:
+    return bool(_installed_modules)
+
+
+def install():
+    """
+    register the stand-in modules in `sys.modules`; must be called before `omni.anim.people_api` is imported
+    """
+    if _installed_modules:
+        return
+    if importlib.util.find_spec("carb") is not None:
+        raise RuntimeError("carb is available, the offline backend is only meant for runs outside of Kit")
+    if "omni.anim.people_api" in sys.modules:
+        raise RuntimeError("omni.anim.people_api was imported before the offline backend was installed")
+
+    modules = {}
+    modules.update(carb_standin.create_modules())
+    # keep the real USD python bindings when they are available
+    if importlib.util.find_spec("pxr") is None:
+        modules.update(pxr_standin.create_modules())
+    modules.update(kit_standin.create_modules())
+    modules.update(metropolis_standin.create_modules())
+
+    # parents first, so that each module can be set as an attribute of its parent package
+    for name in sorted(modules, key=lambda module_name: module_name.count(".")):
+        module = modules[name]
+        sys.modules[name] = module
+        parent_name, _, child_name = name.rpartition(".")
+        if parent_name:
+            setattr(importlib.import_module(parent_name), child_name, module)
+        _installed_modules[name] = module
+
+
+def uninstall():
+    """remove the stand-in modules, and the extension modules imported against them"""
+    for name in sorted(sys.modules, key=lambda module_name: -module_name.count(".")):
+        if name in _installed_modules or name == "omni.anim.people_api" or name.startswith("omni.anim.people_api."):
+            module = sys.modules.pop(name)
+            parent_name, _, child_name = name.rpartition(".")
+            parent = sys.modules.get(parent_name)
+            if parent is not None and getattr(parent, child_name, None) is module:
+                delattr(parent, child_name)
+    _installed_modules.clear()
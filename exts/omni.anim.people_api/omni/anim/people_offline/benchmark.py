@@ -0,0 +1,351 @@
+"""
+Crowd benchmark suite on the offline backend.
+
+Each case runs one scenario with a number of agents and measures:
+    frame_mean_ms, frame_p99_ms: wall time of a simulation frame, after the warmup frames
+    path_queries_per_s: navmesh path queries per second of wall time during the measured frames
+    memory_per_agent_kb: python memory allocated while the agents are spawned and initialized
+    startup_s: time to start the simulation on a built navmesh, spawn the agents and run their first frame
+
+Results can be stored as a JSON baseline and compared against it; a case regresses when one of its time or memory
+metrics exceeds the baseline by more than the threshold. Path query throughput is reported but not checked, since it
+also drops when fewer queries are needed.
+
+    python -m omni.anim.people_offline.benchmark --agents 10,100 --baseline baseline.json --save-baseline
+    python -m omni.anim.people_offline.benchmark --agents 10,100 --baseline baseline.json --threshold 0.2
+
+Run it from the extension root, with the extension root on the python path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from .navmesh import GridNavMesh
+from .simulation import OfflineSimulation
+
+DEFAULT_AGENT_COUNTS = (10, 100, 500, 2000)
+DEFAULT_THRESHOLD = 0.2
+BASELINE_VERSION = 1
+
+# metrics checked against the baseline, lower values are better
+CHECKED_METRICS = ("frame_mean_ms", "frame_p99_ms", "memory_per_agent_kb", "startup_s")
+
+# floor area per agent in square meters, the navmesh grows with the crowd
+AREA_PER_AGENT = 16.0
+MIN_NAVMESH_SIZE = 20.0
+
+_NUMBER_OF_LOOP_KEY = "/exts/omni.anim.people_api/command_settings/number_of_loop"
+
+
+class Scenario:
+    """agents of one behavior; subclasses drive extra commands after the first frame and on each frame"""
+
+    name = ""
+
+    def get_behavior_class(self):
+        from omni.anim.people_api.scripts.character_behavior_random_idle import CharacterBehaviorRandomIdle
+
+        return CharacterBehaviorRandomIdle
+
+    def populate(self, sim: OfflineSimulation, agent_count: int, rng: random.Random):
+        behavior_class = self.get_behavior_class()
+        for index in range(agent_count):
+            point = sim.navmesh.query_random_point(f"spawn_{index}")
+            sim.add_character(f"Agent_{index}", behavior_class, position=tuple(point), rotation=rng.uniform(0, 360))
+
+    def on_started(self, sim: OfflineSimulation, rng: random.Random):
+        pass
+
+    def on_frame(self, sim: OfflineSimulation, frame: int, rng: random.Random):
+        pass
+
+
+class RandomGotoScenario(Scenario):
+    name = "random_goto"
+
+    def get_behavior_class(self):
+        from omni.anim.people_api.scripts.character_behavior_random_goto import CharacterBehaviorRandomGoto
+
+        return CharacterBehaviorRandomGoto
+
+
+class RandomIdleScenario(Scenario):
+    name = "random_idle"
+
+
+class QueueScenario(Scenario):
+    """agents line up in queues of `spots_per_queue` spots, then leave them to a random point"""
+
+    name = "queue"
+    spots_per_queue = 8
+
+    def on_started(self, sim: OfflineSimulation, rng: random.Random):
+        navmesh = sim.navmesh
+        behaviors = list(sim.behaviors.values())
+        queue_count = math.ceil(len(behaviors) / self.spots_per_queue)
+        spacing = (navmesh.max_y - navmesh.min_y) / (queue_count + 1)
+        for queue_index in range(queue_count):
+            y = navmesh.min_y + spacing * (queue_index + 1)
+            spots = [(navmesh.min_x + 2.0 + spot, y, navmesh.height, 180.0) for spot in range(self.spots_per_queue)]
+            sim.add_queue(f"Queue_{queue_index}", spots)
+        for index, behavior in enumerate(behaviors):
+            queue_name = f"Queue_{index // self.spots_per_queue}"
+            exit_point = navmesh.query_random_point(f"queue_exit_{index}")
+            behavior.replace_command(
+                [
+                    f"{behavior.character_name} Queue {queue_name}",
+                    f"{behavior.character_name} Dequeue {queue_name} {exit_point.x} {exit_point.y} {exit_point.z} 0",
+                ]
+            )
+
+
+class GoToBurstScenario(Scenario):
+    """idle agents, a `burst_fraction` of which get a GoTo command injected every `burst_interval` frames"""
+
+    name = "goto_burst"
+    burst_interval = 30
+    burst_fraction = 0.25
+
+    def on_frame(self, sim: OfflineSimulation, frame: int, rng: random.Random):
+        if frame % self.burst_interval:
+            return
+        behaviors = list(sim.behaviors.values())
+        for behavior in rng.sample(behaviors, max(1, int(len(behaviors) * self.burst_fraction))):
+            point = sim.navmesh.query_random_point(f"burst_{behavior.character_name}")
+            behavior.end_current_command()
+            behavior.inject_command([f"{behavior.character_name} GoTo {point.x} {point.y} {point.z} _"])
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (RandomGotoScenario, RandomIdleScenario, QueueScenario, GoToBurstScenario)
+}
+
+
+def create_navmesh(agent_count: int) -> GridNavMesh:
+    half_size = max(MIN_NAVMESH_SIZE, math.sqrt(agent_count * AREA_PER_AGENT)) * 0.5
+    return GridNavMesh((-half_size, -half_size, half_size, half_size))
+
+
+def _create_simulation(agent_count: int, seed: int) -> OfflineSimulation:
+    return OfflineSimulation(create_navmesh(agent_count), seed=seed, settings={_NUMBER_OF_LOOP_KEY: "inf"})
+
+
+def _start_population(sim: OfflineSimulation, scenario: Scenario, agent_count: int, seed: int, delta_time: float):
+    """start the simulation, spawn the scenario's agents and run their first frame"""
+    rng = random.Random(seed)
+    sim.start()
+    scenario.populate(sim, agent_count, rng)
+    sim.step(delta_time)
+    return rng
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """nearest rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_case(
+    scenario_name: str,
+    agent_count: int,
+    frames: int = 120,
+    warmup: int = 30,
+    delta_time: float = 1 / 30,
+    seed: int = 0,
+) -> dict:
+    """run one scenario with `agent_count` agents and return its metrics"""
+    scenario = SCENARIOS[scenario_name]()
+
+    # memory, in a separate run since tracing allocations slows everything down
+    sim = _create_simulation(agent_count, seed)
+    sim.start()
+    # import the behavior module before tracing, so that only the agents are counted
+    scenario.get_behavior_class()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        _start_population(sim, scenario, agent_count, seed, delta_time)
+        memory_used = tracemalloc.get_traced_memory()[0] - memory_before
+    finally:
+        tracemalloc.stop()
+        sim.stop()
+    del sim
+    gc.collect()
+
+    sim = _create_simulation(agent_count, seed)
+    start_time = time.perf_counter()
+    rng = _start_population(sim, scenario, agent_count, seed, delta_time)
+    startup_time = time.perf_counter() - start_time
+    try:
+        scenario.on_started(sim, rng)
+        frame_times = []
+        path_queries_before = sim.navmesh.path_query_count
+        for frame in range(warmup + frames):
+            if frame == warmup:
+                path_queries_before = sim.navmesh.path_query_count
+            frame_start = time.perf_counter()
+            scenario.on_frame(sim, frame, rng)
+            sim.step(delta_time)
+            if frame >= warmup:
+                frame_times.append(time.perf_counter() - frame_start)
+        path_queries = sim.navmesh.path_query_count - path_queries_before
+    finally:
+        sim.stop()
+
+    measured_time = sum(frame_times)
+    frame_times.sort()
+    return {
+        "agents": agent_count,
+        "frames": frames,
+        "frame_mean_ms": measured_time / len(frame_times) * 1000.0 if frame_times else 0.0,
+        "frame_p99_ms": _percentile(frame_times, 0.99) * 1000.0,
+        "path_queries_per_s": path_queries / measured_time if measured_time > 0 else 0.0,
+        "memory_per_agent_kb": memory_used / agent_count / 1024.0 if agent_count else 0.0,
+        "startup_s": startup_time,
+    }
+
+
+def run_benchmark(
+    scenario_names=None,
+    agent_counts=DEFAULT_AGENT_COUNTS,
+    frames: int = 120,
+    warmup: int = 30,
+    delta_time: float = 1 / 30,
+    seed: int = 0,
+    on_case_done=None,
+) -> dict:
+    """run every scenario at every agent count; results are keyed by "<scenario>/<agent count>" """
+    cases = {}
+    for scenario_name in scenario_names or SCENARIOS:
+        for agent_count in agent_counts:
+            case_name = f"{scenario_name}/{agent_count}"
+            cases[case_name] = run_case(scenario_name, agent_count, frames, warmup, delta_time, seed)
+            if on_case_done:
+                on_case_done(case_name, cases[case_name])
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {"frames": frames, "warmup": warmup, "delta_time": delta_time, "seed": seed},
+        "cases": cases,
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """regressions of the checked metrics by more than `threshold` (0.2 is 20%), as readable lines"""
+    regressions = []
+    for case_name, metrics in results.get("cases", {}).items():
+        baseline_metrics = baseline.get("cases", {}).get(case_name)
+        if not baseline_metrics:
+            continue
+        for metric in CHECKED_METRICS:
+            value = metrics.get(metric)
+            baseline_value = baseline_metrics.get(metric)
+            if value is None or not baseline_value:
+                continue
+            if value > baseline_value * (1.0 + threshold):
+                increase = value / baseline_value - 1.0
+                regressions.append(
+                    f"{case_name} {metric}: {value:.3f} > baseline {baseline_value:.3f} (+{increase:.0%})"
+                )
+    return regressions
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def save_results(path: str, results: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def merge_results(baseline: dict, results: dict) -> dict:
+    """baseline updated with the cases of `results`, so that partial runs keep the other cases"""
+    merged = dict(results)
+    merged["cases"] = {**baseline.get("cases", {}), **results.get("cases", {})}
+    return merged
+
+
+def _print_case(case_name: str, metrics: dict):
+    print(
+        f"{case_name:<20} mean {metrics['frame_mean_ms']:9.2f} ms  p99 {metrics['frame_p99_ms']:9.2f} ms  "
+        f"path queries {metrics['path_queries_per_s']:9.1f}/s  "
+        f"memory {metrics['memory_per_agent_kb']:7.1f} KiB/agent  startup {metrics['startup_s']:7.3f} s",
+        flush=True,
+    )
+
+
+def create_parser():
+    parser = argparse.ArgumentParser("Crowd benchmark")
+    parser.add_argument(
+        "--agents", default=",".join(str(count) for count in DEFAULT_AGENT_COUNTS), help="Comma separated agent counts"
+    )
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenarios")
+    parser.add_argument("--frames", type=int, default=120, help="Measured frames per case")
+    parser.add_argument("--warmup", type=int, default=30, help="Frames run before measuring")
+    parser.add_argument("--dt", type=float, default=1 / 30, help="Frame delta time in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Simulation seed")
+    parser.add_argument("--output", "-o", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", "-b", help="Baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results in the baseline file")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed regression, as a fraction of the baseline"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = create_parser().parse_args(argv)
+    scenario_names = [name for name in args.scenarios.split(",") if name]
+    unknown_scenarios = [name for name in scenario_names if name not in SCENARIOS]
+    if unknown_scenarios:
+        print(f"Unknown scenarios {unknown_scenarios}, available: {list(SCENARIOS)}", file=sys.stderr)
+        return 2
+    agent_counts = [int(count) for count in args.agents.split(",") if count]
+
+    results = run_benchmark(
+        scenario_names, agent_counts, args.frames, args.warmup, args.dt, args.seed, on_case_done=_print_case
+    )
+    if args.output:
+        save_results(args.output, results)
+    if not args.baseline:
+        return 0
+
+    baseline = load_results(args.baseline) if os.path.isfile(args.baseline) else {}
+    if args.save_baseline:
+        save_results(args.baseline, merge_results(baseline, results))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}", file=sys.stderr)
+        return 2
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"No regression above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Stand-in for the parts of `carb` used by the extension: Float3/Float4, logging, settings and the event dispatcher.
+"""
+
+from __future__ import annotations
+
+import logging
+import types
+import weakref
+
+_logger = logging.getLogger("carb")
+
+
+class Float3:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __setitem__(self, index, value):
+        setattr(self, self.__slots__[index], value)
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __eq__(self, other):
+        try:
+            return len(other) == 3 and tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return f"carb.Float3({self.x}, {self.y}, {self.z})"
+
+
+class Float4:
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __setitem__(self, index, value):
+        setattr(self, self.__slots__[index], value)
+
+    def __len__(self):
+        return 4
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, self.w))
+
+    def __eq__(self, other):
+        try:
+            return len(other) == 4 and tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z, self.w))
+
+    def __repr__(self):
+        return f"carb.Float4({self.x}, {self.y}, {self.z}, {self.w})"
+
+
+def log_verbose(msg):
+    _logger.debug(msg)
+
+
+def log_info(msg):
+    _logger.info(msg)
+
+
+def log_warn(msg):
+    _logger.warning(msg)
+
+
+def log_error(msg):
+    _logger.error(msg)
+
+
+# ================ Settings ================
+
+
+class ChangeEventType:
+    CREATED = 0
+    CHANGED = 1
+    DESTROYED = 2
+
+
+class _SettingItem:
+    def __init__(self, path: str):
+        self.path = path
+
+
+class Settings:
+    """flat key/value settings with per-key change subscriptions"""
+
+    def __init__(self):
+        self._values: dict = {}
+        # setting key -> {subscription id: callback}
+        self._subscribers: dict[str, dict[int, callable]] = {}
+        self._next_sub_id = 0
+
+    def get(self, path: str):
+        return self._values.get(path)
+
+    def set(self, path: str, value):
+        event_type = ChangeEventType.CHANGED if path in self._values else ChangeEventType.CREATED
+        self._values[path] = value
+        for callback in list(self._subscribers.get(path, {}).values()):
+            callback(_SettingItem(path), event_type)
+
+    set_int = set
+    set_float = set
+    set_bool = set
+    set_string = set
+
+    def set_default(self, path: str, value):
+        if path not in self._values:
+            self.set(path, value)
+
+    def subscribe_to_node_change_events(self, path: str, on_change):
+        self._next_sub_id += 1
+        self._subscribers.setdefault(path, {})[self._next_sub_id] = on_change
+        return (path, self._next_sub_id)
+
+    def unsubscribe_to_change_events(self, subscription):
+        if subscription is None:
+            return
+        path, sub_id = subscription
+        self._subscribers.get(path, {}).pop(sub_id, None)
+
+    def clear(self):
+        self._values = {}
+
+
+_settings = Settings()
+
+
+def get_settings() -> Settings:
+    return _settings
+
+
+# ================ Events ================
+
+
+class Event:
+    def __init__(self, event_name: str, payload: dict | None):
+        self.event_name = event_name
+        self.payload = payload or {}
+
+    def __getitem__(self, key):
+        return self.payload[key]
+
+    def __contains__(self, key):
+        return key in self.payload
+
+    def get(self, key, default=None):
+        return self.payload.get(key, default)
+
+
+class ObserverHandle:
+    """observer of an event; the observer stops receiving events once the handle is released or reset"""
+
+    def __init__(self, event_name: str, on_event, observer_name: str, order: int):
+        self.event_name = event_name
+        self.observer_name = observer_name
+        self.order = order
+        self._on_event = on_event
+
+    def reset(self):
+        self._on_event = None
+
+
+class EventDispatcher:
+    def __init__(self):
+        # event name -> weak references to the observer handles, sorted by order
+        self._observers: dict[str, list[weakref.ref]] = {}
+
+    def observe_event(self, event_name: str, on_event, observer_name: str = "", order: int = 0, filter=None):
+        handle = ObserverHandle(event_name, on_event, observer_name, order)
+        observers = self._observers.setdefault(event_name, [])
+        observers.append(weakref.ref(handle))
+        observers.sort(key=lambda ref: ref().order if ref() is not None else 0)
+        return handle
+
+    def dispatch_event(self, event_name: str, payload: dict | None = None):
+        observers = self._observers.get(event_name)
+        if not observers:
+            return
+        event = Event(event_name, payload)
+        for ref in list(observers):
+            handle = ref()
+            if handle is not None and handle._on_event is not None:
+                handle._on_event(event)
+        self._observers[event_name] = [ref for ref in self._observers[event_name] if self._is_alive(ref)]
+
+    @staticmethod
+    def _is_alive(ref: weakref.ref) -> bool:
+        handle = ref()
+        return handle is not None and handle._on_event is not None
+
+    def has_observers(self, event_name: str) -> bool:
+        return any(self._is_alive(ref) for ref in self._observers.get(event_name, []))
+
+
+_dispatcher = EventDispatcher()
+
+
+def get_eventdispatcher() -> EventDispatcher:
+    return _dispatcher
+
+
+def create_modules() -> dict[str, types.ModuleType]:
+    """build the `carb`, `carb.settings` and `carb.eventdispatcher` modules"""
+    settings_module = types.ModuleType("carb.settings")
+    settings_module.get_settings = get_settings
+    settings_module.ChangeEventType = ChangeEventType
+    settings_module.ISettings = Settings
+
+    dispatcher_module = types.ModuleType("carb.eventdispatcher")
+    dispatcher_module.get_eventdispatcher = get_eventdispatcher
+    dispatcher_module.Event = Event
+    dispatcher_module.ObserverGuard = ObserverHandle
+
+    carb_module = types.ModuleType("carb")
+    carb_module.Float3 = Float3
+    carb_module.Float4 = Float4
+    carb_module.log_verbose = log_verbose
+    carb_module.log_info = log_info
+    carb_module.log_warn = log_warn
+    carb_module.log_error = log_error
+    carb_module.settings = settings_module
+    carb_module.eventdispatcher = dispatcher_module
+    return {"carb": carb_module, "carb.settings": settings_module, "carb.eventdispatcher": dispatcher_module}
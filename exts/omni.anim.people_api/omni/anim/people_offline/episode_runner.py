@@ -0,0 +1,282 @@
+"""
+Runs independent offline episodes in a process pool, e.g. to generate pedestrian trajectory datasets.
+
+An episode is a dict of settings, see `EPISODE_DEFAULTS`. Each worker process installs the offline backend once and
+runs its episodes one after another; episodes share nothing, so throughput scales with the number of workers. The
+seed of an episode is derived from the base seed and the episode index, so an episode gives the same result whatever
+worker runs it. Each episode is written to `episode_<index>.json.gz` as soon as it finishes:
+
+    {
+        "episode": {...},                           # the episode settings
+        "times": [t0, t1, ...],                     # sample times in seconds
+        "trajectories": {"Agent_0": [x0, y0, x1, y1, ...], ...},
+        "events": [[time, agent, command, status], ...],   # command end events
+    }
+
+and the summary metrics of all episodes are aggregated into `summary.json`.
+
+    python -m omni.anim.people_offline.episode_runner --episodes 1000 --agents 20 --duration 120 -o dataset
+
+Run it from the extension root, with the extension root on the python path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+import traceback
+
+EPISODE_DEFAULTS = {
+    # agent count and behavior, "random_goto" or "random_idle"
+    "agents": 10,
+    "behavior": "random_goto",
+    # simulated seconds and time step; the kinematic mode splits long steps, see PeopleSettings.KINEMATIC_MAX_STEP
+    "duration": 60.0,
+    "delta_time": 0.2,
+    # True: commands move the characters (kinematic mode), False: the offline kinematic characters follow the
+    # animation graph variables
+    "kinematic": True,
+    "dynamic_avoidance": True,
+    # seconds between two trajectory samples
+    "sample_interval": 0.5,
+    # side of the square navmesh, in meters
+    "navmesh_size": 40.0,
+}
+
+_SETTINGS_PREFIX = "/exts/omni.anim.people_api"
+
+
+def get_episode_seed(base_seed: int, index: int) -> int:
+    return random.Random(f"{base_seed}:{index}").randrange(2**32)
+
+
+def make_episodes(count: int, base_seed: int = 0, **settings) -> list[dict]:
+    """`count` episodes with `settings` over the defaults, and a seed derived from `base_seed`"""
+    episodes = []
+    for index in range(count):
+        episode = {**EPISODE_DEFAULTS, **settings}
+        episode["index"] = index
+        episode["seed"] = get_episode_seed(base_seed, index)
+        episodes.append(episode)
+    return episodes
+
+
+def _get_behavior_class(name: str):
+    if name == "random_goto":
+        from omni.anim.people_api.scripts.character_behavior_random_goto import CharacterBehaviorRandomGoto
+
+        return CharacterBehaviorRandomGoto
+    if name == "random_idle":
+        from omni.anim.people_api.scripts.character_behavior_random_idle import CharacterBehaviorRandomIdle
+
+        return CharacterBehaviorRandomIdle
+    raise ValueError(f"Unknown behavior '{name}'")
+
+
+def get_episode_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"episode_{index:06d}.json.gz")
+
+
+def run_episode(episode: dict, output_dir: str) -> dict:
+    """run one episode in this process, write its file and return its summary metrics"""
+    from .navmesh import GridNavMesh
+    from .simulation import OfflineSimulation
+
+    episode = {**EPISODE_DEFAULTS, **episode}
+    start_time = time.perf_counter()
+    half_size = float(episode["navmesh_size"]) * 0.5
+    navmesh = GridNavMesh((-half_size, -half_size, half_size, half_size))
+    settings = {
+        f"{_SETTINGS_PREFIX}/command_settings/number_of_loop": "inf",
+        f"{_SETTINGS_PREFIX}/kinematic_settings/enabled": bool(episode["kinematic"]),
+        f"{_SETTINGS_PREFIX}/navigation_settings/dynamic_avoidance_enabled": bool(episode["dynamic_avoidance"]),
+    }
+    sim = OfflineSimulation(navmesh, seed=episode["seed"], settings=settings)
+
+    import carb.eventdispatcher
+    from omni.anim.people_api.settings import AgentEvent
+
+    events = []
+    command_counts = {}
+
+    def on_command_end(event):
+        status = event["status"]
+        command_counts[status] = command_counts.get(status, 0) + 1
+        events.append([round(sim.world.current_time, 3), event["agent_name"], event["command_name"], status])
+
+    subscription = carb.eventdispatcher.get_eventdispatcher().observe_event(
+        event_name=AgentEvent.CommandEndEvent, on_event=on_command_end, observer_name="EpisodeRunner"
+    )
+    behavior_class = _get_behavior_class(episode["behavior"])
+    spawn_random = random.Random(episode["seed"])
+    times = []
+    trajectories = {}
+    distance = 0.0
+    with sim:
+        for agent_index in range(int(episode["agents"])):
+            point = navmesh.query_random_point(f"spawn_{agent_index}")
+            sim.add_character(
+                f"Agent_{agent_index}", behavior_class, position=tuple(point), rotation=spawn_random.uniform(0, 360)
+            )
+        characters = {name: sim.get_character(name) for name in sim.behaviors}
+        trajectories = {name: [] for name in characters}
+        last_positions = {name: character.get_position() for name, character in characters.items()}
+
+        delta_time = float(episode["delta_time"])
+        frame_count = max(1, math.ceil(float(episode["duration"]) / delta_time))
+        sample_interval = float(episode["sample_interval"])
+        next_sample_time = 0.0
+        for _ in range(frame_count):
+            sim.step(delta_time)
+            for name, character in characters.items():
+                position = character.get_position()
+                distance += math.hypot(position.x - last_positions[name].x, position.y - last_positions[name].y)
+                last_positions[name] = position
+            if sim.world.current_time + 1e-9 >= next_sample_time:
+                times.append(round(sim.world.current_time, 3))
+                for name in characters:
+                    trajectories[name].extend((round(last_positions[name].x, 3), round(last_positions[name].y, 3)))
+                next_sample_time += sample_interval
+        path_queries = navmesh.path_query_count
+    # the observer stays alive until the run is over
+    del subscription
+
+    path = get_episode_path(output_dir, episode["index"])
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        json.dump(
+            {"episode": episode, "times": times, "trajectories": trajectories, "events": events},
+            file,
+            separators=(",", ":"),
+        )
+    return {
+        "index": episode["index"],
+        "seed": episode["seed"],
+        "agents": int(episode["agents"]),
+        "frames": frame_count,
+        "sim_time": frame_count * delta_time,
+        "wall_time": time.perf_counter() - start_time,
+        "commands": command_counts,
+        "distance": distance,
+        "path_queries": path_queries,
+        "file": os.path.basename(path),
+    }
+
+
+def _run_episode_in_worker(arguments) -> dict:
+    episode, output_dir = arguments
+    try:
+        return run_episode(episode, output_dir)
+    except Exception:
+        return {"index": episode.get("index"), "seed": episode.get("seed"), "error": traceback.format_exc()}
+
+
+def aggregate(summaries: list[dict], wall_time: float) -> dict:
+    """summary metrics of a run from the summaries of its episodes"""
+    finished = [summary for summary in summaries if "error" not in summary]
+    command_counts = {}
+    for summary in finished:
+        for status, count in summary["commands"].items():
+            command_counts[status] = command_counts.get(status, 0) + count
+    sim_time = sum(summary["sim_time"] for summary in finished)
+    agent_time = sum(summary["sim_time"] * summary["agents"] for summary in finished)
+    return {
+        "episodes": len(summaries),
+        "failed_episodes": [summary["index"] for summary in summaries if "error" in summary],
+        "wall_time": wall_time,
+        "episodes_per_s": len(finished) / wall_time if wall_time > 0 else 0.0,
+        "sim_time": sim_time,
+        "realtime_factor": sim_time / wall_time if wall_time > 0 else 0.0,
+        "commands": command_counts,
+        "distance": sum(summary["distance"] for summary in finished),
+        "mean_speed": sum(summary["distance"] for summary in finished) / agent_time if agent_time > 0 else 0.0,
+        "path_queries": sum(summary["path_queries"] for summary in finished),
+        "episode_summaries": sorted(summaries, key=lambda summary: summary["index"]),
+    }
+
+
+def run_episodes(episodes: list[dict], output_dir: str, workers: int | None = None, on_episode_done=None) -> dict:
+    """
+    run the episodes in `workers` processes (the core count by default), write their files and `summary.json` to
+    `output_dir` and return the aggregated summary; `on_episode_done(summary)` is called as episodes finish
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(episodes) or 1))
+    arguments = [(episode, output_dir) for episode in episodes]
+    summaries = []
+    start_time = time.perf_counter()
+    # spawned workers start from a clean interpreter, where the offline backend can be installed
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for summary in pool.imap_unordered(_run_episode_in_worker, arguments):
+            summaries.append(summary)
+            if on_episode_done:
+                on_episode_done(summary)
+    result = aggregate(summaries, time.perf_counter() - start_time)
+    result["workers"] = workers
+    with open(os.path.join(output_dir, "summary.json"), "w") as file:
+        json.dump(result, file, indent=2)
+    return result
+
+
+def _print_episode(summary: dict):
+    if "error" in summary:
+        print(f"episode {summary['index']} failed:\n{summary['error']}", file=sys.stderr, flush=True)
+    else:
+        print(
+            f"episode {summary['index']:6d} seed {summary['seed']:10d}  {summary['sim_time']:7.1f} s simulated in "
+            f"{summary['wall_time']:6.2f} s  commands {summary['commands']}",
+            flush=True,
+        )
+
+
+def create_parser():
+    parser = argparse.ArgumentParser("Offline episode runner")
+    parser.add_argument("--episodes", "-n", type=int, default=10, help="Number of episodes")
+    parser.add_argument("--output", "-o", required=True, help="Output directory")
+    parser.add_argument("--workers", "-w", type=int, default=0, help="Worker processes, the core count by default")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed of the episode seeds")
+    parser.add_argument("--agents", type=int, default=EPISODE_DEFAULTS["agents"], help="Agents per episode")
+    parser.add_argument("--behavior", default=EPISODE_DEFAULTS["behavior"], help="random_goto or random_idle")
+    parser.add_argument("--duration", type=float, default=EPISODE_DEFAULTS["duration"], help="Simulated seconds")
+    parser.add_argument("--dt", type=float, default=EPISODE_DEFAULTS["delta_time"], help="Time step in seconds")
+    parser.add_argument(
+        "--sample-interval", type=float, default=EPISODE_DEFAULTS["sample_interval"], help="Trajectory sampling"
+    )
+    parser.add_argument("--navmesh-size", type=float, default=EPISODE_DEFAULTS["navmesh_size"], help="Floor size")
+    parser.add_argument(
+        "--animated", action="store_true", help="Move characters through the animation graph variables"
+    )
+    parser.add_argument("--no-avoidance", action="store_true", help="Disable dynamic avoidance")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = create_parser().parse_args(argv)
+    episodes = make_episodes(
+        args.episodes,
+        args.seed,
+        agents=args.agents,
+        behavior=args.behavior,
+        duration=args.duration,
+        delta_time=args.dt,
+        sample_interval=args.sample_interval,
+        navmesh_size=args.navmesh_size,
+        kinematic=not args.animated,
+        dynamic_avoidance=not args.no_avoidance,
+    )
+    result = run_episodes(episodes, args.output, args.workers or None, on_episode_done=_print_episode)
+    print(
+        f"{result['episodes']} episodes on {result['workers']} workers in {result['wall_time']:.2f} s, "
+        f"{result['realtime_factor']:.1f}x real time, {len(result['failed_episodes'])} failed"
+    )
+    return 1 if result["failed_episodes"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Stand-ins for the Kit modules imported by the extension: omni.ext, omni.kit.app, omni.kit.commands,
+omni.kit.scripting, omni.usd, omni.timeline, omni.client, omni.anim.graph.core and omni.anim.navigation.core.
+"""
+
+from __future__ import annotations
+
+import enum
+import os
+import types
+from urllib.parse import urlparse
+
+from .pxr_standin import Path, create_placeholder_module
+from .world import get_world
+
+GLOBAL_EVENT_POST_UPDATE = "omni.kit.app.GLOBAL_EVENT_POST_UPDATE"
+
+# root folder of the omni.anim.people_api extension
+_EXT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def get_ext_path() -> str:
+    return _EXT_PATH
+
+
+class _ExtensionManager:
+    def get_extension_path(self, ext_id: str) -> str:
+        return _EXT_PATH
+
+    def get_extension_path_by_module(self, module_name: str) -> str:
+        return _EXT_PATH
+
+
+class _App:
+    def __init__(self):
+        self._extension_manager = _ExtensionManager()
+
+    def get_extension_manager(self) -> _ExtensionManager:
+        return self._extension_manager
+
+    def is_running(self) -> bool:
+        return get_world().is_playing
+
+
+_app = _App()
+
+
+class IExt:
+    def on_startup(self, ext_id):
+        pass
+
+    def on_shutdown(self):
+        pass
+
+
+class StageEventType(enum.IntEnum):
+    SAVED = 0
+    SAVE_FAILED = 1
+    OPENING = 2
+    OPENED = 3
+    OPEN_FAILED = 4
+    CLOSING = 5
+    CLOSED = 6
+    SIMULATION_START_PLAY = 7
+    SIMULATION_STOP_PLAY = 8
+    ANIMATION_START_PLAY = 9
+    ANIMATION_STOP_PLAY = 10
+
+
+def stage_event_name(event_type: StageEventType) -> str:
+    return f"omni.usd/stage_event/{StageEventType(event_type).name}"
+
+
+class _UsdContext:
+    def get_stage(self):
+        return get_world().stage
+
+    def stage_event_name(self, event_type: StageEventType) -> str:
+        return stage_event_name(event_type)
+
+
+_usd_context = _UsdContext()
+
+
+class _Timeline:
+    def get_current_time(self) -> float:
+        return get_world().current_time
+
+    def get_time_codes_per_seconds(self) -> float:
+        return get_world().time_codes_per_second
+
+    def is_playing(self) -> bool:
+        return get_world().is_playing
+
+
+_timeline = _Timeline()
+
+
+class BehaviorScript:
+    """base class of behavior scripts; instances are created and updated by `OfflineSimulation`"""
+
+    def __init__(self, prim_path):
+        self._prim_path = Path(prim_path)
+
+    @property
+    def prim_path(self) -> Path:
+        return self._prim_path
+
+    @property
+    def prim(self):
+        return get_world().stage.GetPrimAtPath(self._prim_path)
+
+    @property
+    def stage(self):
+        return get_world().stage
+
+    def on_init(self):
+        pass
+
+    def on_destroy(self):
+        pass
+
+    def on_play(self):
+        pass
+
+    def on_pause(self):
+        pass
+
+    def on_stop(self):
+        pass
+
+    def on_update(self, current_time: float, delta_time: float):
+        pass
+
+
+def _execute_command(name: str, **kwargs):
+    raise NotImplementedError(f"Kit command '{name}' is not available in the offline backend")
+
+
+def _break_url(url: str):
+    parsed = urlparse(url)
+    return types.SimpleNamespace(scheme=parsed.scheme, host=parsed.hostname, path=parsed.path, raw=url)
+
+
+def _module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    for attr_name, value in attributes.items():
+        setattr(module, attr_name, value)
+    return module
+
+
+def _package(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__path__ = []
+    return module
+
+
+def create_modules() -> dict[str, types.ModuleType]:
+    """build the Kit stand-in modules; `omni` and `omni.anim` stay the real namespace packages"""
+    world = get_world()
+    return {
+        "omni.ext": _module("omni.ext", IExt=IExt),
+        "omni.kit": _package("omni.kit"),
+        "omni.kit.app": _module(
+            "omni.kit.app", GLOBAL_EVENT_POST_UPDATE=GLOBAL_EVENT_POST_UPDATE, get_app=lambda: _app
+        ),
+        "omni.kit.commands": _module("omni.kit.commands", execute=_execute_command),
+        "omni.kit.scripting": _module("omni.kit.scripting", BehaviorScript=BehaviorScript),
+        "omni.usd": _module("omni.usd", get_context=lambda name="": _usd_context, StageEventType=StageEventType),
+        "omni.timeline": _module("omni.timeline", get_timeline_interface=lambda: _timeline),
+        "omni.client": _module("omni.client", break_url=_break_url),
+        "omni.anim.graph": _package("omni.anim.graph"),
+        "omni.anim.graph.core": _module("omni.anim.graph.core", get_character=world.anim_graph.get_character),
+        "omni.anim.navigation": _package("omni.anim.navigation"),
+        "omni.anim.navigation.core": _module(
+            "omni.anim.navigation.core", acquire_interface=lambda: world.navigation
+        ),
+        "AnimGraphSchema": create_placeholder_module("AnimGraphSchema"),
+        "NavSchema": create_placeholder_module("NavSchema"),
+    }
@@ -0,0 +1,196 @@
+"""
+Stand-in for the `omni.metropolis.utils` helpers used by the extension.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import types
+
+from . import carb_standin
+from .carb_standin import Float3, Float4
+from .world import get_world
+
+
+class CarbUtil:
+    @staticmethod
+    def add3(a, b) -> Float3:
+        return Float3(a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+    @staticmethod
+    def sub3(a, b) -> Float3:
+        return Float3(a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+    @staticmethod
+    def scale3(a, scale: float) -> Float3:
+        return Float3(a[0] * scale, a[1] * scale, a[2] * scale)
+
+    @staticmethod
+    def dot3(a, b) -> float:
+        return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+    @staticmethod
+    def cross3(a, b) -> Float3:
+        return Float3(a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+    @staticmethod
+    def length3(a) -> float:
+        return math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+
+    @staticmethod
+    def dist3(a, b) -> float:
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+    @staticmethod
+    def normalize3(a) -> Float3:
+        length = CarbUtil.length3(a)
+        if length == 0.0:
+            return Float3(a[0], a[1], a[2])
+        return CarbUtil.scale3(a, 1.0 / length)
+
+    @staticmethod
+    def lerp3(a, b, t: float) -> Float3:
+        return Float3(a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, a[2] + (b[2] - a[2]) * t)
+
+    @staticmethod
+    def clamp(value, min_value, max_value):
+        return max(min_value, min(max_value, value))
+
+    @staticmethod
+    def dot4(a, b) -> float:
+        return a[0] * b[0] + a[1] * b[1] + a[2] * b[2] + a[3] * b[3]
+
+    @staticmethod
+    def scale4(a, scale: float) -> Float4:
+        return Float4(a[0] * scale, a[1] * scale, a[2] * scale, a[3] * scale)
+
+    @staticmethod
+    def lerp4(a, b, t: float) -> Float4:
+        return Float4(*(a[i] + (b[i] - a[i]) * t for i in range(4)))
+
+    @staticmethod
+    def nlerp4(a, b, t: float) -> Float4:
+        result = CarbUtil.lerp4(a, b, t)
+        length = math.sqrt(CarbUtil.dot4(result, result))
+        if length == 0.0:
+            return result
+        return CarbUtil.scale4(result, 1.0 / length)
+
+
+class CarbSettingUtil:
+    @staticmethod
+    def get_value_by_key(key: str, fallback_value=None, override_setting: bool = False):
+        settings = carb_standin.get_settings()
+        value = settings.get(key)
+        if value is None or value == "":
+            if override_setting and fallback_value is not None:
+                settings.set(key, fallback_value)
+            return fallback_value
+        return value
+
+    @staticmethod
+    def set_value_by_key(key: str, new_value):
+        carb_standin.get_settings().set(key, new_value)
+
+
+class MathUtil:
+    @staticmethod
+    def get_rotation_angle_difference(angle_a: float, angle_b: float) -> float:
+        """absolute difference of two angles in degrees, in [0, 180]"""
+        difference = abs(angle_a - angle_b) % 360.0
+        return 360.0 - difference if difference > 180.0 else difference
+
+
+class SimulationUtil:
+    @staticmethod
+    def is_the_same_point(point_a, point_b, tol: float = 0.1) -> bool:
+        return CarbUtil.dist3(point_a, point_b) <= tol
+
+    @staticmethod
+    def validate_navmesh_point_2d(point, agent_radius: float = 0.5, tol: float = 0.1) -> bool:
+        navmesh = get_world().navigation.get_navmesh()
+        if navmesh is None:
+            return False
+        result = navmesh.query_closest_point(point, agent_radius=agent_radius)
+        if result is None:
+            return False
+        closest_point = result[0]
+        return math.hypot(closest_point[0] - point[0], closest_point[1] - point[1]) <= tol
+
+    @staticmethod
+    def get_current_timecode() -> float:
+        world = get_world()
+        return world.current_time * world.time_codes_per_second
+
+    @staticmethod
+    def get_agent_script_instance_by_path(prim_path):
+        if prim_path is None:
+            return None
+        return get_world().scripts.get(str(prim_path))
+
+
+class TypeUtil:
+    @staticmethod
+    def gf_quatd_to_carb_float4(quat) -> Float4:
+        imaginary = quat.GetImaginary()
+        return Float4(imaginary[0], imaginary[1], imaginary[2], quat.GetReal())
+
+    @staticmethod
+    def gf_vec3_to_carb_float3(vector) -> Float3:
+        return Float3(vector[0], vector[1], vector[2])
+
+
+class USDUtil:
+    """prim queries need a USD stage, which does not exist offline"""
+
+
+class JSONFileUtil:
+    @staticmethod
+    def load_from_file(file_path: str):
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def write_to_file(file_path: str, data) -> bool:
+        try:
+            folder = os.path.dirname(file_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=4)
+        except OSError:
+            return False
+        return True
+
+
+def create_modules() -> dict[str, types.ModuleType]:
+    """build the `omni.metropolis.utils` package and its submodules"""
+    modules = {}
+    for module_name, attributes in {
+        "carb_util": {"CarbUtil": CarbUtil, "CarbSettingUtil": CarbSettingUtil},
+        "math_util": {"MathUtil": MathUtil},
+        "simulation_util": {"SimulationUtil": SimulationUtil},
+        "type_util": {"TypeUtil": TypeUtil},
+        "usd_util": {"USDUtil": USDUtil},
+        "file_util": {"JSONFileUtil": JSONFileUtil},
+    }.items():
+        module = types.ModuleType(f"omni.metropolis.utils.{module_name}")
+        for attr_name, value in attributes.items():
+            setattr(module, attr_name, value)
+        modules[module.__name__] = module
+
+    metropolis_module = types.ModuleType("omni.metropolis")
+    metropolis_module.__path__ = []
+    utils_module = types.ModuleType("omni.metropolis.utils")
+    utils_module.__path__ = []
+    for full_name, module in modules.items():
+        setattr(utils_module, full_name.rsplit(".", 1)[1], module)
+    metropolis_module.utils = utils_module
+    modules["omni.metropolis"] = metropolis_module
+    modules["omni.metropolis.utils"] = utils_module
+    return modules
@@ -0,0 +1,261 @@
+"""
+Grid navmesh with the query interface of `omni.anim.navigation.core`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+
+from .carb_standin import Float3
+
+# 8-connected neighbourhood, as (dx, dy, cost)
+_NEIGHBOURS = [(dx, dy, math.hypot(dx, dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class NavMeshPath:
+    def __init__(self, points: list[Float3]):
+        self._points = points
+
+    def get_points(self) -> list[Float3]:
+        return list(self._points)
+
+    def length(self) -> float:
+        return sum(math.dist(tuple(a), tuple(b)) for a, b in zip(self._points, self._points[1:]))
+
+
+class GridNavMesh:
+    """
+    Walkable area of a flat floor, sampled as a grid of square cells.
+
+    Obstacles and areas are axis aligned rectangles given as (min_x, min_y, max_x, max_y). A cell is walkable when its
+    center is inside the bounds and outside all obstacles. Area 0 is the default area of the cells which are not in
+    any named area. Paths are A* paths over the cells, shortened by line of sight checks, so straight paths cost a
+    single line of sight check.
+    """
+
+    DEFAULT_AREA = "Default"
+
+    def __init__(
+        self,
+        bounds: tuple = (-25.0, -25.0, 25.0, 25.0),
+        cell_size: float = 0.5,
+        height: float = 0.0,
+        obstacles: list[tuple] | None = None,
+        areas: dict[str, list[tuple]] | None = None,
+    ):
+        self.min_x, self.min_y, self.max_x, self.max_y = (float(value) for value in bounds)
+        self.cell_size = float(cell_size)
+        self.height = float(height)
+        self.obstacles = list(obstacles or [])
+        self.area_names = [self.DEFAULT_AREA] + list(areas or {})
+        self.size_x = max(1, math.ceil((self.max_x - self.min_x) / self.cell_size))
+        self.size_y = max(1, math.ceil((self.max_y - self.min_y) / self.cell_size))
+
+        self._walkable = bytearray(self.size_x * self.size_y)
+        self._cell_area = [0] * (self.size_x * self.size_y)
+        # area index -> walkable cells of the area
+        self._area_cells: list[list[int]] = [[] for _ in self.area_names]
+        for index in range(self.size_x * self.size_y):
+            x, y = self._cell_center(index)
+            if any(_in_rect(x, y, rect) for rect in self.obstacles):
+                continue
+            self._walkable[index] = 1
+            for area_index, area_name in enumerate(self.area_names[1:], start=1):
+                if any(_in_rect(x, y, rect) for rect in areas[area_name]):
+                    self._cell_area[index] = area_index
+            self._area_cells[self._cell_area[index]].append(index)
+        self._walkable_cells = [index for index in range(len(self._walkable)) if self._walkable[index]]
+        self._random_streams: dict[str, random.Random] = {}
+        self._seed = 0
+        # number of path queries, read by the benchmarks
+        self.path_query_count = 0
+
+    # ================ Cells ================
+
+    def _cell_index(self, x: float, y: float) -> int | None:
+        cell_x = math.floor((x - self.min_x) / self.cell_size)
+        cell_y = math.floor((y - self.min_y) / self.cell_size)
+        if 0 <= cell_x < self.size_x and 0 <= cell_y < self.size_y:
+            return cell_y * self.size_x + cell_x
+        return None
+
+    def _cell_center(self, index: int) -> tuple[float, float]:
+        cell_y, cell_x = divmod(index, self.size_x)
+        return (self.min_x + (cell_x + 0.5) * self.cell_size, self.min_y + (cell_y + 0.5) * self.cell_size)
+
+    def is_walkable(self, x: float, y: float) -> bool:
+        index = self._cell_index(x, y)
+        return index is not None and bool(self._walkable[index])
+
+    def _closest_walkable_cell(self, x: float, y: float) -> int | None:
+        """walkable cell closest to a point, searched in growing rings around the point's cell"""
+        clamped_x = min(max(x, self.min_x), self.max_x - 1e-6)
+        clamped_y = min(max(y, self.min_y), self.max_y - 1e-6)
+        start_index = self._cell_index(clamped_x, clamped_y)
+        if self._walkable[start_index]:
+            return start_index
+        start_y, start_x = divmod(start_index, self.size_x)
+        for radius in range(1, max(self.size_x, self.size_y)):
+            best_index = None
+            best_distance = math.inf
+            for cell_y in range(start_y - radius, start_y + radius + 1):
+                if not 0 <= cell_y < self.size_y:
+                    continue
+                on_edge = cell_y in (start_y - radius, start_y + radius)
+                step = 1 if on_edge else 2 * radius
+                for cell_x in range(start_x - radius, start_x + radius + 1, step):
+                    if not 0 <= cell_x < self.size_x:
+                        continue
+                    index = cell_y * self.size_x + cell_x
+                    if not self._walkable[index]:
+                        continue
+                    center_x, center_y = self._cell_center(index)
+                    distance = math.hypot(center_x - x, center_y - y)
+                    if distance < best_distance:
+                        best_index, best_distance = index, distance
+            if best_index is not None:
+                return best_index
+        return None
+
+    def _has_line_of_sight(self, start: tuple[float, float], end: tuple[float, float]) -> bool:
+        distance = math.hypot(end[0] - start[0], end[1] - start[1])
+        steps = max(1, math.ceil(distance / (self.cell_size * 0.5)))
+        for step in range(steps + 1):
+            fraction = step / steps
+            x = start[0] + (end[0] - start[0]) * fraction
+            y = start[1] + (end[1] - start[1]) * fraction
+            if not self.is_walkable(x, y):
+                return False
+        return True
+
+    def _find_cell_path(self, start_index: int, end_index: int) -> list[int] | None:
+        end_x, end_y = self._cell_center(end_index)
+        open_heap = [(0.0, start_index)]
+        came_from = {start_index: None}
+        cost_so_far = {start_index: 0.0}
+        while open_heap:
+            _, current = heapq.heappop(open_heap)
+            if current == end_index:
+                cells = []
+                while current is not None:
+                    cells.append(current)
+                    current = came_from[current]
+                return cells[::-1]
+            current_y, current_x = divmod(current, self.size_x)
+            for dx, dy, step_cost in _NEIGHBOURS:
+                next_x, next_y = current_x + dx, current_y + dy
+                if not (0 <= next_x < self.size_x and 0 <= next_y < self.size_y):
+                    continue
+                neighbour = next_y * self.size_x + next_x
+                if not self._walkable[neighbour]:
+                    continue
+                # no corner cutting
+                if dx and dy:
+                    if not self._walkable[current_y * self.size_x + next_x]:
+                        continue
+                    if not self._walkable[next_y * self.size_x + current_x]:
+                        continue
+                new_cost = cost_so_far[current] + step_cost * self.cell_size
+                if new_cost < cost_so_far.get(neighbour, math.inf):
+                    cost_so_far[neighbour] = new_cost
+                    came_from[neighbour] = current
+                    center_x, center_y = self._cell_center(neighbour)
+                    heapq.heappush(open_heap, (new_cost + math.hypot(end_x - center_x, end_y - center_y), neighbour))
+        return None
+
+    # ================ Queries ================
+
+    def query_closest_point(self, point, agent_radius: float = 0.5):
+        """return (closest walkable point, area index)"""
+        index = self._cell_index(point[0], point[1])
+        if index is not None and self._walkable[index]:
+            return (Float3(float(point[0]), float(point[1]), self.height), self._cell_area[index])
+        index = self._closest_walkable_cell(point[0], point[1])
+        if index is None:
+            return None
+        center_x, center_y = self._cell_center(index)
+        return (Float3(center_x, center_y, self.height), self._cell_area[index])
+
+    def query_shortest_path(self, start, end, agent_radius: float = 0.5) -> NavMeshPath | None:
+        self.path_query_count += 1
+        start_result = self.query_closest_point(start)
+        end_result = self.query_closest_point(end)
+        if start_result is None or end_result is None:
+            return None
+        start_point, end_point = start_result[0], end_result[0]
+        if self._has_line_of_sight((start_point.x, start_point.y), (end_point.x, end_point.y)):
+            return NavMeshPath([start_point, end_point])
+
+        cells = self._find_cell_path(
+            self._cell_index(start_point.x, start_point.y), self._cell_index(end_point.x, end_point.y)
+        )
+        if cells is None:
+            return None
+        # keep only the corners which are needed to stay in line of sight
+        waypoints = [(start_point.x, start_point.y)] + [self._cell_center(index) for index in cells[1:-1]]
+        waypoints.append((end_point.x, end_point.y))
+        points = [start_point]
+        anchor = 0
+        while anchor < len(waypoints) - 1:
+            next_anchor = len(waypoints) - 1
+            while next_anchor > anchor + 1 and not self._has_line_of_sight(waypoints[anchor], waypoints[next_anchor]):
+                next_anchor -= 1
+            anchor = next_anchor
+            points.append(Float3(waypoints[anchor][0], waypoints[anchor][1], self.height))
+        points[-1] = end_point
+        return NavMeshPath(points)
+
+    def set_random_seed(self, seed: int):
+        self._seed = seed
+        self._random_streams = {}
+
+    def query_random_point(self, random_id: str, area_mask: list[int] | None = None) -> Float3 | None:
+        """random walkable point in the masked areas; each random id has its own seeded random stream"""
+        stream = self._random_streams.get(random_id)
+        if stream is None:
+            stream = self._random_streams[random_id] = random.Random(f"{self._seed}:{random_id}")
+        area_mask = (area_mask or [])[: len(self.area_names)]
+        if not area_mask or all(area_mask):
+            cells = self._walkable_cells
+        else:
+            cells = [index for area, enabled in enumerate(area_mask) if enabled for index in self._area_cells[area]]
+        if not cells:
+            return None
+        center_x, center_y = self._cell_center(stream.choice(cells))
+        half_cell = self.cell_size * 0.5
+        return Float3(
+            center_x + stream.uniform(-half_cell, half_cell) * 0.9,
+            center_y + stream.uniform(-half_cell, half_cell) * 0.9,
+            self.height,
+        )
+
+
+class NavigationInterface:
+    """stand-in of the interface returned by `omni.anim.navigation.core.acquire_interface()`"""
+
+    def __init__(self, navmesh: GridNavMesh | None = None):
+        self._navmesh = navmesh
+
+    def set_navmesh(self, navmesh: GridNavMesh | None):
+        self._navmesh = navmesh
+
+    def get_navmesh(self) -> GridNavMesh | None:
+        return self._navmesh
+
+    def find_area(self, area_name: str) -> int:
+        if self._navmesh is None or area_name not in self._navmesh.area_names:
+            return -1
+        return self._navmesh.area_names.index(area_name)
+
+    def get_area_count(self) -> int:
+        return len(self._navmesh.area_names) if self._navmesh is not None else 0
+
+    def set_random_seed(self, seed: int):
+        if self._navmesh is not None:
+            self._navmesh.set_random_seed(seed)
+
+
+def _in_rect(x: float, y: float, rect: tuple) -> bool:
+    return rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]
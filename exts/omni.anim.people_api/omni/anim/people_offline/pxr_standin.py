@@ -0,0 +1,245 @@
+"""
+Stand-in for the parts of `pxr` used by the navigation and command code: a small `Gf` and `Sdf.Path`.
+
+Other names, including the schema modules (Usd, UsdGeom, UsdSkel, UsdPhysics, PhysxSchema), resolve to placeholders, so
+modules which reference them can be imported; stage authoring is not available offline.
+"""
+
+from __future__ import annotations
+
+import math
+import types
+
+
+class Vec3d:
+    __slots__ = ("_data",)
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self._data = (float(x), float(y), float(z))
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __eq__(self, other):
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        return hash(self._data)
+
+    def __add__(self, other):
+        return Vec3d(*(a + b for a, b in zip(self, other)))
+
+    def __sub__(self, other):
+        return Vec3d(*(a - b for a, b in zip(self, other)))
+
+    def __neg__(self):
+        return Vec3d(*(-a for a in self))
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix3d):
+            # row vector times matrix, as in USD
+            return Vec3d(*(sum(self._data[i] * other[i][j] for i in range(3)) for j in range(3)))
+        return Vec3d(*(a * other for a in self))
+
+    __rmul__ = __mul__
+
+    def GetLength(self) -> float:
+        return math.sqrt(sum(a * a for a in self._data))
+
+    def GetNormalized(self) -> Vec3d:
+        length = self.GetLength()
+        return Vec3d(*self._data) if length == 0 else self * (1.0 / length)
+
+    def __repr__(self):
+        return f"Gf.Vec3d({self._data[0]}, {self._data[1]}, {self._data[2]})"
+
+
+class Quatd:
+    __slots__ = ("_real", "_imaginary")
+
+    def __init__(self, real=1.0, i=0.0, j=0.0, k=0.0):
+        if isinstance(i, (Vec3d, tuple, list)):
+            i, j, k = i
+        self._real = float(real)
+        self._imaginary = Vec3d(i, j, k)
+
+    def GetReal(self) -> float:
+        return self._real
+
+    def GetImaginary(self) -> Vec3d:
+        return self._imaginary
+
+    def GetLength(self) -> float:
+        return math.sqrt(self._real * self._real + sum(a * a for a in self._imaginary))
+
+    def GetNormalized(self) -> Quatd:
+        length = self.GetLength()
+        if length == 0:
+            return Quatd()
+        return Quatd(self._real / length, *(a / length for a in self._imaginary))
+
+    def __repr__(self):
+        return f"Gf.Quatd({self._real}, {tuple(self._imaginary)})"
+
+
+class Rotation:
+    """rotation around an axis, angles are in degrees"""
+
+    def __init__(self, axis_or_quat=None, angle: float = 0.0):
+        if axis_or_quat is None:
+            self._axis = Vec3d(1, 0, 0)
+            self._angle = 0.0
+        elif isinstance(axis_or_quat, Quatd):
+            self.SetQuat(axis_or_quat)
+        else:
+            self._axis = Vec3d(*axis_or_quat).GetNormalized()
+            self._angle = float(angle)
+
+    def SetQuat(self, quat: Quatd) -> Rotation:
+        imaginary = quat.GetImaginary()
+        length = imaginary.GetLength()
+        if length > 1e-10:
+            real = max(-1.0, min(1.0, quat.GetReal() / quat.GetLength()))
+            self._axis = imaginary * (1.0 / length)
+            self._angle = 2.0 * math.degrees(math.acos(real))
+        else:
+            self._axis = Vec3d(1, 0, 0)
+            self._angle = 0.0
+        return self
+
+    def GetAxis(self) -> Vec3d:
+        return self._axis
+
+    def GetAngle(self) -> float:
+        return self._angle
+
+    def GetQuat(self) -> Quatd:
+        half_angle = math.radians(self._angle) * 0.5
+        return Quatd(math.cos(half_angle), self._axis * math.sin(half_angle))
+
+
+class Matrix3d:
+    def __init__(self, value=1.0):
+        if isinstance(value, Rotation):
+            value = value.GetQuat()
+        if isinstance(value, Quatd):
+            w = value.GetReal()
+            x, y, z = value.GetImaginary()
+            # transposed rotation matrix, so that `vector * matrix` rotates the vector
+            self._rows = (
+                (1 - 2 * (y * y + z * z), 2 * (x * y + w * z), 2 * (x * z - w * y)),
+                (2 * (x * y - w * z), 1 - 2 * (x * x + z * z), 2 * (y * z + w * x)),
+                (2 * (x * z + w * y), 2 * (y * z - w * x), 1 - 2 * (x * x + y * y)),
+            )
+        else:
+            scale = float(value)
+            self._rows = ((scale, 0.0, 0.0), (0.0, scale, 0.0), (0.0, 0.0, scale))
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+
+def Clamp(value, min_value, max_value):
+    return max(min_value, min(max_value, value))
+
+
+class Path:
+    __slots__ = ("pathString",)
+
+    def __init__(self, path=""):
+        self.pathString = str(path)
+
+    @property
+    def name(self) -> str:
+        return self.pathString.rsplit("/", 1)[-1]
+
+    def GetParentPath(self) -> Path:
+        parent = self.pathString.rsplit("/", 1)[0]
+        return Path(parent or "/")
+
+    def AppendChild(self, name: str) -> Path:
+        return Path(f"{self.pathString.rstrip('/')}/{name}")
+
+    def __str__(self):
+        return self.pathString
+
+    def __repr__(self):
+        return f"Sdf.Path('{self.pathString}')"
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(self.pathString)
+
+
+class ChangeBlock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class Placeholder:
+    """stand-in of a USD type or value; attributes resolve to nested placeholders, calling one is an error"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr_name):
+        if attr_name.startswith("__"):
+            raise AttributeError(attr_name)
+        return Placeholder(f"{self._name}.{attr_name}")
+
+    def __call__(self, *args, **kwargs):
+        raise NotImplementedError(f"{self._name} is not available in the offline backend")
+
+    def __repr__(self):
+        return f"<offline placeholder {self._name}>"
+
+
+def create_placeholder_module(name: str) -> types.ModuleType:
+    """module which returns a placeholder for any attribute"""
+    module = types.ModuleType(name)
+
+    def __getattr__(attr_name):
+        if attr_name.startswith("__"):
+            raise AttributeError(attr_name)
+        return Placeholder(f"{name}.{attr_name}")
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+def create_modules() -> dict[str, types.ModuleType]:
+    """build the `pxr` package and its submodules"""
+    gf_module = types.ModuleType("pxr.Gf")
+    for gf_type in (Vec3d, Quatd, Rotation, Matrix3d, Clamp):
+        setattr(gf_module, gf_type.__name__, gf_type)
+    gf_module.Vec3f = Vec3d
+    gf_module.Quatf = Quatd
+
+    sdf_module = create_placeholder_module("pxr.Sdf")
+    sdf_module.Path = Path
+    sdf_module.ChangeBlock = ChangeBlock
+
+    modules = {"pxr.Gf": gf_module, "pxr.Sdf": sdf_module}
+    for name in ("Usd", "UsdGeom", "UsdSkel", "UsdPhysics", "PhysxSchema"):
+        modules[f"pxr.{name}"] = create_placeholder_module(f"pxr.{name}")
+
+    pxr_module = types.ModuleType("pxr")
+    pxr_module.__path__ = []
+    for full_name, module in modules.items():
+        setattr(pxr_module, full_name.split(".", 1)[1], module)
+    modules["pxr"] = pxr_module
+    return modules
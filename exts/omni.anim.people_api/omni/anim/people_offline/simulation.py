@@ -0,0 +1,180 @@
+"""
+Headless driver of character behaviors on the offline backend.
+"""
+
+from __future__ import annotations
+
+import random
+
+from . import carb_standin
+from .anim_graph import KinematicCharacter, yaw_to_quat
+from .backend import install
+from .kit_standin import GLOBAL_EVENT_POST_UPDATE, StageEventType, get_ext_path, stage_event_name
+from .navmesh import GridNavMesh
+from .world import get_world
+
+
+class OfflineSimulation:
+    """
+    Runs character behavior scripts without Kit, in the order of a Kit frame.
+
+    Each `step()` advances the timeline, calls `on_update` of every behavior, moves the kinematic characters along
+    their paths and dispatches the post update event, which flushes the metadata channel, the frame budget governor
+    and the perf stats dump. `start()` creates the extension singletons like the extension startup does, `stop()`
+    sends the stop play stage event and destroys them. In the kinematic mode (`PeopleSettings.KINEMATIC_ENABLED`) the
+    commands move the characters themselves, and long time steps can be used to run faster than real time.
+
+    Example:
+        settings = {PeopleSettings.NUMBER_OF_LOOP: "inf"}
+        with OfflineSimulation(GridNavMesh((-10, -10, 10, 10)), settings=settings) as sim:
+            sim.add_character("Tom", CharacterBehaviorRandomGoto, position=(0, 0, 0))
+            sim.run(frames=300)
+    """
+
+    def __init__(self, navmesh: GridNavMesh | None = None, seed: int = 0, settings: dict | None = None):
+        install()
+        self.world = get_world()
+        self.navmesh = navmesh or GridNavMesh()
+        self.seed = seed
+        self.settings = dict(settings or {})
+        # agent name -> behavior script
+        self.behaviors: dict[str, object] = {}
+        self.frame_count = 0
+        self._singletons = []
+        self._custom_command_manager = None
+        self._started = False
+
+    def __enter__(self) -> OfflineSimulation:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        from omni.anim.people_api.scripts.custom_command.command_manager import CustomCommandManager
+        from omni.anim.people_api.scripts.frame_budget_governor import FrameBudgetGovernor
+        from omni.anim.people_api.scripts.metadata_channel import MetadataChannel
+        from omni.anim.people_api.scripts.perf_stats import PerfStats
+        from omni.anim.people_api.scripts.trace_recorder import TraceRecorder
+        from omni.anim.people_api.settings import PeopleSettings
+
+        if self._started:
+            return
+        settings = carb_standin.get_settings()
+        for key, value in self.settings.items():
+            settings.set(key, value)
+        self.world.navigation.set_navmesh(self.navmesh)
+        self.navmesh.set_random_seed(self.seed)
+
+        self.people_settings = PeopleSettings.get_instance()
+        self._singletons = [
+            self.people_settings,
+            TraceRecorder.get_instance(),
+            PerfStats.get_instance(),
+            MetadataChannel.get_instance(),
+            FrameBudgetGovernor.get_instance(),
+        ]
+        if CustomCommandManager.get_instance() is None:
+            # custom commands are loaded from animation USD files, so none are registered offline
+            self._custom_command_manager = CustomCommandManager(get_ext_path())
+        self.world.is_playing = True
+        self._started = True
+
+    def stop(self):
+        from omni.anim.people_api.scripts import character_behavior_random_goto
+        from omni.anim.people_api.scripts.global_character_position_manager import GlobalCharacterPositionManager
+        from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+        from omni.anim.people_api.scripts.seed_manager import CharacterSeedRegistry
+
+        if not self._started:
+            return
+        for behavior in self.behaviors.values():
+            behavior.on_stop()
+        carb_standin.get_eventdispatcher().dispatch_event(stage_event_name(StageEventType.SIMULATION_STOP_PLAY))
+        for singleton in reversed(self._singletons):
+            singleton.destroy()
+        self._singletons = []
+        if self._custom_command_manager is not None:
+            self._custom_command_manager.shutdown()
+            self._custom_command_manager = None
+        GlobalCharacterPositionManager.get_instance().destroy()
+        GlobalQueueManager.get_instance().destroy()
+        CharacterSeedRegistry.get_instance().clear()
+        # the cached random goto destinations belong to this navmesh
+        character_behavior_random_goto.reset_position_cache()
+        carb_standin.get_settings().clear()
+        self.world.clear()
+        self.behaviors = {}
+        self._started = False
+
+    # ================ Characters ================
+
+    def get_character_prim_path(self, agent_name: str) -> str:
+        return f"{self.people_settings.character_prim_path}/{agent_name}/{agent_name}"
+
+    def add_character(
+        self,
+        agent_name: str,
+        behavior_class,
+        position=(0.0, 0.0, 0.0),
+        rotation: float = 0.0,
+        walk_speed: float = KinematicCharacter.DEFAULT_WALK_SPEED,
+        seed: int | None = None,
+    ):
+        """add a character at `position`, rotated by `rotation` degrees, and attach a behavior to it"""
+        from omni.anim.people_api.scripts.seed_manager import CharacterSeedRegistry
+
+        self.start()
+        prim_path = self.get_character_prim_path(agent_name)
+        self.world.anim_graph.add_character(KinematicCharacter(prim_path, position, yaw_to_quat(rotation), walk_speed))
+        if seed is None:
+            seed = random.Random(f"{self.seed}:{agent_name}").randrange(2**32)
+        CharacterSeedRegistry.get_instance().set_seed(agent_name, seed)
+
+        behavior = behavior_class(prim_path)
+        self.world.scripts[prim_path] = behavior
+        self.behaviors[agent_name] = behavior
+        behavior.on_init()
+        behavior.on_play()
+        return behavior
+
+    def remove_character(self, agent_name: str):
+        behavior = self.behaviors.pop(agent_name, None)
+        if behavior is None:
+            return
+        behavior.on_destroy()
+        prim_path = str(behavior.prim_path)
+        self.world.scripts.pop(prim_path, None)
+        self.world.anim_graph.remove_character(prim_path)
+
+    def get_character(self, agent_name: str) -> KinematicCharacter | None:
+        return self.world.anim_graph.get_character(self.get_character_prim_path(agent_name))
+
+    def add_queue(self, queue_name: str, spots: list[tuple]):
+        """create a queue from (x, y, z, rotation) spots, the first spot is the head of the queue"""
+        from omni.anim.people_api.scripts.global_queue_manager import GlobalQueueManager
+        from omni.anim.people_api.scripts.utils import Utils
+
+        queue = GlobalQueueManager.get_instance().create_queue(queue_name)
+        for index, (x, y, z, rotation) in enumerate(spots):
+            queue.create_spot(index, carb_standin.Float3(x, y, z), Utils.convert_angle_to_quatd(rotation))
+        return queue
+
+    # ================ Frames ================
+
+    def step(self, delta_time: float = 1.0 / 30.0):
+        self.start()
+        self.world.current_time += delta_time
+        current_time = self.world.current_time
+        for behavior in list(self.behaviors.values()):
+            behavior.on_update(current_time, delta_time)
+        for character in self.world.anim_graph.get_characters():
+            character.step(delta_time)
+        carb_standin.get_eventdispatcher().dispatch_event(GLOBAL_EVENT_POST_UPDATE, payload={"dt": delta_time})
+        self.frame_count += 1
+
+    def run(self, frames: int, delta_time: float = 1.0 / 30.0):
+        for _ in range(frames):
+            self.step(delta_time)
@@ -0,0 +1,76 @@
+"""
+State shared by the stand-in modules: characters, navmesh, stage prims, behavior scripts and the timeline.
+"""
+
+from __future__ import annotations
+
+from .anim_graph import AnimGraphInterface
+from .navmesh import NavigationInterface
+
+
+class OfflinePrim:
+    """prim of the offline stage; only character prims exist"""
+
+    def __init__(self, path: str, is_character: bool = False):
+        self._path = str(path)
+        self._is_character = is_character
+
+    def IsValid(self) -> bool:
+        return self._is_character
+
+    def IsActive(self) -> bool:
+        return self._is_character
+
+    def IsA(self, schema) -> bool:
+        return self._is_character
+
+    def HasAPI(self, schema) -> bool:
+        return self._is_character
+
+    def GetPath(self):
+        return self._path
+
+    GetPrimPath = GetPath
+
+    def GetName(self) -> str:
+        return self._path.rsplit("/", 1)[-1]
+
+    def GetTypeName(self) -> str:
+        return "SkelRoot" if self._is_character else ""
+
+    def __bool__(self):
+        return self.IsValid()
+
+
+class OfflineStage:
+    def __init__(self, world: OfflineWorld):
+        self._world = world
+
+    def GetPrimAtPath(self, path) -> OfflinePrim:
+        return OfflinePrim(path, self._world.anim_graph.get_character(str(path)) is not None)
+
+
+class OfflineWorld:
+    def __init__(self):
+        self.anim_graph = AnimGraphInterface()
+        self.navigation = NavigationInterface()
+        self.stage = OfflineStage(self)
+        # prim path -> behavior script instance
+        self.scripts: dict[str, object] = {}
+        self.current_time = 0.0
+        self.time_codes_per_second = 60.0
+        self.is_playing = False
+
+    def clear(self):
+        self.anim_graph.clear()
+        self.navigation.set_navmesh(None)
+        self.scripts = {}
+        self.current_time = 0.0
+        self.is_playing = False
+
+
+_world = OfflineWorld()
+
+
+def get_world() -> OfflineWorld:
+    return _world